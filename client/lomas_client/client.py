@@ -1,6 +1,7 @@
 import base64
 import json
 import pickle
+import time
 from typing import List, Optional
 
 import pandas as pd
@@ -12,6 +13,9 @@ from lomas_client.constants import (
     CLIENT_SERVICE_NAME,
     DUMMY_NB_ROWS,
     DUMMY_SEED,
+    JOB_MAX_POLL_INTERVAL,
+    JOB_POLL_INTERVAL,
+    JOB_TIMEOUT,
     SERVICE_ID,
 )
 from lomas_client.http_client import LomasHttpClient
@@ -22,6 +26,7 @@ from lomas_client.libraries.smartnoise_synth import SmartnoiseSynthClient
 from lomas_client.utils import raise_error, validate_model_response
 from lomas_core.constants import DPLibraries
 from lomas_core.instrumentation import get_ressource, init_telemetry
+from lomas_core.models.constants import JobStatus
 from lomas_core.models.requests import (
     GetDummyDataset,
     LomasRequestModel,
@@ -29,6 +34,8 @@ from lomas_core.models.requests import (
 from lomas_core.models.responses import (
     DummyDsResponse,
     InitialBudgetResponse,
+    JobResponse,
+    QueryResponse,
     RemainingBudgetResponse,
     SpentBudgetResponse,
 )
@@ -210,3 +217,75 @@ class Client:
 
         raise_error(res)
         return None
+
+    def get_job(self, job_id: str) -> Optional[JobResponse]:
+        """This function retrieves the status of an asynchronous job.
+
+        Args:
+            job_id (str): The identifier of the job, returned by its submission.
+
+        Returns:
+            Optional[JobResponse]: The status of the job.
+        """
+        res = self.http_client.get(f"jobs/{job_id}")
+
+        return validate_model_response(res, JobResponse)
+
+    def get_job_result(self, job_id: str) -> Optional[QueryResponse]:
+        """This function retrieves the result of a finished asynchronous job.
+
+        The error of the query is raised if the job failed.
+
+        Args:
+            job_id (str): The identifier of the job, returned by its submission.
+
+        Returns:
+            Optional[QueryResponse]: The response of the query of the job.
+        """
+        res = self.http_client.get(f"jobs/{job_id}/result")
+
+        return validate_model_response(res, QueryResponse)
+
+    def wait_for_job(
+        self,
+        job_id: str,
+        timeout: float = JOB_TIMEOUT,
+        poll_interval: float = JOB_POLL_INTERVAL,
+        max_poll_interval: float = JOB_MAX_POLL_INTERVAL,
+    ) -> Optional[QueryResponse]:
+        """This function waits for an asynchronous job to finish and retrieves its result.
+
+        The status of the job is polled with an exponential backoff.
+
+        Args:
+            job_id (str): The identifier of the job, returned by its submission.
+            timeout (float, optional): Maximum number of seconds to wait.
+
+                Defaults to JOB_TIMEOUT.
+
+            poll_interval (float, optional): Number of seconds before the first poll.
+
+                Defaults to JOB_POLL_INTERVAL.
+
+            max_poll_interval (float, optional): Maximum number of seconds
+                between two polls.
+
+                Defaults to JOB_MAX_POLL_INTERVAL.
+
+        Raises:
+            TimeoutError: If the job is not finished after timeout seconds.
+
+        Returns:
+            Optional[QueryResponse]: The response of the query of the job.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get_job(job_id)
+            if job is not None and job.status in (JobStatus.COMPLETE, JobStatus.FAILED):
+                return self.get_job_result(job_id)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Job {job_id} is not finished after {timeout} seconds.")
+            time.sleep(min(poll_interval, remaining))
+            poll_interval = min(poll_interval * 2, max_poll_interval)
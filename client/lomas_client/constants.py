@@ -12,4 +12,8 @@ DEFAULT_READ_TIMEOUT = 10
 DIFFPRIVLIB_READ_TIMEOUT = DEFAULT_READ_TIMEOUT * 10
 SMARTNOISE_SYNTH_READ_TIMEOUT = DEFAULT_READ_TIMEOUT * 100
 
+JOB_POLL_INTERVAL = 1  # seconds before the first poll of a job status
+JOB_MAX_POLL_INTERVAL = 30  # the poll interval doubles up to this number of seconds
+JOB_TIMEOUT = SMARTNOISE_SYNTH_READ_TIMEOUT
+
 SNSYNTH_DEFAULT_SAMPLES_NB = 200
@@ -7,7 +7,6 @@ from lomas_client.constants import CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT
 from lomas_core.models.requests import LomasRequestModel
 
 
-# pylint: disable=R0903
 class LomasHttpClient:
     """A client for interacting with the Lomas API."""
 
@@ -53,3 +52,31 @@ class LomasHttpClient:
             timeout=(CONNECT_TIMEOUT, read_timeout),
         )
         return r
+
+    def get(
+        self,
+        endpoint: str,
+        read_timeout: int = DEFAULT_READ_TIMEOUT,
+    ) -> requests.Response:
+        """Executes a GET request to endpoint.
+
+        Args:
+            endpoint (str): The API endpoint to which the request will be sent.
+            read_timeout (int): number of seconds that client wait for the server
+                to send a response.
+                Defaults to DEFAULT_READ_TIMEOUT.
+
+        Returns:
+            requests.Response: The response object resulting from the GET request.
+        """
+        logging.info(
+            f"User '{self.headers['user-name']}' is making a request "
+            + f"to url '{self.url}' "
+            + f"at the endpoint '{endpoint}'."
+        )
+        r = requests.get(
+            self.url + "/" + endpoint,
+            headers=self.headers,
+            timeout=(CONNECT_TIMEOUT, read_timeout),
+        )
+        return r
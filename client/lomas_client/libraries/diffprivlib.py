@@ -14,7 +14,7 @@ from lomas_core.models.requests import (
     DiffPrivLibQueryModel,
     DiffPrivLibRequestModel,
 )
-from lomas_core.models.responses import CostResponse, QueryResponse
+from lomas_core.models.responses import CostResponse, JobResponse, QueryResponse
 
 
 class DiffPrivLibClient:
@@ -142,3 +142,45 @@ class DiffPrivLibClient:
         res = self.http_client.post(endpoint, body)
 
         return validate_model_response(res, QueryResponse)
+
+    def submit_query(
+        self,
+        pipeline: Pipeline,
+        feature_columns: List[str],
+        target_columns: Optional[List[str]] = None,
+        test_size: float = 0.2,
+        test_train_split_seed: int = 1,
+        imputer_strategy: str = "drop",
+    ) -> Optional[JobResponse]:
+        """Submits the training of a DiffPrivLib pipeline as an asynchronous job.
+
+        The result is retrieved with :py:meth:`Client.wait_for_job`, see
+        :py:meth:`query` for the parameters.
+
+        Args:
+            pipeline (sklearn.pipeline): DiffPrivLib pipeline.
+            feature_columns (list[str]): the list of feature column to train
+            target_columns (list[str], optional): the list of target column to predict \
+                May be None for certain models.
+            test_size (float, optional): proportion of the test set \
+                Defaults to 0.2.
+            test_train_split_seed (int, optional): seed for random train test split \
+                Defaults to 1.
+            imputer_strategy (str, optional): imputation strategy. Defaults to "drop".
+
+        Returns:
+            Optional[JobResponse]: The pending job.
+        """
+        body_dict = {
+            "dataset_name": self.http_client.dataset_name,
+            "diffprivlib_json": serialise_pipeline(pipeline),
+            "feature_columns": feature_columns,
+            "target_columns": target_columns,
+            "test_size": test_size,
+            "test_train_split_seed": test_train_split_seed,
+            "imputer_strategy": imputer_strategy,
+        }
+        body = DiffPrivLibQueryModel.model_validate(body_dict)
+        res = self.http_client.post("jobs/diffprivlib_query", body)
+
+        return validate_model_response(res, JobResponse)
@@ -18,7 +18,7 @@ from lomas_core.models.requests import (
     SmartnoiseSynthQueryModel,
     SmartnoiseSynthRequestModel,
 )
-from lomas_core.models.responses import CostResponse, QueryResponse
+from lomas_core.models.responses import CostResponse, JobResponse, QueryResponse
 
 
 class SmartnoiseSynthClient:
@@ -195,3 +195,66 @@ class SmartnoiseSynthClient:
         res = self.http_client.post(endpoint, body, SMARTNOISE_SYNTH_READ_TIMEOUT)
 
         return validate_model_response(res, QueryResponse)
+
+    def submit_query(
+        self,
+        synth_name: str,
+        epsilon: float,
+        delta: Optional[float] = None,
+        select_cols: List[str] = [],
+        synth_params: dict = {},
+        nullable: bool = True,
+        constraints: dict = {},
+        return_model: bool = False,
+        condition: str = "",
+        nb_samples: int = SNSYNTH_DEFAULT_SAMPLES_NB,
+    ) -> Optional[JobResponse]:
+        """This function submits a SmartNoise Synthetic query as an asynchronous job.
+
+        The result is retrieved with :py:meth:`Client.wait_for_job`, see
+        :py:meth:`query` for the parameters.
+
+        Args:
+            synth_name (str): name of the Synthesizer model to use.
+            epsilon (float): Privacy parameter (e.g., 0.1).
+            delta (float): Privacy parameter (e.g., 1e-5).
+            select_cols (List[str]): List of columns to select.
+                Defaults to None.
+            synth_params (dict): Keyword arguments to pass to the synthesizer
+                constructor.
+                Defaults to None.
+            nullable (bool): True if some data cells may be null
+                Defaults to True.
+            constraints: Dictionnary for custom table transformer constraints.
+                Defaults to {}.
+            return_model (bool): True to get Synthesizer model, False to get samples
+                Defaults to False
+            condition (Optional[str]): sampling condition in `model.sample`
+                (only relevant if return_model is False)
+                Defaults to "".
+            nb_samples (Optional[int]): number of samples to generate.
+                (only relevant if return_model is False)
+                Defaults to SNSYNTH_DEFAULT_SAMPLES_NB
+        Returns:
+            Optional[JobResponse]: The pending job.
+        """
+        validate_synthesizer(synth_name, return_model)
+        constraints_str = serialise_constraints(constraints) if constraints else ""
+
+        body_dict = {
+            "dataset_name": self.http_client.dataset_name,
+            "synth_name": synth_name,
+            "epsilon": epsilon,
+            "delta": delta,
+            "select_cols": select_cols,
+            "synth_params": synth_params,
+            "nullable": nullable,
+            "constraints": constraints_str,
+            "return_model": return_model,
+            "condition": condition,
+            "nb_samples": nb_samples,
+        }
+        body = SmartnoiseSynthQueryModel.model_validate(body_dict)
+        res = self.http_client.post("jobs/smartnoise_synth_query", body)
+
+        return validate_model_response(res, JobResponse)
@@ -80,7 +80,7 @@ def validate_model_response(response: requests.Response, response_model: Any) ->
     Returns:
         response_model: Model for responses requests.
     """
-    if response.status_code == status.HTTP_200_OK:
+    if response.status_code in (status.HTTP_200_OK, status.HTTP_202_ACCEPTED):
         data = response.content.decode("utf8")
         r_model = response_model.model_validate_json(data)
         return r_model
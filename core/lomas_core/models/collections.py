@@ -1,17 +1,23 @@
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Annotated, Any, Dict, List, Literal, Optional, Union
+from uuid import uuid4
 
 from pydantic import BaseModel, Discriminator, Field, Tag, model_validator
 
+from lomas_core.constants import DPLibraries
 from lomas_core.models.constants import (
     CARDINALITY_FIELD,
     CATEGORICAL_TYPE_PREFIX,
     DB_TYPE_FIELD,
     TYPE_FIELD,
+    DatasetFileFormat,
+    JobStatus,
     MetadataColumnType,
     Precision,
     PrivateDatabaseType,
+    SQLEngine,
 )
+from lomas_core.models.exceptions import LomasServerExceptionAlias
 
 # Dataset of User
 # -----------------------------------------------------------------------------
@@ -31,12 +37,23 @@ class DatasetOfUser(BaseModel):
 # -----------------------------------------------------------------------------
 
 
+class BudgetReservation(BaseModel):
+    """BaseModel for the budget reserved by a running query of a user."""
+
+    reservation_id: str = Field(default_factory=lambda: uuid4().hex)
+    dataset_name: str
+    epsilon: float
+    delta: float
+    expires_at: float  # timestamp after which the reservation is no longer counted
+
+
 class User(BaseModel):
     """BaseModel for a user in a user collection."""
 
     user_name: str
     may_query: bool
     datasets_list: List[DatasetOfUser]
+    reservations: List[BudgetReservation] = []
 
 
 class UserCollection(BaseModel):
@@ -60,6 +77,7 @@ class DSPathAccess(DSAccess):
 
     database_type: Literal[PrivateDatabaseType.PATH]  # type: ignore
     path: str
+    file_format: Optional[DatasetFileFormat] = None  # inferred from path extension if None
 
 
 class DSS3Access(DSAccess):
@@ -72,13 +90,31 @@ class DSS3Access(DSAccess):
     access_key_id: Optional[str] = None
     secret_access_key: Optional[str] = None
     credentials_name: str
+    file_format: Optional[DatasetFileFormat] = None  # inferred from key extension if None
+
+
+class DSSQLAccess(DSAccess):
+    """BaseModel for a dataset in a table of a SQL database."""
+
+    database_type: Literal[PrivateDatabaseType.SQL]  # type: ignore
+    engine: SQLEngine
+    database: str  # database name, or file path for SQLite
+    table: str
+    db_schema: Optional[str] = None
+    host: Optional[str] = None
+    port: Optional[int] = None
+    user: Optional[str] = None
+    password: Optional[str] = None
+    credentials_name: Optional[str] = None  # None if the database needs no credentials
 
 
 class DSInfo(BaseModel):
     """BaseModel for a dataset."""
 
     dataset_name: str
-    dataset_access: Annotated[Union[DSPathAccess, DSS3Access], Field(discriminator=DB_TYPE_FIELD)]
+    dataset_access: Annotated[
+        Union[DSPathAccess, DSS3Access, DSSQLAccess], Field(discriminator=DB_TYPE_FIELD)
+    ]
     metadata_access: Annotated[Union[DSPathAccess, DSS3Access], Field(discriminator=DB_TYPE_FIELD)]
 
 
@@ -236,3 +272,22 @@ class Metadata(BaseModel):
             Discriminator(get_column_metadata_discriminator),
         ],
     ]
+
+
+# Jobs
+# -----------------------------------------------------------------------------
+
+
+class Job(BaseModel):
+    """BaseModel for an asynchronous query job in the jobs collection."""
+
+    job_id: str = Field(default_factory=lambda: uuid4().hex)
+    user_name: str
+    dataset_name: str
+    dp_library: DPLibraries
+    status: JobStatus = JobStatus.PENDING
+    submitted_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[LomasServerExceptionAlias] = None
@@ -1,9 +1,23 @@
-from typing import Annotated, List, Literal, Union
+from typing import Annotated, List, Literal, Optional, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
 from lomas_core.models.constants import (
+    BUDGET_RESERVATION_TTL,
+    COST_CACHE_MAX_ENTRIES,
+    COST_CACHE_TTL,
+    DATASET_CACHE_MAX_MEMORY,
+    DATASET_WARMUP_MAX_WORKERS,
+    FITTED_MODEL_STORE_MAX_ENTRIES,
+    FITTED_MODEL_STORE_TTL,
+    JOB_QUEUE_MAX_SIZE,
+    JOB_WORKERS,
+    MAX_CONCURRENT_QUERIES,
+    S3_DOWNLOAD_MAX_BUFFER,
+    S3_DOWNLOAD_MAX_CONCURRENCY,
+    S3_DOWNLOAD_PART_SIZE,
     AdminDBType,
+    CSVEngine,
     PrivateDatabaseType,
     TimeAttackMethod,
 )
@@ -50,6 +64,8 @@ class MongoDBConfig(DBConfig):
     max_pool_size: int
     min_pool_size: int
     max_connecting: int
+    # Creates the missing indexes of the admin database at startup
+    create_indexes: bool = True
 
 
 class PrivateDBCredentials(BaseModel):
@@ -67,6 +83,17 @@ class S3CredentialsConfig(PrivateDBCredentials):
     secret_access_key: str
 
 
+class SQLCredentialsConfig(PrivateDBCredentials):
+    """BaseModel for SQL database credentials."""
+
+    model_config = ConfigDict(extra="allow")
+
+    db_type: Literal[PrivateDatabaseType.SQL]  # type: ignore
+    credentials_name: str
+    user: str
+    password: str
+
+
 class OpenDPConfig(BaseModel):
     """BaseModel for openDP librairy config."""
 
@@ -81,6 +108,107 @@ class DPLibraryConfig(BaseModel):
     opendp: OpenDPConfig
 
 
+class DatasetCacheConfig(BaseModel):
+    """BaseModel for the server-wide cache of loaded private datasets."""
+
+    # Memory budget of the cache in bytes, 0 disables the cache.
+    max_memory_bytes: Annotated[int, Field(ge=0)] = DATASET_CACHE_MAX_MEMORY
+    # Time between two revalidations of the cached datasets against their
+    # source, 0 disables the periodic refresh.
+    refresh_interval_seconds: Annotated[float, Field(ge=0)] = 0
+
+
+class CostCacheConfig(BaseModel):
+    """BaseModel for the server-wide cache of the estimated query costs."""
+
+    # Maximum number of cached costs, least recently used ones are evicted
+    # first, 0 disables the cache.
+    max_entries: Annotated[int, Field(ge=0)] = COST_CACHE_MAX_ENTRIES
+    # Time after which a cached cost is estimated again, 0 disables the cache.
+    ttl_seconds: Annotated[float, Field(ge=0)] = COST_CACHE_TTL
+
+
+class FittedModelStoreConfig(BaseModel):
+    """BaseModel for the store of the models fitted by cost estimations, reused by the queries."""
+
+    # Whether a query reuses the model fitted by the matching cost estimation.
+    enabled: bool = False
+    # Maximum number of fitted models kept, least recently stored ones are
+    # dropped first.
+    max_entries: Annotated[int, Field(ge=0)] = FITTED_MODEL_STORE_MAX_ENTRIES
+    # Time after which a fitted model is dropped if no query used it.
+    ttl_seconds: Annotated[float, Field(ge=0)] = FITTED_MODEL_STORE_TTL
+
+
+class JobsConfig(BaseModel):
+    """BaseModel for the queue of asynchronous query jobs."""
+
+    # Maximum number of jobs waiting for a worker, submissions are rejected above.
+    max_queue_size: Annotated[int, Field(ge=1)] = JOB_QUEUE_MAX_SIZE
+    # Number of jobs run in parallel.
+    nb_workers: Annotated[int, Field(ge=1)] = JOB_WORKERS
+
+
+class BudgetReservationsConfig(BaseModel):
+    """BaseModel for the budget reserved by the running queries of the users."""
+
+    # Maximum number of queries of a user running at the same time.
+    max_concurrent_queries: Annotated[int, Field(ge=1)] = MAX_CONCURRENT_QUERIES
+    # Reservations of queries running longer, or whose server crashed, are no longer counted.
+    ttl_seconds: Annotated[float, Field(gt=0)] = BUDGET_RESERVATION_TTL
+
+
+class ProcessPoolsConfig(BaseModel):
+    """BaseModel for the process pools running the cost estimations and queries of each library."""
+
+    # Number of processes per library, 0 runs the library in the threads of the server.
+    smartnoise_sql: Annotated[int, Field(ge=0)] = 0
+    smartnoise_synth: Annotated[int, Field(ge=0)] = 0
+    opendp: Annotated[int, Field(ge=0)] = 0
+    diffprivlib: Annotated[int, Field(ge=0)] = 0
+
+
+class DatasetWarmupConfig(BaseModel):
+    """BaseModel for the preloading of private datasets at server startup."""
+
+    # Names of the datasets to preload, or "all", an empty list disables the warm-up.
+    datasets: Union[Literal["all"], List[str]] = []
+    # Number of datasets loaded in parallel.
+    max_workers: Annotated[int, Field(ge=1)] = DATASET_WARMUP_MAX_WORKERS
+
+
+class DatasetStoreConfig(BaseModel):
+    """BaseModel for the local store of memory-mapped private datasets."""
+
+    # Local directory of the materialized datasets, None disables the store.
+    # Must be shared by all the server workers, and dedicated to the store as
+    # it holds copies of the private datasets (created with mode 0700).
+    directory: Optional[str] = None
+
+
+class CSVReaderConfig(BaseModel):
+    """BaseModel for the parsing of private datasets in CSV files."""
+
+    # Parser of the CSV files. The multi-threaded pyarrow parser is opt-in:
+    # it only parses ISO datetimes and has its own NA tokens.
+    engine: CSVEngine = CSVEngine.PANDAS
+    # Threads of the pyarrow readers, None for the number of CPUs.
+    nb_threads: Optional[Annotated[int, Field(ge=1)]] = None
+
+
+class S3DownloadConfig(BaseModel):
+    """BaseModel for the download of private datasets from S3."""
+
+    # Size of the byte ranges downloaded in parallel.
+    part_size_bytes: Annotated[int, Field(gt=0)] = S3_DOWNLOAD_PART_SIZE
+    # Number of byte ranges downloaded concurrently, 1 streams the object.
+    max_concurrency: Annotated[int, Field(ge=1)] = S3_DOWNLOAD_MAX_CONCURRENCY
+    # Larger objects are reassembled in a local spill file instead of memory.
+    max_buffer_bytes: Annotated[int, Field(ge=0)] = S3_DOWNLOAD_MAX_BUFFER
+    # Directory of the spill files, None for the system temporary directory.
+    spill_directory: Optional[str] = None
+
+
 class Config(BaseModel):
     """Server runtime config."""
 
@@ -95,6 +223,28 @@ class Config(BaseModel):
 
     admin_database: Annotated[Union[MongoDBConfig, YamlDBConfig], Field(discriminator="db_type")]
 
-    private_db_credentials: List[Union[S3CredentialsConfig]] = Field(..., discriminator="db_type")
+    private_db_credentials: List[Union[S3CredentialsConfig, SQLCredentialsConfig]] = Field(
+        ..., discriminator="db_type"
+    )
 
     dp_libraries: DPLibraryConfig
+
+    dataset_cache: DatasetCacheConfig = DatasetCacheConfig()
+
+    dataset_store: DatasetStoreConfig = DatasetStoreConfig()
+
+    dataset_warmup: DatasetWarmupConfig = DatasetWarmupConfig()
+
+    s3_download: S3DownloadConfig = S3DownloadConfig()
+
+    csv_reader: CSVReaderConfig = CSVReaderConfig()
+
+    cost_cache: CostCacheConfig = CostCacheConfig()
+
+    fitted_model_store: FittedModelStoreConfig = FittedModelStoreConfig()
+
+    jobs: JobsConfig = JobsConfig()
+
+    budget_reservations: BudgetReservationsConfig = BudgetReservationsConfig()
+
+    process_pools: ProcessPoolsConfig = ProcessPoolsConfig()
@@ -72,12 +72,72 @@ class TimeAttackMethod(StrEnum):
     STALL = "stall"
 
 
+# Dataset cache
+DATASET_CACHE_MAX_MEMORY = 2 * 1024**3  # 2 GiB
+DATASET_WARMUP_MAX_WORKERS = 4
+
+# Cost estimation cache
+COST_CACHE_MAX_ENTRIES = 1024
+COST_CACHE_TTL = 3600  # 1 hour
+FITTED_MODEL_STORE_MAX_ENTRIES = 64
+FITTED_MODEL_STORE_TTL = 600  # 10 minutes
+
+# Batch queries
+BATCH_QUERY_MAX_SIZE = 100
+
+# Budget reservations of running queries
+MAX_CONCURRENT_QUERIES = 4
+BUDGET_RESERVATION_TTL = 3600  # 1 hour
+
+# Asynchronous jobs
+JOB_QUEUE_MAX_SIZE = 100
+JOB_WORKERS = 2
+
+
+class JobStatus(StrEnum):
+    """Status of an asynchronous query job."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETE = "complete"
+    FAILED = "failed"
+
+
+# S3 download
+S3_DOWNLOAD_PART_SIZE = 16 * 1024**2  # 16 MiB
+S3_DOWNLOAD_MAX_CONCURRENCY = 8
+S3_DOWNLOAD_MAX_BUFFER = 512 * 1024**2  # 512 MiB
+
+
 # Private Databases
 class PrivateDatabaseType(StrEnum):
     """Type of Private Database for the private data."""
 
     PATH = "PATH_DB"
     S3 = "S3_DB"
+    SQL = "SQL_DB"
+
+
+class SQLEngine(StrEnum):
+    """Engine of a SQL private database."""
+
+    POSTGRES = "postgres"
+    SQLITE = "sqlite"
+
+
+class DatasetFileFormat(StrEnum):
+    """File format of a private dataset."""
+
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"  # Arrow IPC file format, also known as Feather V2
+
+
+class CSVEngine(StrEnum):
+    """Parser of the private datasets in CSV files."""
+
+    PANDAS = "pandas"  # single-threaded pandas C parser
+    PYARROW = "pyarrow"  # multi-threaded pyarrow parser
 
 
 # Exceptions
@@ -1,6 +1,6 @@
 from typing import List, Optional, Union
 
-from pydantic import BaseModel, ConfigDict, Field
+from pydantic import BaseModel, ConfigDict, Field, model_validator
 
 from lomas_core.constants import (
     DPLibraries,
@@ -8,7 +8,7 @@ from lomas_core.constants import (
     SSynthMarginalSynthesizer,
 )
 from lomas_core.error_handler import InternalServerException
-from lomas_core.models.constants import JSON_SCHEMA_EXAMPLES
+from lomas_core.models.constants import BATCH_QUERY_MAX_SIZE, JSON_SCHEMA_EXAMPLES
 from lomas_core.models.requests_examples import (
     example_diffprivlib,
     example_dummy_diffprivlib,
@@ -16,7 +16,9 @@ from lomas_core.models.requests_examples import (
     example_dummy_smartnoise_sql,
     example_dummy_smartnoise_synth_query,
     example_opendp,
+    example_opendp_batch,
     example_smartnoise_sql,
+    example_smartnoise_sql_batch,
     example_smartnoise_sql_cost,
     example_smartnoise_synth_cost,
     example_smartnoise_synth_query,
@@ -237,6 +239,49 @@ class DiffPrivLibDummyQueryModel(DiffPrivLibQueryModel, DummyQueryModel):
     model_config = ConfigDict(json_schema_extra={JSON_SCHEMA_EXAMPLES: [example_dummy_diffprivlib]})
 
 
+# Batches
+# ----------------------------------------------------------------------------
+class BatchQueryModel(LomasRequestModel):
+    """
+    Base input model for a batch of queries on one dataset.
+
+    The queries of a batch are charged and archived together: either
+    all of them are executed or none of them is.
+    """
+
+    queries: List[QueryModel] = Field(..., min_length=1, max_length=BATCH_QUERY_MAX_SIZE)
+    """The queries of the batch, in order."""
+
+    @model_validator(mode="after")
+    def validate_dataset_name(self):
+        """Makes sure all queries are on the dataset of the batch."""
+        if any(query.dataset_name != self.dataset_name for query in self.queries):  # pylint: disable=E1133
+            raise ValueError("All queries of a batch should be on the dataset of the batch.")
+        return self
+
+
+class SmartnoiseSQLBatchQueryModel(BatchQueryModel):
+    """Input model for a batch of smartnoise-sql queries."""
+
+    model_config = ConfigDict(json_schema_extra={JSON_SCHEMA_EXAMPLES: [example_smartnoise_sql_batch]})
+
+    queries: List[SmartnoiseSQLQueryModel] = Field(  # type: ignore [assignment]
+        ..., min_length=1, max_length=BATCH_QUERY_MAX_SIZE
+    )
+    """The smartnoise-sql queries of the batch, in order."""
+
+
+class OpenDPBatchQueryModel(BatchQueryModel):
+    """Input model for a batch of opendp queries."""
+
+    model_config = ConfigDict(json_schema_extra={JSON_SCHEMA_EXAMPLES: [example_opendp_batch]})
+
+    queries: List[OpenDPQueryModel] = Field(  # type: ignore [assignment]
+        ..., min_length=1, max_length=BATCH_QUERY_MAX_SIZE
+    )
+    """The opendp queries of the batch, in order."""
+
+
 # Utils
 # ----------------------------------------------------------------------------
 
@@ -66,6 +66,11 @@ example_smartnoise_sql["postprocess"] = True
 
 example_dummy_smartnoise_sql: Dict[str, JsonValue] = make_dummy(example_smartnoise_sql)
 
+example_smartnoise_sql_batch: Dict[str, JsonValue] = {
+    "dataset_name": PENGUIN_DATASET,
+    "queries": [example_smartnoise_sql, example_smartnoise_sql],
+}
+
 # Smartnoise-Synth
 # -----------------------------------------------------------------------------
 
@@ -157,6 +162,11 @@ example_opendp: Dict[str, JsonValue] = {
 }
 example_dummy_opendp: Dict[str, JsonValue] = make_dummy(example_opendp)
 
+example_opendp_batch: Dict[str, JsonValue] = {
+    "dataset_name": PENGUIN_DATASET,
+    "queries": [example_opendp, example_opendp],
+}
+
 # DiffPrivLib
 # -----------------------------------------------------------------------------
 
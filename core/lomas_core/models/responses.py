@@ -1,4 +1,5 @@
-from typing import Annotated, Dict, List, Literal, Union
+from datetime import datetime
+from typing import Annotated, Dict, List, Literal, Optional, Union
 
 import pandas as pd
 from diffprivlib.validation import DiffprivlibMixin
@@ -14,6 +15,8 @@ from pydantic import (
 from snsynth import Synthesizer
 
 from lomas_core.constants import DPLibraries
+from lomas_core.models.constants import JobStatus
+from lomas_core.models.exceptions import LomasServerExceptionAlias
 from lomas_core.models.utils import (
     dataframe_from_dict,
     dataframe_to_dict,
@@ -196,3 +199,37 @@ class QueryResponse(CostResponse):
         Discriminator("res_type"),
     ]
     """The query result object."""
+
+
+class BatchQueryResponse(CostResponse):
+    """Response to batches of Lomas queries, with the total cost of the batch."""
+
+    requested_by: str
+    """The user that triggered the batch."""
+    responses: List[QueryResponse]
+    """The responses to the queries of the batch, in order."""
+
+
+# Jobs
+# -----------------------------------------------------------------------------
+
+
+class JobResponse(ResponseModel):
+    """Model for responses to the submission and status of asynchronous query jobs."""
+
+    model_config = ConfigDict(use_attribute_docstrings=True)
+
+    job_id: str
+    """The identifier of the job."""
+    dp_library: DPLibraries
+    """The DP library of the query."""
+    status: JobStatus
+    """The status of the job."""
+    submitted_at: datetime
+    """The time the job was submitted."""
+    started_at: Optional[datetime] = None
+    """The time a worker started the job, if started."""
+    finished_at: Optional[datetime] = None
+    """The time the job completed or failed, if finished."""
+    error: Optional[LomasServerExceptionAlias] = None
+    """The error of the query, if the job failed."""
@@ -0,0 +1,95 @@
+"""Benchmark of the csv parsers of the data connectors.
+
+Generates dummy datasets of the penguin metadata, with an additional
+datetime column, and times the loading of the csv file by the pandas
+and pyarrow engines.
+
+Usage (from the server directory):
+    python benchmarks/benchmark_csv_reader.py --nb_rows 100000 1000000 10000000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import List, Optional
+
+import yaml
+
+from lomas_core.models.collections import Metadata
+from lomas_core.models.config import CSVReaderConfig
+from lomas_core.models.constants import CSVEngine
+from lomas_server.data_connector.data_connector import set_csv_reader_config
+from lomas_server.data_connector.path_connector import PathConnector
+from lomas_server.dp_queries.dummy_dataset import make_dummy_dataset
+
+METADATA_PATH = "lomas_server/tests/test_data/metadata/penguin_metadata.yaml"
+NB_REPEATS = 3
+
+
+def get_metadata() -> Metadata:
+    """Gets the penguin metadata with an additional datetime column.
+
+    Returns:
+        Metadata: The benchmark metadata.
+    """
+    with open(METADATA_PATH, encoding="utf-8") as f:
+        metadata = yaml.safe_load(f)
+    metadata["columns"]["birthday"] = {
+        "type": "datetime",
+        "lower": "2000-01-01",
+        "upper": "2020-01-01",
+    }
+    return Metadata.model_validate(metadata)
+
+
+def time_engine(metadata: Metadata, path: str, engine: CSVEngine, nb_threads: Optional[int]) -> float:
+    """Times the loading of a csv file, best of NB_REPEATS.
+
+    Args:
+        metadata (Metadata): The dataset metadata.
+        path (str): The csv file path.
+        engine (CSVEngine): The csv parser.
+        nb_threads (Optional[int]): The threads of the pyarrow parser.
+
+    Returns:
+        float: The loading time in seconds.
+    """
+    set_csv_reader_config(CSVReaderConfig(engine=engine, nb_threads=nb_threads))
+    timings = []
+    for _ in range(NB_REPEATS):
+        start = time.perf_counter()
+        PathConnector(metadata, path).read_dataset()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(nb_rows_list: List[int], nb_threads: Optional[int]) -> None:
+    """Runs the benchmark and prints a table of the loading times.
+
+    Args:
+        nb_rows_list (List[int]): The sizes of the generated datasets.
+        nb_threads (Optional[int]): The threads of the pyarrow parser.
+    """
+    metadata = get_metadata()
+    print(f"{'rows':>10} {'size (MB)':>10} {'pandas (s)':>11} {'pyarrow (s)':>12} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for nb_rows in nb_rows_list:
+            path = os.path.join(tmp_dir, f"dataset_{nb_rows}.csv")
+            make_dummy_dataset(metadata, nb_rows).to_csv(path, index=False)
+
+            pandas_time = time_engine(metadata, path, CSVEngine.PANDAS, nb_threads)
+            pyarrow_time = time_engine(metadata, path, CSVEngine.PYARROW, nb_threads)
+            print(
+                f"{nb_rows:>10} {os.path.getsize(path) / 1024**2:>10.1f} {pandas_time:>11.3f} "
+                + f"{pyarrow_time:>12.3f} {pandas_time / pyarrow_time:>7.1f}x"
+            )
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawTextHelpFormatter)
+    parser.add_argument("--nb_rows", type=int, nargs="+", default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument("--nb_threads", type=int, default=None, help="defaults to the number of CPUs")
+    args = parser.parse_args()
+    main(args.nb_rows, args.nb_threads)
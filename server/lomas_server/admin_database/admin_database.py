@@ -2,14 +2,25 @@ import argparse
 import time
 from abc import ABC, abstractmethod
 from functools import wraps
-from typing import Callable, Dict, List
+from typing import Callable, Dict, List, Optional, Union
 
 from lomas_core.error_handler import (
     InvalidQueryException,
     UnauthorizedAccessException,
 )
-from lomas_core.models.collections import DSInfo, Metadata
-from lomas_core.models.requests import LomasRequestModel, model_input_to_lib
+from lomas_core.models.collections import (
+    BudgetReservation,
+    DatasetOfUser,
+    DSInfo,
+    Job,
+    Metadata,
+)
+from lomas_core.models.config import BudgetReservationsConfig
+from lomas_core.models.requests import (
+    LomasRequestModel,
+    QueryModel,
+    model_input_to_lib,
+)
 from lomas_core.models.responses import QueryResponse
 from lomas_server.admin_database.constants import BudgetDBKey
 
@@ -107,9 +118,110 @@ def user_must_have_access_to_dataset(
     return wrapper_decorator
 
 
-class AdminDatabase(ABC):
+def get_active_reservations(user: dict, now: float) -> List[dict]:
+    """
+    Gets the budget reservations of a user which have not expired.
+
+    Args:
+        user (dict): The user document.
+        now (float): The current timestamp.
+
+    Returns:
+        List[dict]: The reservations of the running queries of the user.
+    """
+    return [r for r in user.get("reservations", []) if r["expires_at"] > now]
+
+
+def get_available_budget(user: dict, dataset_name: str, now: float) -> Optional[List[float]]:
+    """
+    Gets the available budget (initial - total spent - reserved) of a user on a dataset.
+
+    Args:
+        user (dict): The user document.
+        dataset_name (str): name of the dataset
+        now (float): The current timestamp.
+
+    Returns:
+        Optional[List[float]]: The available epsilon and delta, None if the
+            user does not have access to the dataset.
+    """
+    budget = next((ds for ds in user["datasets_list"] if ds["dataset_name"] == dataset_name), None)
+    if budget is None:
+        return None
+    reservations = [r for r in get_active_reservations(user, now) if r["dataset_name"] == dataset_name]
+    return [
+        budget[BudgetDBKey.EPSILON_INIT]
+        - budget[BudgetDBKey.EPSILON_SPENT]
+        - sum(r["epsilon"] for r in reservations),
+        budget[BudgetDBKey.DELTA_INIT]
+        - budget[BudgetDBKey.DELTA_SPENT]
+        - sum(r["delta"] for r in reservations),
+    ]
+
+
+def get_reservation_error(
+    user: Optional[dict],
+    user_name: str,
+    dataset_name: str,
+    max_concurrent_queries: int,
+    now: float,
+) -> Union[InvalidQueryException, UnauthorizedAccessException]:
+    """
+    Gets the reason why a budget reservation was refused, from the user document.
+
+    Args:
+        user (Optional[dict]): The user document, None if the user does not exist.
+        user_name (str): name of the user
+        dataset_name (str): name of the dataset
+        max_concurrent_queries (int): The maximum number of running queries of a user.
+        now (float): The timestamp of the reservation.
+
+    Returns:
+        Union[InvalidQueryException, UnauthorizedAccessException]: The exception to raise.
+    """
+    if user is None:
+        return UnauthorizedAccessException(
+            f"User {user_name} does not exist. Please, verify the client object initialisation.",
+        )
+    available = get_available_budget(user, dataset_name, now)
+    if available is None:
+        return UnauthorizedAccessException(f"{user_name} does not have access to {dataset_name}.")
+    if not user["may_query"]:
+        return UnauthorizedAccessException(f"User {user_name} is not allowed to query.")
+    if len(get_active_reservations(user, now)) >= max_concurrent_queries:
+        return UnauthorizedAccessException(
+            f"User {user_name} is trying to run more than {max_concurrent_queries} queries at the same time."
+        )
+    return InvalidQueryException(
+        "Not enough budget for this query epsilon remaining "
+        f"{available[0]}, delta remaining {available[1]}."
+    )
+
+
+def get_expired_reservation_error(user_name: str, reservation: BudgetReservation) -> InvalidQueryException:
+    """
+    Gets the error of a commit whose reservation expired, without enough budget left.
+
+    Args:
+        user_name (str): name of the user
+        reservation (BudgetReservation): The expired reservation.
+
+    Returns:
+        InvalidQueryException: The exception to raise.
+    """
+    return InvalidQueryException(
+        f"The budget reservation of {user_name} on {reservation.dataset_name} expired before "
+        "the query completed and the remaining budget no longer covers it. "
+        "The result is discarded and no budget was spent."
+    )
+
+
+class AdminDatabase(ABC):  # pylint: disable=R0904
     """Overall database management for server state."""
 
+    # Limits of the budget reservations, see set_reservations_config.
+    reservations_config: BudgetReservationsConfig = BudgetReservationsConfig()
+
     @abstractmethod
     def __init__(self, **connection_parameters: Dict[str, str]) -> None:
         """
@@ -144,6 +256,15 @@ class AdminDatabase(ABC):
             bool: True if the dataset exists, False otherwise.
         """
 
+    @abstractmethod
+    def get_list_of_datasets(self) -> List[str]:
+        """
+        Gets the names of all the datasets in the database.
+
+        Returns:
+            List[str]: The list of dataset names.
+        """
+
     @abstractmethod
     @dataset_must_exist
     @user_must_have_access_to_dataset
@@ -166,7 +287,7 @@ class AdminDatabase(ABC):
         """
         Sets if a user may query the server..
 
-        (Set False before querying and True after updating budget)
+        (Administrators set it to False to block the queries of a user)
 
         Wrapped by :py:func:`user_must_exist`.
 
@@ -177,39 +298,36 @@ class AdminDatabase(ABC):
 
     @abstractmethod
     @user_must_exist
-    def get_and_set_may_user_query(self, user_name: str, may_query: bool) -> bool:
+    def has_user_access_to_dataset(self, user_name: str, dataset_name: str) -> bool:
         """
-        Atomic operation to check and set if the user may query the server.
-
-        (Set False before querying and True after updating budget)
+        Checks if a user may access a particular dataset.
 
         Wrapped by :py:func:`user_must_exist`.
 
         Args:
             user_name (str): name of the user
-            may_query (bool): flag give or remove access to user
+            dataset_name (str): name of the dataset
 
         Returns:
-            bool: The may_query status of the user before the update.
+            bool: True if the user has access, False otherwise.
         """
 
     @abstractmethod
-    @user_must_exist
-    def has_user_access_to_dataset(self, user_name: str, dataset_name: str) -> bool:
+    @user_must_have_access_to_dataset
+    def get_budget_snapshot(self, user_name: str, dataset_name: str) -> DatasetOfUser:
         """
-        Checks if a user may access a particular dataset.
+        Get the initial and total spent budgets of a user on a dataset, in one lookup.
 
-        Wrapped by :py:func:`user_must_exist`.
+        Wrapped by :py:func:`user_must_have_access_to_dataset`.
 
         Args:
             user_name (str): name of the user
             dataset_name (str): name of the dataset
 
         Returns:
-            bool: True if the user has access, False otherwise.
+            DatasetOfUser: The budgets of the user on the dataset.
         """
 
-    @abstractmethod
     def get_epsilon_or_delta(self, user_name: str, dataset_name: str, parameter: BudgetDBKey) -> float:
         """
         Get the total spent epsilon or delta by user on dataset.
@@ -222,6 +340,7 @@ class AdminDatabase(ABC):
         Returns:
             float: The requested budget value.
         """
+        return getattr(self.get_budget_snapshot(user_name, dataset_name), parameter)
 
     @user_must_have_access_to_dataset
     def get_total_spent_budget(self, user_name: str, dataset_name: str) -> List[float]:
@@ -238,10 +357,8 @@ class AdminDatabase(ABC):
             List[float]: The first value of the list is the epsilon value,
                 the second value is the delta value.
         """
-        return [
-            self.get_epsilon_or_delta(user_name, dataset_name, BudgetDBKey.EPSILON_SPENT),
-            self.get_epsilon_or_delta(user_name, dataset_name, BudgetDBKey.DELTA_SPENT),
-        ]
+        budget = self.get_budget_snapshot(user_name, dataset_name)
+        return [budget.total_spent_epsilon, budget.total_spent_delta]
 
     @user_must_have_access_to_dataset
     def get_initial_budget(self, user_name: str, dataset_name: str) -> List[float]:
@@ -258,10 +375,8 @@ class AdminDatabase(ABC):
             List[float]: The first value of the list is the epsilon value,
                 the second value is the delta value.
         """
-        return [
-            self.get_epsilon_or_delta(user_name, dataset_name, BudgetDBKey.EPSILON_INIT),
-            self.get_epsilon_or_delta(user_name, dataset_name, BudgetDBKey.DELTA_INIT),
-        ]
+        budget = self.get_budget_snapshot(user_name, dataset_name)
+        return [budget.initial_epsilon, budget.initial_delta]
 
     @user_must_have_access_to_dataset
     def get_remaining_budget(self, user_name: str, dataset_name: str) -> List[float]:
@@ -278,9 +393,11 @@ class AdminDatabase(ABC):
             List[float]: The first value of the list is the epsilon value,
                 the second value is the delta value.
         """
-        init_eps, init_delta = self.get_initial_budget(user_name, dataset_name)
-        spent_eps, spent_delta = self.get_total_spent_budget(user_name, dataset_name)
-        return [init_eps - spent_eps, init_delta - spent_delta]
+        budget = self.get_budget_snapshot(user_name, dataset_name)
+        return [
+            budget.initial_epsilon - budget.total_spent_epsilon,
+            budget.initial_delta - budget.total_spent_delta,
+        ]
 
     @abstractmethod
     def update_epsilon_or_delta(
@@ -344,6 +461,94 @@ class AdminDatabase(ABC):
         self.update_epsilon(user_name, dataset_name, spent_epsilon)
         self.update_delta(user_name, dataset_name, spent_delta)
 
+    def set_reservations_config(self, config: BudgetReservationsConfig) -> None:
+        """
+        Sets the limits of the budget reservations of running queries.
+
+        Args:
+            config (BudgetReservationsConfig): The budget reservations config.
+        """
+        self.reservations_config = config
+
+    def new_reservation(
+        self, dataset_name: str, epsilon: float, delta: float, now: float
+    ) -> BudgetReservation:
+        """
+        Creates the budget reservation of a query, expiring after the configured time to live.
+
+        Args:
+            dataset_name (str): name of the dataset
+            epsilon (float): epsilon cost of the query
+            delta (float): delta cost of the query
+            now (float): The current timestamp.
+
+        Returns:
+            BudgetReservation: The reservation.
+        """
+        return BudgetReservation(
+            dataset_name=dataset_name,
+            epsilon=epsilon,
+            delta=delta,
+            expires_at=now + self.reservations_config.ttl_seconds,
+        )
+
+    @abstractmethod
+    def reserve_budget(
+        self, user_name: str, dataset_name: str, epsilon: float, delta: float
+    ) -> BudgetReservation:
+        """
+        Atomic operation to check and reserve the budget of a query.
+
+        The reservation is added to the ledger of the user if the user
+        may query, runs less than the maximum number of concurrent queries
+        and has enough available budget, where the budget reserved by the
+        running queries counts as spent. Reservations expire after a time
+        to live, so that the budget of queries which never complete (for
+        instance if the server crashed) is released.
+
+        Args:
+            user_name (str): name of the user
+            dataset_name (str): name of the dataset
+            epsilon (float): epsilon cost of the query
+            delta (float): delta cost of the query
+
+        Raises:
+            InvalidQueryException: If there is not enough budget.
+            UnauthorizedAccessException: The user runs too many queries,
+                does not exist or does not have access to the dataset.
+
+        Returns:
+            BudgetReservation: The reservation, to commit or release.
+        """
+
+    @abstractmethod
+    def commit_budget(self, user_name: str, reservation: BudgetReservation) -> None:
+        """
+        Spends the budget of a reservation and removes it from the ledger of the user.
+
+        If the reservation expired while the query ran, its budget may have
+        been reserved by other queries since, so the budget is only spent if
+        the available budget still covers it, checked atomically.
+
+        Args:
+            user_name (str): name of the user
+            reservation (BudgetReservation): The reservation from :py:meth:`reserve_budget`.
+
+        Raises:
+            InvalidQueryException: If the reservation expired and there
+                is not enough budget left.
+        """
+
+    @abstractmethod
+    def release_budget(self, user_name: str, reservation: BudgetReservation) -> None:
+        """
+        Removes a reservation from the ledger of the user, without spending its budget.
+
+        Args:
+            user_name (str): name of the user
+            reservation (BudgetReservation): The reservation from :py:meth:`reserve_budget`.
+        """
+
     @abstractmethod
     @dataset_must_exist
     def get_dataset(self, dataset_name: str) -> DSInfo:
@@ -415,3 +620,36 @@ class AdminDatabase(ABC):
             query (LomasRequestModel): Request object received from client
             response (QueryResponse): Response object sent to client
         """
+
+    @abstractmethod
+    def save_queries(self, user_name: str, queries: List[QueryModel], responses: List[QueryResponse]) -> None:
+        """
+        Save a batch of queries of user on a dataset, in a single write.
+
+        Args:
+            user_name (str): name of the user
+            queries (List[QueryModel]): Request objects received from client
+            responses (List[QueryResponse]): Response objects sent to client,
+                in the order of the queries
+        """
+
+    @abstractmethod
+    def save_job(self, job: Job) -> None:
+        """
+        Saves (inserts or replaces) an asynchronous query job.
+
+        Args:
+            job (Job): The job, identified by its job_id.
+        """
+
+    @abstractmethod
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """
+        Gets an asynchronous query job.
+
+        Args:
+            job_id (str): The identifier of the job.
+
+        Returns:
+            Optional[Job]: The job, None if there is no such job.
+        """
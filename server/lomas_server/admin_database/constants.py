@@ -1,4 +1,7 @@
 from enum import StrEnum
+from typing import Any, Dict, List, Tuple
+
+from pymongo import ASCENDING
 
 
 class BudgetDBKey(StrEnum):
@@ -15,3 +18,28 @@ class BudgetDBKey(StrEnum):
 
 
 WRITE_CONCERN_LEVEL = "majority"
+
+# Indexes of the admin MongoDB: (collection, keys, create_index options).
+# Metadata documents added before they had a dataset_name field are not indexed.
+MONGODB_INDEXES: List[Tuple[str, List[Tuple[str, int]], Dict[str, Any]]] = [
+    ("users", [("user_name", ASCENDING)], {"unique": True}),
+    ("datasets", [("dataset_name", ASCENDING)], {"unique": True}),
+    (
+        "metadata",
+        [("dataset_name", ASCENDING)],
+        {"unique": True, "partialFilterExpression": {"dataset_name": {"$exists": True}}},
+    ),
+    (
+        "queries_archives",
+        [("user_name", ASCENDING), ("dataset_name", ASCENDING), ("timestamp", ASCENDING)],
+        {},
+    ),
+    ("jobs", [("job_id", ASCENDING)], {"unique": True}),
+]
+
+# Version of the {dataset_name, version, metadata} layout of the metadata
+# documents, replacing the legacy {<dataset_name>: metadata} layout.
+METADATA_SCHEMA_VERSION = 2
+
+# Number of metadata documents migrated per bulk write
+METADATA_MIGRATION_BATCH_SIZE = 100
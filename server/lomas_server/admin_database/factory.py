@@ -24,7 +24,7 @@ def admin_database_factory(config: DBConfig) -> AdminDatabase:
         case MongoDBConfig():
             db_url = get_mongodb_url(config)
             db_name = config.db_name
-            return AdminMongoDatabase(db_url, db_name)
+            return AdminMongoDatabase(db_url, db_name, config.create_indexes)
 
         case YamlDBConfig():
             yaml_database_file = config.db_file
@@ -1,22 +1,38 @@
-from typing import List
+import logging
+import time
+from typing import List, Optional, Tuple
 
 from opentelemetry.instrumentation.pymongo import PymongoInstrumentor
-from pymongo import MongoClient, ReturnDocument, WriteConcern
+from pymongo import ASCENDING, MongoClient, WriteConcern
 from pymongo.database import Database
-from pymongo.errors import WriteConcernError
+from pymongo.errors import OperationFailure, WriteConcernError
 from pymongo.results import _WriteResult
 
 from lomas_core.error_handler import InvalidQueryException
-from lomas_core.models.collections import DSInfo, Metadata
-from lomas_core.models.requests import LomasRequestModel
+from lomas_core.models.collections import (
+    BudgetReservation,
+    DatasetOfUser,
+    DSInfo,
+    Job,
+    Metadata,
+)
+from lomas_core.models.requests import LomasRequestModel, QueryModel
 from lomas_core.models.responses import QueryResponse
 from lomas_server.admin_database.admin_database import (
     AdminDatabase,
     dataset_must_exist,
+    get_expired_reservation_error,
+    get_reservation_error,
     user_must_exist,
     user_must_have_access_to_dataset,
 )
-from lomas_server.admin_database.constants import WRITE_CONCERN_LEVEL, BudgetDBKey
+from lomas_server.admin_database.constants import (
+    METADATA_SCHEMA_VERSION,
+    MONGODB_INDEXES,
+    WRITE_CONCERN_LEVEL,
+    BudgetDBKey,
+)
+from lomas_server.admin_database.request_context import memoize_in_request
 from lomas_server.utils.metrics import (
     MONGO_ERROR_COUNTER,
     MONGO_INSERT_COUNTER,
@@ -28,16 +44,23 @@ from lomas_server.utils.metrics import (
 class AdminMongoDatabase(AdminDatabase):
     """Overall MongoDB database management for server state."""
 
-    def __init__(self, connection_string: str, database_name: str) -> None:
-        """Connect to database.
+    def __init__(self, connection_string: str, database_name: str, create_indexes: bool = True) -> None:
+        """Connect to database and check its indexes.
 
         Args:
             connection_string (str): Connection string to the mongodb
             database_name (str): Mongodb database name.
+            create_indexes (bool, optional): Whether to create the missing
+                indexes. Defaults to True.
         """
         PymongoInstrumentor().instrument()
         self.db: Database = MongoClient(connection_string)[database_name]
 
+        if create_indexes:
+            ensure_indexes(self.db)
+        for missing_index in get_missing_indexes(self.db):
+            logging.warning(f"Missing index of the admin database: {missing_index}.")
+
     def does_user_exist(self, user_name: str) -> bool:
         """Checks if user exist in the database.
 
@@ -47,10 +70,30 @@ class AdminMongoDatabase(AdminDatabase):
         Returns:
             bool: True if the user exists, False otherwise.
         """
-        MONGO_QUERY_COUNTER.add(1, {"operation": "does_user_exist"})
-        doc_count = self.db.users.count_documents({"user_name": f"{user_name}"})
-        return doc_count > 0
+        return self._get_user_datasets(user_name) is not None
+
+    @memoize_in_request
+    def _get_user_datasets(self, user_name: str) -> Optional[List[str]]:
+        """Gets the names of the datasets a user has access to.
 
+        Memoized for the request, so that the existence and access checks
+        of the same user fetch the user document once.
+
+        Args:
+            user_name (str): name of the user
+
+        Returns:
+            Optional[List[str]]: The dataset names, None if the user does not exist.
+        """
+        MONGO_QUERY_COUNTER.add(1, {"operation": "get_user_datasets"})
+        user = self.db.users.find_one(
+            {"user_name": f"{user_name}"}, {"_id": 0, "datasets_list.dataset_name": 1}
+        )
+        if user is None:
+            return None
+        return [ds["dataset_name"] for ds in user.get("datasets_list", [])]
+
+    @memoize_in_request
     def does_dataset_exist(self, dataset_name: str) -> bool:
         """Checks if dataset exist in the database.
 
@@ -61,12 +104,16 @@ class AdminMongoDatabase(AdminDatabase):
             bool: True if the dataset exists, False otherwise.
         """
         MONGO_QUERY_COUNTER.add(1, {"operation": "does_dataset_exist"})
-        collection_query = self.db.datasets.find({})
-        for document in collection_query:
-            if document["dataset_name"] == dataset_name:
-                return True
+        return self.db.datasets.count_documents({"dataset_name": f"{dataset_name}"}, limit=1) > 0
+
+    def get_list_of_datasets(self) -> List[str]:
+        """Gets the names of all the datasets in the database.
 
-        return False
+        Returns:
+            List[str]: The list of dataset names.
+        """
+        MONGO_QUERY_COUNTER.add(1, {"operation": "get_list_of_datasets"})
+        return [document["dataset_name"] for document in self.db.datasets.find({}, {"dataset_name": 1})]
 
     @dataset_must_exist
     def get_dataset_metadata(self, dataset_name: str) -> Metadata:
@@ -81,14 +128,14 @@ class AdminMongoDatabase(AdminDatabase):
             Metadata: The metadata model.
         """
         MONGO_QUERY_COUNTER.add(1, {"operation": "get_dataset_metadata"})
-        metadatas = self.db.metadata.find_one({dataset_name: {"$exists": True}})
-        return Metadata.model_validate(metadatas[dataset_name])  # type: ignore
+        document = find_metadata_document(self.db, dataset_name)
+        return Metadata.model_validate(get_metadata_of_document(document, dataset_name))  # type: ignore
 
     @user_must_exist
     def set_may_user_query(self, user_name: str, may_query: bool) -> None:
         """Sets if a user may query the server.
 
-        (Set False before querying and True after updating budget)
+        (Administrators set it to False to block the queries of a user)
 
         Wrapped by :py:func:`user_must_exist`.
 
@@ -108,34 +155,6 @@ class AdminMongoDatabase(AdminDatabase):
         )
         check_result_acknowledged(res)
 
-    @user_must_exist
-    def get_and_set_may_user_query(self, user_name: str, may_query: bool) -> bool:
-        """
-        Atomic operation to check and set if the user may query the server.
-
-        (Set False before querying and True after updating budget)
-
-        Wrapped by :py:func:`user_must_exist`.
-
-        Args:
-            user_name (str): name of the user
-            may_query (bool): flag give or remove access to user
-
-        Returns:
-            bool: The may_query status of the user before the update.
-        """
-        MONGO_UPDATE_COUNTER.add(1, {"operation": "get_and_set_may_user_query"})
-        res = self.db.users.with_options(
-            write_concern=WriteConcern(w=WRITE_CONCERN_LEVEL, j=True)
-        ).find_one_and_update(
-            {"user_name": user_name},
-            {"$set": {"may_query": may_query}},
-            projection={"may_query": 1},
-            return_document=ReturnDocument.BEFORE,
-        )
-
-        return res["may_query"]  # type: ignore
-
     @user_must_exist
     def has_user_access_to_dataset(self, user_name: str, dataset_name: str) -> bool:
         """Checks if a user may access a particular dataset.
@@ -149,44 +168,35 @@ class AdminMongoDatabase(AdminDatabase):
         Returns:
             bool: True if the user has access, False otherwise.
         """
-        MONGO_QUERY_COUNTER.add(1, {"operation": "has_user_access_to_dataset"})
         if not self.does_dataset_exist(dataset_name):
             raise InvalidQueryException(
                 f"Dataset {dataset_name} does not exist. "
                 + "Please, verify the client object initialisation.",
             )
-        doc_count = self.db.users.count_documents(
-            {
-                "user_name": f"{user_name}",
-                "datasets_list.dataset_name": f"{dataset_name}",
-            }
-        )
-        return doc_count > 0
+        return dataset_name in (self._get_user_datasets(user_name) or [])
+
+    @user_must_have_access_to_dataset
+    def get_budget_snapshot(self, user_name: str, dataset_name: str) -> DatasetOfUser:
+        """Get the initial and total spent budgets of a user on a dataset.
+
+        The user document is found with the user_name index and only
+        the element of the dataset is projected.
 
-    def get_epsilon_or_delta(self, user_name: str, dataset_name: str, parameter: BudgetDBKey) -> float:
-        """Get total spent epsilon or delta by a user on dataset.
+        Wrapped by :py:func:`user_must_have_access_to_dataset`.
 
         Args:
             user_name (str): name of the user
             dataset_name (str): name of the dataset
-            parameter (BudgetDBKey): One of BudgetDBKey.
 
         Returns:
-            float: The requested budget value.
+            DatasetOfUser: The budgets of the user on the dataset.
         """
-        return list(
-            self.db.users.aggregate(
-                [
-                    {"$unwind": "$datasets_list"},
-                    {
-                        "$match": {
-                            "user_name": f"{user_name}",
-                            "datasets_list.dataset_name": f"{dataset_name}",
-                        }
-                    },
-                ]
-            )
-        )[0]["datasets_list"][parameter]
+        MONGO_QUERY_COUNTER.add(1, {"operation": "get_budget_snapshot"})
+        user = self.db.users.find_one(
+            {"user_name": f"{user_name}", "datasets_list.dataset_name": f"{dataset_name}"},
+            {"_id": 0, "datasets_list.$": 1},
+        )
+        return DatasetOfUser.model_validate(user["datasets_list"][0])  # type: ignore
 
     def update_epsilon_or_delta(
         self,
@@ -217,6 +227,145 @@ class AdminMongoDatabase(AdminDatabase):
         )
         check_result_acknowledged(res)
 
+    def reserve_budget(
+        self, user_name: str, dataset_name: str, epsilon: float, delta: float
+    ) -> BudgetReservation:
+        """
+        Atomic operation to check and reserve the budget of a query.
+
+        A single conditional update checks that the user may query, runs
+        less than the maximum number of concurrent queries and has enough
+        available budget, then adds the reservation to the ledger of the
+        user. The user document is only read to report why a reservation
+        is refused.
+
+        Args:
+            user_name (str): name of the user
+            dataset_name (str): name of the dataset
+            epsilon (float): epsilon cost of the query
+            delta (float): delta cost of the query
+
+        Raises:
+            InvalidQueryException: If there is not enough budget.
+            UnauthorizedAccessException: The user runs too many queries,
+                does not exist or does not have access to the dataset.
+
+        Returns:
+            BudgetReservation: The reservation, to commit or release.
+        """
+        MONGO_UPDATE_COUNTER.add(1, {"operation": "reserve_budget"})
+        now = time.time()
+        max_concurrent_queries = self.reservations_config.max_concurrent_queries
+        reservation = self.new_reservation(dataset_name, epsilon, delta, now)
+
+        active = get_active_reservations_expr(now)
+        res = self.db.users.with_options(
+            write_concern=WriteConcern(w=WRITE_CONCERN_LEVEL, j=True)
+        ).find_one_and_update(
+            {
+                "user_name": user_name,
+                "may_query": True,
+                "$expr": {
+                    "$and": [
+                        {"$lt": [{"$size": active}, max_concurrent_queries]},
+                        get_enough_budget_expr(dataset_name, epsilon, delta, now),
+                    ]
+                },
+            },
+            {"$push": {"reservations": reservation.model_dump()}},
+            projection={"_id": 1},
+        )
+        if res is None:
+            MONGO_QUERY_COUNTER.add(1, {"operation": "reserve_budget"})
+            user = self.db.users.find_one({"user_name": user_name}, {"_id": 0})
+            raise get_reservation_error(user, user_name, dataset_name, max_concurrent_queries, now)
+        return reservation
+
+    def commit_budget(self, user_name: str, reservation: BudgetReservation) -> None:
+        """
+        Spends the budget of a reservation and removes it from the ledger of the user.
+
+        Expired reservations are removed from the ledger at the same time.
+        The update only applies while the reservation is active. If it
+        expired, a second conditional update spends the budget only if
+        the available budget still covers it.
+
+        Args:
+            user_name (str): name of the user
+            reservation (BudgetReservation): The reservation from :py:meth:`reserve_budget`.
+
+        Raises:
+            InvalidQueryException: If the reservation expired and there
+                is not enough budget left.
+            WriteConcernError: If the result is not acknowledged.
+        """
+        MONGO_UPDATE_COUNTER.add(1, {"operation": "commit_budget"})
+        now = time.time()
+        users = self.db.users.with_options(write_concern=WriteConcern(w=WRITE_CONCERN_LEVEL, j=True))
+        spend = {
+            "$inc": {
+                f"datasets_list.$[ds].{BudgetDBKey.EPSILON_SPENT}": reservation.epsilon,
+                f"datasets_list.$[ds].{BudgetDBKey.DELTA_SPENT}": reservation.delta,
+            },
+            "$pull": {"reservations": get_settled_reservations_filter(reservation)},
+        }
+        array_filters = [{"ds.dataset_name": reservation.dataset_name}]
+        res = users.update_one(
+            {
+                "user_name": user_name,
+                "reservations": {
+                    "$elemMatch": {
+                        "reservation_id": reservation.reservation_id,
+                        "expires_at": {"$gt": now},
+                    }
+                },
+            },
+            spend,
+            array_filters=array_filters,
+        )
+        check_result_acknowledged(res)
+        if res.matched_count:
+            return
+
+        # The reservation expired: its budget is no longer held.
+        MONGO_UPDATE_COUNTER.add(1, {"operation": "commit_budget"})
+        res = users.update_one(
+            {
+                "user_name": user_name,
+                "$expr": get_enough_budget_expr(
+                    reservation.dataset_name, reservation.epsilon, reservation.delta, now
+                ),
+            },
+            spend,
+            array_filters=array_filters,
+        )
+        check_result_acknowledged(res)
+        if not res.matched_count:
+            self.release_budget(user_name, reservation)
+            raise get_expired_reservation_error(user_name, reservation)
+
+    def release_budget(self, user_name: str, reservation: BudgetReservation) -> None:
+        """
+        Removes a reservation from the ledger of the user, without spending its budget.
+
+        Expired reservations are removed from the ledger at the same time.
+
+        Args:
+            user_name (str): name of the user
+            reservation (BudgetReservation): The reservation from :py:meth:`reserve_budget`.
+
+        Raises:
+            WriteConcernError: If the result is not acknowledged.
+        """
+        MONGO_UPDATE_COUNTER.add(1, {"operation": "release_budget"})
+        res = self.db.users.with_options(
+            write_concern=WriteConcern(w=WRITE_CONCERN_LEVEL, j=True)
+        ).update_one(
+            {"user_name": user_name},
+            {"$pull": {"reservations": get_settled_reservations_filter(reservation)}},
+        )
+        check_result_acknowledged(res)
+
     @dataset_must_exist
     def get_dataset(self, dataset_name: str) -> DSInfo:
         """
@@ -258,7 +407,7 @@ class AdminMongoDatabase(AdminDatabase):
                 "dataset_name": f"{dataset_name}",
             },
             {"_id": 0},
-        )
+        ).sort("timestamp", ASCENDING)
         return list(queries)
 
     def save_query(self, user_name: str, query: LomasRequestModel, response: QueryResponse) -> None:
@@ -280,6 +429,277 @@ class AdminMongoDatabase(AdminDatabase):
         ).queries_archives.insert_one(to_archive)
         check_result_acknowledged(res)
 
+    def save_queries(self, user_name: str, queries: List[QueryModel], responses: List[QueryResponse]) -> None:
+        """
+        Save a batch of queries of user on a dataset, in a single write.
+
+        Args:
+            user_name (str): name of the user
+            queries (List[QueryModel]): Request objects received from client
+            responses (List[QueryResponse]): Response objects sent to client,
+                in the order of the queries
+
+        Raises:
+            WriteConcernError: If the result is not acknowledged.
+        """
+        MONGO_INSERT_COUNTER.add(len(queries), {"operation": "save_queries"})
+        to_archive = [
+            self.prepare_save_query(user_name, query, response) for query, response in zip(queries, responses)
+        ]
+        res = self.db.with_options(
+            write_concern=WriteConcern(w=WRITE_CONCERN_LEVEL, j=True)
+        ).queries_archives.insert_many(to_archive)
+        check_result_acknowledged(res)
+
+    def save_job(self, job: Job) -> None:
+        """
+        Saves (inserts or replaces) an asynchronous query job.
+
+        Args:
+            job (Job): The job, identified by its job_id.
+
+        Raises:
+            WriteConcernError: If the result is not acknowledged.
+        """
+        MONGO_UPDATE_COUNTER.add(1, {"operation": "save_job"})
+        res = self.db.with_options(
+            write_concern=WriteConcern(w=WRITE_CONCERN_LEVEL, j=True)
+        ).jobs.replace_one({"job_id": job.job_id}, job.model_dump(), upsert=True)
+        check_result_acknowledged(res)
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """
+        Gets an asynchronous query job.
+
+        Args:
+            job_id (str): The identifier of the job.
+
+        Returns:
+            Optional[Job]: The job, None if there is no such job.
+        """
+        MONGO_QUERY_COUNTER.add(1, {"operation": "get_job"})
+        job = self.db.jobs.find_one({"job_id": job_id}, {"_id": 0})
+        return Job.model_validate(job) if job is not None else None
+
+
+def get_active_reservations_expr(now: float) -> dict:
+    """Builds the expression of the reservations of a user which have not expired.
+
+    Args:
+        now (float): The current timestamp.
+
+    Returns:
+        dict: The MongoDB aggregation expression.
+    """
+    return {
+        "$filter": {
+            "input": {"$ifNull": ["$reservations", []]},
+            "as": "r",
+            "cond": {"$gt": ["$$r.expires_at", now]},
+        }
+    }
+
+
+def get_available_budget_expr(initial_key: BudgetDBKey, reservations: dict) -> dict:
+    """Builds the expression of the available epsilon or delta of a dataset of a user.
+
+    The available budget is the initial budget minus the total spent
+    budget, in the "$$ds" element of "datasets_list", minus the budget
+    of the reservations.
+
+    Args:
+        initial_key (BudgetDBKey): EPSILON_INIT or DELTA_INIT.
+        reservations (dict): The expression of the active reservations on the dataset.
+
+    Returns:
+        dict: The MongoDB aggregation expression.
+    """
+    spent_key, reserved_key = {
+        BudgetDBKey.EPSILON_INIT: (BudgetDBKey.EPSILON_SPENT, "epsilon"),
+        BudgetDBKey.DELTA_INIT: (BudgetDBKey.DELTA_SPENT, "delta"),
+    }[initial_key]
+    return {
+        "$subtract": [
+            {"$subtract": [f"$$ds.{initial_key}", f"$$ds.{spent_key}"]},
+            {"$let": {"vars": {"reserved": reservations}, "in": {"$sum": f"$$reserved.{reserved_key}"}}},
+        ]
+    }
+
+
+def get_enough_budget_expr(dataset_name: str, epsilon: float, delta: float, now: float) -> dict:
+    """Builds the expression checking a user has enough available budget on a dataset.
+
+    Args:
+        dataset_name (str): name of the dataset
+        epsilon (float): epsilon cost of the query
+        delta (float): delta cost of the query
+        now (float): The current timestamp.
+
+    Returns:
+        dict: The MongoDB aggregation expression.
+    """
+    on_dataset = {
+        "$filter": {
+            "input": get_active_reservations_expr(now),
+            "as": "a",
+            "cond": {"$eq": ["$$a.dataset_name", dataset_name]},
+        }
+    }
+    enough_budget = {
+        "$and": [
+            {"$eq": ["$$ds.dataset_name", dataset_name]},
+            {"$gte": [get_available_budget_expr(BudgetDBKey.EPSILON_INIT, on_dataset), epsilon]},
+            {"$gte": [get_available_budget_expr(BudgetDBKey.DELTA_INIT, on_dataset), delta]},
+        ]
+    }
+    datasets_with_budget = {"$filter": {"input": "$datasets_list", "as": "ds", "cond": enough_budget}}
+    return {"$gt": [{"$size": datasets_with_budget}, 0]}
+
+
+def get_settled_reservations_filter(reservation: BudgetReservation) -> dict:
+    """Builds the filter of the reservations to remove from a ledger when a reservation is settled.
+
+    Args:
+        reservation (BudgetReservation): The committed or released reservation.
+
+    Returns:
+        dict: The MongoDB "$pull" condition, matching the reservation and
+            the expired reservations.
+    """
+    return {"$or": [{"reservation_id": reservation.reservation_id}, {"expires_at": {"$lte": time.time()}}]}
+
+
+def get_metadata_document(dataset_name: str, metadata: dict) -> dict:
+    """Builds the metadata document of a dataset, in the current layout.
+
+    Args:
+        dataset_name (str): name of the dataset
+        metadata (dict): The metadata of the dataset.
+
+    Returns:
+        dict: The {dataset_name, version, metadata} document.
+    """
+    return {"dataset_name": dataset_name, "version": METADATA_SCHEMA_VERSION, "metadata": metadata}
+
+
+def get_metadata_of_document(document: dict, dataset_name: str) -> dict:
+    """Gets the metadata of a dataset from its document, in the current or legacy layout.
+
+    Args:
+        document (dict): The metadata document.
+        dataset_name (str): name of the dataset
+
+    Returns:
+        dict: The metadata of the dataset.
+    """
+    if "version" in document:
+        return document["metadata"]
+    return document[dataset_name]
+
+
+def get_metadata_filter(dataset_name: str) -> dict:
+    """Builds the filter of the metadata documents of a dataset, in both layouts.
+
+    The legacy branch of the filter cannot use an index: it is meant
+    for the administration functions, not the server.
+
+    Args:
+        dataset_name (str): name of the dataset
+
+    Returns:
+        dict: The MongoDB filter.
+    """
+    return {"$or": [{"dataset_name": dataset_name}, get_legacy_metadata_filter(dataset_name)]}
+
+
+def get_legacy_metadata_filter(dataset_name: str) -> dict:
+    """Builds the filter of the metadata document of a dataset in the legacy layout.
+
+    Documents of the current layout are excluded, so that a dataset
+    named like one of their fields (such as "metadata") does not match them.
+
+    Args:
+        dataset_name (str): name of the dataset
+
+    Returns:
+        dict: The MongoDB filter.
+    """
+    return {"version": {"$exists": False}, dataset_name: {"$exists": True}}
+
+
+def find_metadata_document(db: Database, dataset_name: str) -> Optional[dict]:
+    """Finds the metadata document of a dataset, in the current or legacy layout.
+
+    The dataset name is looked up with the index of the current layout,
+    and then with a scan of the collection for the legacy documents
+    which are not migrated yet.
+
+    Args:
+        db (Database): The admin database.
+        dataset_name (str): name of the dataset
+
+    Returns:
+        Optional[dict]: The metadata document, None if there is none.
+    """
+    document = db.metadata.find_one({"dataset_name": f"{dataset_name}"})
+    if document is None:
+        document = db.metadata.find_one(get_legacy_metadata_filter(dataset_name))
+    return document
+
+
+def get_index_description(collection: str, keys: List[Tuple[str, int]]) -> str:
+    """Describes an index of the admin database, for logs.
+
+    Args:
+        collection (str): The collection name.
+        keys (List[Tuple[str, int]]): The keys and directions of the index.
+
+    Returns:
+        str: The description of the index.
+    """
+    return f"{collection}({', '.join(key for key, _ in keys)})"
+
+
+def ensure_indexes(db: Database) -> None:
+    """Creates the indexes of the admin database which do not exist yet.
+
+    Failures (for instance duplicate values of a unique index or a user
+    without the createIndex privilege) are logged and the other indexes
+    are created.
+
+    Args:
+        db (Database): The admin database.
+    """
+    for collection, keys, options in MONGODB_INDEXES:
+        try:
+            db[collection].create_index(keys, **options)
+        except OperationFailure as e:
+            logging.error(f"Failed to create index {get_index_description(collection, keys)}: {e}")
+
+
+def get_missing_indexes(db: Database) -> List[str]:
+    """Gets the indexes of the admin database which do not exist.
+
+    An index exists if one with the same keys (and uniqueness) exists,
+    whatever its name.
+
+    Args:
+        db (Database): The admin database.
+
+    Returns:
+        List[str]: The descriptions of the missing indexes.
+    """
+    missing = []
+    for collection, keys, options in MONGODB_INDEXES:
+        existing = db[collection].index_information().values()
+        if not any(
+            [tuple(key) for key in index["key"]] == keys
+            and index.get("unique", False) == options.get("unique", False)
+            for index in existing
+        ):
+            missing.append(get_index_description(collection, keys))
+    return missing
+
 
 def check_result_acknowledged(res: _WriteResult) -> None:
     """Raises an exception if the result is not acknowledged.
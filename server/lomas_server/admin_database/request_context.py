@@ -0,0 +1,57 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional
+
+# Results of the admin database lookups memoized for the current request,
+# None outside of a request context.
+REQUEST_MEMO: ContextVar[Optional[Dict[Hashable, Any]]] = ContextVar(
+    "admin_database_request_memo", default=None
+)
+
+
+@contextmanager
+def admin_database_request_context() -> Iterator[None]:
+    """Memoizes the admin database lookups for the duration of the context.
+
+    The context spans one request (or one job), during which users,
+    datasets and dataset accesses are not added nor removed: the server
+    only changes budgets, flags and archives. The memo is shared with the
+    threads the request runs in, since they copy the context.
+
+    Yields:
+        Iterator[None]: Nothing, the memo is reset when the context exits.
+    """
+    token = REQUEST_MEMO.set({})
+    try:
+        yield
+    finally:
+        REQUEST_MEMO.reset(token)
+
+
+def memoize_in_request(func: Callable) -> Callable:  # type: ignore
+    """
+    Decorator function to memoize an admin database lookup in the request context.
+
+    The lookup runs once per request for the same arguments, which
+    must be hashable. Outside of a request context, it always runs.
+    Exceptions are not memoized.
+
+    Args:
+        func (Callable): Method of an admin database to be decorated.
+
+    Returns:
+        Callable: Wrapper function that memoizes the results of func.
+    """
+
+    @wraps(func)
+    def wrapper_decorator(self, *args: Hashable) -> Any:
+        memo = REQUEST_MEMO.get()
+        if memo is None:
+            return func(self, *args)
+        key = (id(self), func.__qualname__, args)
+        if key not in memo:
+            memo[key] = func(self, *args)
+        return memo[key]
+
+    return wrapper_decorator
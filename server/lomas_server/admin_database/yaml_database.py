@@ -1,17 +1,30 @@
+import threading
+import time
+from collections import defaultdict
 from datetime import datetime, timezone
-from typing import List
+from typing import Dict, List, Optional, Tuple
 
 import yaml
 
 from lomas_core.error_handler import (
     InvalidQueryException,
 )
-from lomas_core.models.collections import DSInfo, Metadata
-from lomas_core.models.requests import LomasRequestModel
+from lomas_core.models.collections import (
+    BudgetReservation,
+    DatasetOfUser,
+    DSInfo,
+    Job,
+    Metadata,
+)
+from lomas_core.models.requests import LomasRequestModel, QueryModel
 from lomas_core.models.responses import QueryResponse
 from lomas_server.admin_database.admin_database import (
     AdminDatabase,
     dataset_must_exist,
+    get_active_reservations,
+    get_available_budget,
+    get_expired_reservation_error,
+    get_reservation_error,
     user_must_exist,
     user_must_have_access_to_dataset,
 )
@@ -19,18 +32,36 @@ from lomas_server.admin_database.constants import BudgetDBKey
 
 
 class AdminYamlDatabase(AdminDatabase):
-    """Overall Yaml database management for server state."""
+    """Overall Yaml database management for server state.
+
+    The loaded YAML dict is kept as is, to be saved back, and indexed
+    by user, by (user, dataset) and by dataset. The indexes hold the same
+    documents as the dict, so that updates through them are saved.
+    """
 
     def __init__(self, yaml_db_path: str) -> None:
-        """Load DB from disk.
+        """Load DB from disk and index it.
 
         Args:
             yaml_db_path (str): path to yaml db file.
         """
         self.path: str = yaml_db_path
+        self._budget_lock = threading.Lock()
         with open(yaml_db_path, mode="r", encoding="utf-8") as f:
             self.database = yaml.safe_load(f)
 
+        self._users: Dict[str, dict] = {user["user_name"]: user for user in self.database["users"]}
+        self._budgets: Dict[Tuple[str, str], dict] = {
+            (user["user_name"], ds["dataset_name"]): ds
+            for user in self.database["users"]
+            for ds in user["datasets_list"]
+        }
+        self._datasets: Dict[str, dict] = {dt["dataset_name"]: dt for dt in self.database["datasets"]}
+        self._queries: Dict[Tuple[str, str], List[dict]] = defaultdict(list)
+        for q in self.database["queries"]:
+            self._queries[(q["user_name"], q["dataset_name"])].append(q)
+        self._jobs: Dict[str, int] = {job["job_id"]: i for i, job in enumerate(self.database.get("jobs", []))}
+
     def does_user_exist(self, user_name: str) -> bool:
         """Checks if user exist in the database.
 
@@ -40,11 +71,7 @@ class AdminYamlDatabase(AdminDatabase):
         Returns:
             bool: True if the user exists, False otherwise.
         """
-        for user in self.database["users"]:
-            if user["user_name"] == user_name:
-                return True
-
-        return False
+        return user_name in self._users
 
     def does_dataset_exist(self, dataset_name: str) -> bool:
         """Checks if dataset exist in the database.
@@ -55,11 +82,15 @@ class AdminYamlDatabase(AdminDatabase):
         Returns:
             bool: True if the dataset exists, False otherwise.
         """
-        for dt in self.database["datasets"]:
-            if dt["dataset_name"] == dataset_name:
-                return True
+        return dataset_name in self._datasets
 
-        return False
+    def get_list_of_datasets(self) -> List[str]:
+        """Gets the names of all the datasets in the database.
+
+        Returns:
+            List[str]: The list of dataset names.
+        """
+        return [dt["dataset_name"] for dt in self.database["datasets"]]
 
     @dataset_must_exist
     def get_dataset_metadata(self, dataset_name: str) -> Metadata:
@@ -73,12 +104,9 @@ class AdminYamlDatabase(AdminDatabase):
         Returns:
             Metadata: The metadata model.
         """
-        for dt in self.database["datasets"]:
-            if dt["dataset_name"] == dataset_name:
-                metadata_path = dt["metadata_access"]["path"]
-
-                with open(metadata_path, mode="r", encoding="utf-8") as f:
-                    metadata = yaml.safe_load(f)
+        metadata_path = self._datasets[dataset_name]["metadata_access"]["path"]
+        with open(metadata_path, mode="r", encoding="utf-8") as f:
+            metadata = yaml.safe_load(f)
 
         return Metadata.model_validate(metadata)
 
@@ -86,7 +114,7 @@ class AdminYamlDatabase(AdminDatabase):
     def set_may_user_query(self, user_name: str, may_query: bool) -> None:
         """Sets if a user may query the server.
 
-        (Set False before querying and True after updating budget)
+        (Administrators set it to False to block the queries of a user)
 
         Wrapped by :py:func:`user_must_exist`.
 
@@ -94,40 +122,7 @@ class AdminYamlDatabase(AdminDatabase):
             user_name (str): name of the user
             may_query (bool): flag give or remove access to user
         """
-        users = self.database["users"]
-        for user in users:
-            if user["user_name"] == user_name:
-                user["may_query"] = may_query
-        self.database["users"] = users
-
-    @user_must_exist
-    def get_and_set_may_user_query(self, user_name: str, may_query: bool) -> bool:
-        """
-        Atomic operation to check and set if the user may query the server.
-
-        (Set False before querying and True after updating budget)
-
-        Wrapped by :py:func:`user_must_exist`.
-
-        Args:
-            user_name (str): name of the user
-            may_query (bool): flag give or remove access to user
-
-        Returns:
-            bool: The may_query status of the user before the update.
-        """
-        previous_may_query = False
-
-        users = self.database["users"]
-        new_users = []
-        for user in users:
-            if user["user_name"] == user_name:
-                previous_may_query = user["may_query"]
-                user["may_query"] = may_query
-                new_users.append(user)
-        self.database["users"] = new_users
-
-        return previous_may_query
+        self._users[user_name]["may_query"] = may_query
 
     @user_must_exist
     def has_user_access_to_dataset(self, user_name: str, dataset_name: str) -> bool:
@@ -147,30 +142,22 @@ class AdminYamlDatabase(AdminDatabase):
                 f"Dataset {dataset_name} does not exist. "
                 + "Please, verify the client object initialisation.",
             )
-        for user in self.database["users"]:
-            if user["user_name"] == user_name:
-                for dataset in user["datasets_list"]:
-                    if dataset["dataset_name"] == dataset_name:
-                        return True
-        return False
+        return (user_name, dataset_name) in self._budgets
+
+    @user_must_have_access_to_dataset
+    def get_budget_snapshot(self, user_name: str, dataset_name: str) -> DatasetOfUser:
+        """Get the initial and total spent budgets of a user on a dataset.
 
-    def get_epsilon_or_delta(self, user_name: str, dataset_name: str, parameter: BudgetDBKey) -> float:
-        """Get total spent epsilon or delta by user on dataset.
+        Wrapped by :py:func:`user_must_have_access_to_dataset`.
 
         Args:
             user_name (str): name of the user
             dataset_name (str): name of the dataset
-            parameter (BudgetDBKey): One of BudgetDBKey
 
         Returns:
-            float: The requested budget value.
+            DatasetOfUser: The budgets of the user on the dataset.
         """
-        for user in self.database["users"]:
-            if user["user_name"] == user_name:
-                for dataset in user["datasets_list"]:
-                    if dataset["dataset_name"] == dataset_name:
-                        return dataset[parameter]
-        return False
+        return DatasetOfUser.model_validate(self._budgets[(user_name, dataset_name)])
 
     def update_epsilon_or_delta(
         self,
@@ -187,16 +174,120 @@ class AdminYamlDatabase(AdminDatabase):
             parameter (str): "current_epsilon" or "current_delta"
             spent_value (float): spending of epsilon or delta on last query
         """
-        users = self.database["users"]
-        for user in users:
-            if user["user_name"] == user_name:
-                for dataset in user["datasets_list"]:
-                    if dataset["dataset_name"] == dataset_name:
-                        dataset[parameter] += spent_value
-        self.database["users"] = users
+        budget = self._budgets.get((user_name, dataset_name))
+        if budget is not None:
+            budget[parameter] += spent_value
+
+    def reserve_budget(
+        self, user_name: str, dataset_name: str, epsilon: float, delta: float
+    ) -> BudgetReservation:
+        """
+        Atomic operation to check and reserve the budget of a query.
+
+        Expired reservations are removed from the ledger of the user.
+
+        Args:
+            user_name (str): name of the user
+            dataset_name (str): name of the dataset
+            epsilon (float): epsilon cost of the query
+            delta (float): delta cost of the query
+
+        Raises:
+            InvalidQueryException: If there is not enough budget.
+            UnauthorizedAccessException: The user runs too many queries,
+                does not exist or does not have access to the dataset.
+
+        Returns:
+            BudgetReservation: The reservation, to commit or release.
+        """
+        max_concurrent_queries = self.reservations_config.max_concurrent_queries
+        with self._budget_lock:
+            now = time.time()
+            user = self._get_user(user_name)
+            available = get_available_budget(user, dataset_name, now) if user is not None else None
+            if (
+                user is None
+                or available is None
+                or not user["may_query"]
+                or len(get_active_reservations(user, now)) >= max_concurrent_queries
+                or not (available[0] >= epsilon and available[1] >= delta)
+            ):
+                raise get_reservation_error(user, user_name, dataset_name, max_concurrent_queries, now)
+
+            reservation = self.new_reservation(dataset_name, epsilon, delta, now)
+            user["reservations"] = get_active_reservations(user, now) + [reservation.model_dump()]
+        return reservation
+
+    def commit_budget(self, user_name: str, reservation: BudgetReservation) -> None:
+        """
+        Spends the budget of a reservation and removes it from the ledger of the user.
+
+        If the reservation expired, the budget is only spent if the
+        available budget still covers it.
+
+        Args:
+            user_name (str): name of the user
+            reservation (BudgetReservation): The reservation from :py:meth:`reserve_budget`.
+
+        Raises:
+            InvalidQueryException: If the reservation expired and there
+                is not enough budget left.
+        """
+        with self._budget_lock:
+            now = time.time()
+            user = self._get_user(user_name)
+            if user is not None and not any(
+                r["reservation_id"] == reservation.reservation_id
+                for r in get_active_reservations(user, now)
+            ):
+                available = get_available_budget(user, reservation.dataset_name, now)
+                if available is None or not (
+                    available[0] >= reservation.epsilon and available[1] >= reservation.delta
+                ):
+                    self._remove_reservation(user_name, reservation)
+                    raise get_expired_reservation_error(user_name, reservation)
+            self.update_budget(user_name, reservation.dataset_name, reservation.epsilon, reservation.delta)
+            self._remove_reservation(user_name, reservation)
+
+    def release_budget(self, user_name: str, reservation: BudgetReservation) -> None:
+        """
+        Removes a reservation from the ledger of the user, without spending its budget.
+
+        Args:
+            user_name (str): name of the user
+            reservation (BudgetReservation): The reservation from :py:meth:`reserve_budget`.
+        """
+        with self._budget_lock:
+            self._remove_reservation(user_name, reservation)
+
+    def _remove_reservation(self, user_name: str, reservation: BudgetReservation) -> None:
+        """Removes a reservation from the ledger of the user, with the expired reservations.
+
+        Args:
+            user_name (str): name of the user
+            reservation (BudgetReservation): The reservation to remove.
+        """
+        user = self._get_user(user_name)
+        if user is not None:
+            user["reservations"] = [
+                r
+                for r in get_active_reservations(user, time.time())
+                if r["reservation_id"] != reservation.reservation_id
+            ]
+
+    def _get_user(self, user_name: str) -> Optional[dict]:
+        """Gets the document of a user.
+
+        Args:
+            user_name (str): name of the user
+
+        Returns:
+            Optional[dict]: The user document, None if the user does not exist.
+        """
+        return self._users.get(user_name)
 
     @dataset_must_exist
-    def get_dataset(self, dataset_name: str) -> DSInfo:  # type: ignore[return]
+    def get_dataset(self, dataset_name: str) -> DSInfo:
         """
         Get dataset access info based on dataset_name.
 
@@ -208,11 +299,7 @@ class AdminYamlDatabase(AdminDatabase):
         Returns:
             Dataset: The dataset model.
         """
-        for dt in self.database["datasets"]:
-            if dt["dataset_name"] == dataset_name:
-                break
-
-        return DSInfo.model_validate(dt)  # pylint: disable=W0631
+        return DSInfo.model_validate(self._datasets[dataset_name])
 
     @user_must_have_access_to_dataset
     def get_user_previous_queries(
@@ -231,11 +318,7 @@ class AdminYamlDatabase(AdminDatabase):
         Returns:
             List[dict]: List of previous queries.
         """
-        previous_queries = []
-        for q in self.database["queries"]:
-            if q["user_name"] == user_name and q["dataset_name"] == dataset_name:
-                previous_queries.append(q)
-        return previous_queries
+        return list(self._queries.get((user_name, dataset_name), []))
 
     def save_query(self, user_name: str, query: LomasRequestModel, response: QueryResponse) -> None:
         """Save queries of user on datasets in a separate collection (table).
@@ -245,8 +328,64 @@ class AdminYamlDatabase(AdminDatabase):
             query (LomasRequestModel): Request object received from client
             response (QueryResponse): Response object sent to client
         """
-        to_archive = super().prepare_save_query(user_name, query, response)
-        self.database["queries"].append(to_archive)
+        self._archive_queries([super().prepare_save_query(user_name, query, response)])
+
+    def save_queries(self, user_name: str, queries: List[QueryModel], responses: List[QueryResponse]) -> None:
+        """Save a batch of queries of user on a dataset.
+
+        Args:
+            user_name (str): name of the user
+            queries (List[QueryModel]): Request objects received from client
+            responses (List[QueryResponse]): Response objects sent to client,
+                in the order of the queries
+        """
+        self._archive_queries(
+            [
+                self.prepare_save_query(user_name, query, response)
+                for query, response in zip(queries, responses)
+            ]
+        )
+
+    def _archive_queries(self, to_archive: List[dict]) -> None:
+        """Appends queries to the archives and to the index of their user and dataset.
+
+        Args:
+            to_archive (List[dict]): The prepared archives, see :py:meth:`prepare_save_query`.
+        """
+        self.database["queries"].extend(to_archive)
+        for q in to_archive:
+            self._queries[(q["user_name"], q["dataset_name"])].append(q)
+
+    def save_job(self, job: Job) -> None:
+        """
+        Saves (inserts or replaces) an asynchronous query job.
+
+        Args:
+            job (Job): The job, identified by its job_id.
+        """
+        jobs = self.database.setdefault("jobs", [])
+        to_save = job.model_dump(mode="json")
+        position = self._jobs.get(job.job_id)
+        if position is None:
+            self._jobs[job.job_id] = len(jobs)
+            jobs.append(to_save)
+        else:
+            jobs[position] = to_save
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        """
+        Gets an asynchronous query job.
+
+        Args:
+            job_id (str): The identifier of the job.
+
+        Returns:
+            Optional[Job]: The job, None if there is no such job.
+        """
+        position = self._jobs.get(job_id)
+        if position is None:
+            return None
+        return Job.model_validate(self.database["jobs"][position])
 
     def save_current_database(self) -> None:
         """Saves the current database with updated parameters in new yaml."""
@@ -1,6 +1,9 @@
+import asyncio
 import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
+from functools import partial
+from typing import List
 
 from fastapi import FastAPI
 from opentelemetry.instrumentation.fastapi import FastAPIInstrumentor
@@ -10,6 +13,7 @@ from lomas_core.error_handler import (
     add_exception_handlers,
 )
 from lomas_core.instrumentation import get_ressource, init_telemetry
+from lomas_core.models.config import Config
 from lomas_core.models.constants import AdminDBType
 from lomas_server.admin_database.factory import admin_database_factory
 from lomas_server.admin_database.utils import add_demo_data_to_mongodb_admin
@@ -18,20 +22,135 @@ from lomas_server.constants import (
     CONFIG_NOT_LOADED,
     DB_NOT_LOADED,
     SERVER_LIVE,
+    SERVER_READY,
     SERVER_SERVICE_NAME,
     SERVICE_ID,
 )
+from lomas_server.data_connector.data_connector import set_csv_reader_config
+from lomas_server.data_connector.dataset_cache import DATASET_CACHE
+from lomas_server.data_connector.dataset_refresher import DATASET_REFRESHER
+from lomas_server.data_connector.dataset_store import DATASET_STORE
+from lomas_server.data_connector.dataset_warmup import warm_up_datasets
+from lomas_server.dp_queries.cost_cache import COST_CACHE
 from lomas_server.dp_queries.dp_libraries.opendp import (
     set_opendp_features_config,
 )
-from lomas_server.routes import routes_admin, routes_dp
+from lomas_server.dp_queries.fitted_model_store import FITTED_MODEL_STORE
+from lomas_server.dp_queries.job_queue import JobQueue
+from lomas_server.dp_queries.process_pool import QUERIER_PROCESS_POOLS
+from lomas_server.routes import routes_admin, routes_dp, routes_jobs
 from lomas_server.routes.middlewares import (
+    AdminDatabaseContextMiddleware,
     FastAPIMetricMiddleware,
     LoggingAndTracingMiddleware,
 )
+from lomas_server.routes.utils import run_query_on_private_dataset, timing_protection
 from lomas_server.utils.config import get_config
 
 
+def set_up_datasets(config: Config) -> List[asyncio.Task]:
+    """Configures the dataset readers, cache and store, and starts the periodic refresh.
+
+    Must be called from the event loop of the server.
+
+    Args:
+        config (Config): The server config.
+
+    Returns:
+        List[asyncio.Task]: The started background tasks.
+    """
+    set_csv_reader_config(config.csv_reader)
+    DATASET_CACHE.set_max_memory(config.dataset_cache.max_memory_bytes)
+    DATASET_STORE.set_directory(config.dataset_store.directory)
+
+    if config.dataset_cache.refresh_interval_seconds > 0:
+        return [asyncio.create_task(DATASET_REFRESHER.run(config.dataset_cache.refresh_interval_seconds))]
+    return []
+
+
+def set_up_queriers(config: Config) -> None:
+    """Configures the DP libraries, their process pools, the cost cache and the fitted model store.
+
+    Args:
+        config (Config): The server config.
+    """
+    set_opendp_features_config(config.dp_libraries.opendp)
+    QUERIER_PROCESS_POOLS.set_config(
+        config.process_pools, set_opendp_features_config, (config.dp_libraries.opendp,)
+    )
+    COST_CACHE.set_config(config.cost_cache)
+    FITTED_MODEL_STORE.set_config(config.fitted_model_store)
+
+
+def set_up_job_queue(lomas_app: FastAPI, config: Config) -> JobQueue:
+    """Starts the workers of the asynchronous query jobs.
+
+    Jobs are run with the same timing protection as the query endpoints.
+
+    Args:
+        lomas_app (FastAPI): The server app, with a loaded admin database.
+        config (Config): The server config.
+
+    Returns:
+        JobQueue: The started job queue.
+    """
+    runner = partial(timing_protection(run_query_on_private_dataset), lomas_app)
+    return JobQueue(lomas_app.state.admin_database, runner, config.jobs)
+
+
+async def warm_up(lomas_app: FastAPI, config: Config) -> None:
+    """Preloads the configured datasets in the dataset cache, then marks the server as ready.
+
+    The server is live, and accepts queries, during the warm-up.
+    The progress of each dataset is reported in the server state.
+
+    Args:
+        lomas_app (FastAPI): The server app, with a loaded admin database.
+        config (Config): The server config.
+    """
+    server_state = lomas_app.state.server_state
+    dataset_names: List[str]
+    if config.dataset_warmup.datasets == "all":
+        dataset_names = await asyncio.to_thread(lomas_app.state.admin_database.get_list_of_datasets)
+    else:
+        dataset_names = config.dataset_warmup.datasets
+
+    if dataset_names:
+        logging.info(f"Warming up datasets {dataset_names}")
+        server_state["message"].append("Warming up datasets")
+        await asyncio.to_thread(
+            warm_up_datasets,
+            dataset_names,
+            lomas_app.state.admin_database,
+            lomas_app.state.private_credentials,
+            server_state["datasets"],
+            config.dataset_warmup.max_workers,
+        )
+        server_state["message"].append("Dataset warm-up completed")
+
+    logging.info("Server ready")
+    server_state["state"].append(SERVER_READY)
+    server_state["READY"] = True
+
+
+def shut_down(lomas_app: FastAPI, background_tasks: List[asyncio.Task]) -> None:
+    """Stops the background tasks, job workers and process pools, and saves the admin database.
+
+    Args:
+        lomas_app (FastAPI): The server app.
+        background_tasks (List[asyncio.Task]): The background tasks to cancel.
+    """
+    for task in background_tasks:
+        task.cancel()
+
+    if lomas_app.state.job_queue is not None:
+        lomas_app.state.job_queue.stop()
+    QUERIER_PROCESS_POOLS.shutdown()
+
+    if isinstance(lomas_app.state.admin_database, AdminYamlDatabase):
+        lomas_app.state.admin_database.save_current_database()
+
+
 @asynccontextmanager
 async def lifespan(lomas_app: FastAPI) -> AsyncGenerator:
     """
@@ -50,12 +169,15 @@ async def lifespan(lomas_app: FastAPI) -> AsyncGenerator:
 
     # Set some app state
     lomas_app.state.admin_database = None
+    lomas_app.state.job_queue = None
 
     # General server state, can add fields if need be.
     lomas_app.state.server_state = {
         "state": [],
         "message": [],
         "LIVE": False,
+        "READY": False,
+        "datasets": {},
     }
     lomas_app.state.server_state["state"].append("Startup event")
 
@@ -88,6 +210,7 @@ async def lifespan(lomas_app: FastAPI) -> AsyncGenerator:
             logging.info("Loading admin database")
             lomas_app.state.server_state["message"].append("Loading admin database")
             lomas_app.state.admin_database = admin_database_factory(config.admin_database)
+            lomas_app.state.admin_database.set_reservations_config(config.budget_reservations)
         except InternalServerException as e:
             logging.exception(f"Failed at startup: {str(e)}")
             lomas_app.state.server_state["state"].append(DB_NOT_LOADED)
@@ -99,7 +222,10 @@ async def lifespan(lomas_app: FastAPI) -> AsyncGenerator:
         lomas_app.state.server_state["message"].append("Startup completed")
 
     # Set DP Libraries config
-    set_opendp_features_config(config.dp_libraries.opendp)
+    set_up_queriers(config)
+
+    # Set up dataset cache, store and refresh
+    background_tasks = set_up_datasets(config)
 
     if status_ok:
         logging.info("Server start condition OK")
@@ -107,11 +233,16 @@ async def lifespan(lomas_app: FastAPI) -> AsyncGenerator:
         lomas_app.state.server_state["message"].append("Server start condition OK")
         lomas_app.state.server_state["LIVE"] = True
 
+        # Start the workers of the asynchronous jobs
+        lomas_app.state.job_queue = set_up_job_queue(lomas_app, config)
+
+        # Preload datasets, the server is ready once done
+        background_tasks.append(asyncio.create_task(warm_up(lomas_app, config)))
+
     yield  # lomas_app is handling requests
 
     # Shutdown event
-    if isinstance(lomas_app.state.admin_database, AdminYamlDatabase):
-        lomas_app.state.admin_database.save_current_database()
+    shut_down(lomas_app, background_tasks)
 
 
 # Initalise telemetry
@@ -121,7 +252,8 @@ init_telemetry(resource)
 # This object holds the server object
 app = FastAPI(lifespan=lifespan)
 
-# Setting metrics middleware
+# Setting admin database and metrics middlewares
+app.add_middleware(AdminDatabaseContextMiddleware)
 app.add_middleware(FastAPIMetricMiddleware, app_name=SERVER_SERVICE_NAME)
 app.add_middleware(LoggingAndTracingMiddleware)
 
@@ -134,3 +266,4 @@ FastAPIInstrumentor.instrument_app(app)
 # Add endpoints
 app.include_router(routes_dp.router)
 app.include_router(routes_admin.router)
+app.include_router(routes_jobs.router)
@@ -2,6 +2,8 @@ import os
 import string
 from enum import StrEnum
 
+from lomas_core.models.constants import DatasetFileFormat
+
 # Config
 # -----------------------------------------------------------------------------
 
@@ -28,6 +30,17 @@ SERVICE_ID = os.getenv("HOSTNAME", "default-host")
 DB_NOT_LOADED = "User database not loaded"
 CONFIG_NOT_LOADED = "Config not loaded"
 SERVER_LIVE = "LIVE"
+SERVER_READY = "READY"
+
+
+class DatasetWarmupStatus(StrEnum):
+    """Progress of the preloading of a dataset at startup."""
+
+    PENDING = "pending"
+    LOADING = "loading"
+    LOADED = "loaded"
+    FAILED = "failed"
+
 
 # General values
 SECONDS_IN_A_DAY = 60 * 60 * 24
@@ -41,7 +54,42 @@ RANDOM_STRINGS = list(string.ascii_lowercase + string.ascii_uppercase + string.d
 NB_RANDOM_NONE = 5  # if nullable, how many random none to add
 
 # Data preprocessing
-NUMERICAL_DTYPES = ["int16", "int32", "int64", "float16", "float32", "float64"]
+NUMERICAL_DTYPES = [
+    "int16",
+    "int32",
+    "int64",
+    "float16",
+    "float32",
+    "float64",
+    # Masked dtypes of nullable columns
+    "Int32",
+    "Int64",
+    "Float32",
+    "Float64",
+]
+
+# Data connectors
+DATASET_FILE_EXTENSIONS = {
+    DatasetFileFormat.CSV: (".csv",),
+    DatasetFileFormat.PARQUET: (".parquet", ".pq"),
+    DatasetFileFormat.ARROW: (".arrow", ".feather", ".ipc"),
+}
+DATASET_BATCH_SIZE = 65536  # rows per batch when iterating over a dataset
+
+# Datasets shared with the process pools, in shared memory where available
+SHARED_DATASET_DIR = "/dev/shm"
+
+# Asynchronous jobs
+JOB_WORKER_POLL_INTERVAL = 1.0  # seconds between two checks of shutdown by an idle worker
+
+
+class DatasetRefreshStatus(StrEnum):
+    """Outcome of the revalidation of a cached dataset."""
+
+    UNCHANGED = "unchanged"
+    RELOADED = "reloaded"  # the whole dataset was reloaded, projections invalidated
+    INVALIDATED = "invalidated"  # only projections were cached, they were invalidated
+    FAILED = "failed"
 
 
 # DP Libraries
@@ -50,6 +98,7 @@ NUMERICAL_DTYPES = ["int16", "int32", "int64", "float16", "float32", "float64"]
 # Smartnoise sql
 SSQL_STATS = ["count", "sum_int", "sum_large_int", "sum_float", "threshold"]
 SSQL_MAX_ITERATION = 5
+SSQL_TABLE_NAME = "df"  # name of the private table in the queries
 
 
 # Smartnoise synth
@@ -1,35 +1,493 @@
+import io
+import logging
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Tuple
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pandas.core.arrays import BaseMaskedArray
+from pandas.core.arrays._mixins import NDArrayBackedExtensionArray
+from pyarrow import csv as pa_csv
+from pyarrow import feather, parquet
 
-from lomas_core.models.collections import DatetimeMetadata, Metadata
+from lomas_core.error_handler import InternalServerException, InvalidQueryException
+from lomas_core.models.collections import (
+    BooleanMetadata,
+    DatetimeMetadata,
+    FloatMetadata,
+    IntCategoricalMetadata,
+    IntMetadata,
+    Metadata,
+    StrCategoricalMetadata,
+)
+from lomas_core.models.config import CSVReaderConfig
+from lomas_core.models.constants import CSVEngine, DatasetFileFormat, Precision
+from lomas_server.constants import DATASET_BATCH_SIZE, DATASET_FILE_EXTENSIONS
+from lomas_server.data_connector.dataset_cache import (
+    DATASET_CACHE,
+    DatasetCacheKey,
+    get_csv_payload_cache_key,
+    get_projection_cache_key,
+)
+from lomas_server.data_connector.dataset_refresher import DATASET_REFRESHER
+from lomas_server.data_connector.dataset_store import DATASET_STORE
+
+# Pandas extension types used for arrow columns, matching the csv dtypes.
+ARROW_TO_PANDAS_TYPES = {
+    pa.string(): pd.StringDtype(),
+    pa.bool_(): pd.BooleanDtype(),
+}
+
+# Pandas dtype of a column, a dtype name or a dtype instance.
+ColumnDtype = Union[str, pd.CategoricalDtype]
 
 
 class DataConnector(ABC):
-    """Overall access to sensitive data."""
+    """Overall access to sensitive data.
+
+    The dataframes returned by `get_pandas_df` are shared between queries
+    and are read-only. Queriers which modify the data must work on the
+    copy returned by `get_private_pandas_df`.
+    """
 
     df: Optional[pd.DataFrame] = None
+    # Shared by all the connectors, see set_csv_reader_config.
+    csv_reader: CSVReaderConfig = CSVReaderConfig()
 
-    def __init__(self, metadata: Metadata) -> None:
+    def __init__(self, metadata: Metadata, cache_key: Optional[DatasetCacheKey] = None) -> None:
         """Initializer.
 
         Args:
             metadata (Metadata): The metadata for this dataset
+            cache_key (Optional[DatasetCacheKey], optional): Key of the dataset
+                in the process-wide dataset cache. Defaults to None (not cached).
         """
         self.metadata: Metadata = metadata
+        self.cache_key: Optional[DatasetCacheKey] = cache_key
 
         dtypes, datetime_columns = get_column_dtypes(self.metadata)
-        self.dtypes: Dict[str, str] = dtypes
+        self.dtypes: Dict[str, ColumnDtype] = dtypes
         self.datetime_columns: List[str] = datetime_columns
+        # Categorical columns are parsed to the type of their categories first,
+        # so that values outside of the categories are detected when cast.
+        self.parse_dtypes: Dict[str, ColumnDtype] = get_parse_dtypes(dtypes)
+        self.arrow_types: Dict[str, pa.DataType] = get_column_arrow_types(self.metadata)
 
     @abstractmethod
-    def get_pandas_df(self) -> pd.DataFrame:
+    def get_pandas_df(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """Get the data in pandas dataframe format.
 
+        Args:
+            columns (Optional[List[str]], optional): The columns to load.
+                Defaults to None (all columns).
+
+        Raises:
+            InvalidQueryException: If a column is not in the dataset.
+
+        Returns:
+            pd.DataFrame: The pandas dataframe for this dataset (shared, read-only).
+        """
+
+    def get_private_pandas_df(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Get a private copy of the data, which the caller may modify.
+
+        Args:
+            columns (Optional[List[str]], optional): The columns to load.
+                Defaults to None (all columns).
+
+        Raises:
+            InvalidQueryException: If a column is not in the dataset.
+
+        Returns:
+            pd.DataFrame: A writable copy of the pandas dataframe for this dataset.
+        """
+        return self.get_pandas_df(columns).copy(deep=True)
+
+    def get_csv_payload(self) -> str:
+        """Get the data serialized as a headerless csv, the input format of OpenDP.
+
+        The payload is serialized from the dataframe if it is already loaded,
+        otherwise it is streamed from the source batch by batch, so that the
+        whole dataframe is never held in memory next to it. The payload is
+        cached with the dataset, for the version of the source it was
+        serialized from.
+
+        Raises:
+            InternalServerException: If the dataset cannot be read.
+
+        Returns:
+            str: The csv serialization of the dataset, without header nor index.
+        """
+        if self.cache_key is None:
+            return batches_to_csv(self.iter_batches())
+
+        cached = DATASET_CACHE.get_with_version(self.cache_key)
+        if cached is not None:
+            cached_df, version = cached
+            return DATASET_CACHE.get_or_load(
+                get_csv_payload_cache_key(self.cache_key),
+                lambda: (cached_df.to_csv(header=False, index=False), version),
+            )
+        return DATASET_CACHE.get_or_load(
+            get_csv_payload_cache_key(self.cache_key), self.load_versioned_csv_payload
+        )
+
+    def load_versioned_csv_payload(self) -> Tuple[str, Optional[str]]:
+        """Streams the csv payload from the source, with the version of the source.
+
+        The connector is registered for the revalidation of the cached payload.
+
+        Returns:
+            Tuple[str, Optional[str]]: The csv payload and the version of
+                the source it was read from.
+        """
+        version = self.get_version()  # pylint: disable=E1128
+        DATASET_REFRESHER.register(self)
+        return batches_to_csv(self.read_dataset_batches(None, DATASET_BATCH_SIZE)), version
+
+    def iter_batches(
+        self, columns: Optional[List[str]] = None, batch_size: int = DATASET_BATCH_SIZE
+    ) -> Iterator[pd.DataFrame]:
+        """Iterates over the data in batches of rows, for queriers which work incrementally.
+
+        The batches are sliced from the dataframe if it is already loaded,
+        otherwise they are read one after the other from the source, so that
+        datasets larger than the memory can be processed. The batches are
+        read-only and have the dtypes of :py:meth:`get_pandas_df`.
+
+        Args:
+            columns (Optional[List[str]], optional): The columns to read.
+                Defaults to None (all columns).
+            batch_size (int, optional): The number of rows of each batch,
+                the last one may be smaller. Defaults to DATASET_BATCH_SIZE.
+
+        Raises:
+            InvalidQueryException: If a column is not in the dataset.
+            InternalServerException: If the dataset cannot be read.
+
+        Returns:
+            Iterator[pd.DataFrame]: The batches of the dataset, in order.
+        """
+        if batch_size < 1:
+            raise InternalServerException(f"Batch size must be positive, got {batch_size}.")
+        if columns is not None:
+            columns = list(dict.fromkeys(columns))
+            self.check_columns(columns)
+
+        df = self.df
+        if df is None and self.cache_key is not None:
+            df = DATASET_CACHE.get(self.cache_key)
+        if df is None:
+            return self.read_dataset_batches(columns, batch_size)
+        return iter_df_batches(df if columns is None else df[columns], batch_size)
+
+    def read_dataset_batches(self, columns: Optional[List[str]], batch_size: int) -> Iterator[pd.DataFrame]:
+        """Reads the dataset from its source in batches of rows, bypassing the caches.
+
+        Connectors which cannot read their source incrementally load the
+        whole dataframe and slice it.
+
+        Args:
+            columns (Optional[List[str]]): The columns to read, None for all columns.
+            batch_size (int): The number of rows of each batch.
+
+        Returns:
+            Iterator[pd.DataFrame]: The batches of the dataset, in order.
+        """
+        return iter_df_batches(self.get_pandas_df(columns), batch_size)
+
+    def check_columns(self, columns: List[str]) -> None:
+        """Checks that the requested columns are in the dataset metadata.
+
+        Args:
+            columns (List[str]): The requested columns.
+
+        Raises:
+            InvalidQueryException: If a column is not in the dataset.
+        """
+        missing_columns = [col for col in columns if col not in self.metadata.columns]
+        if missing_columns:
+            raise InvalidQueryException(f"Columns {missing_columns} not found in dataset.")
+
+    def read_dataset(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Reads the dataset from its source, bypassing the caches.
+
+        Args:
+            columns (Optional[List[str]], optional): The columns to read.
+                Defaults to None (all columns).
+
+        Raises:
+            NotImplementedError: If the connector has no source to read from.
+
+        Returns:
+            pd.DataFrame: The pandas dataframe for this dataset.
+        """
+        raise NotImplementedError(f"{type(self).__name__} has no source to read from.")
+
+    def get_version(self) -> Optional[str]:
+        """Gets the version of the dataset source, to revalidate cached copies.
+
+        Returns:
+            Optional[str]: The version, None if the source has no version.
+        """
+        return None
+
+    def is_modified(self, version: Optional[str]) -> bool:
+        """Checks if the dataset source changed since the given version.
+
+        Sources without version are never considered modified.
+
+        Args:
+            version (Optional[str]): The version of a cached copy.
+
+        Returns:
+            bool: True if the source changed, False otherwise.
+        """
+        if version is None:
+            return False
+        return self.get_version() != version
+
+    def load_pandas_df(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Loads the dataframe, through the dataset cache if the connector has a cache key.
+
+        A column projection is taken from the whole dataset if it is already
+        loaded, without copy, otherwise only the requested columns are read
+        from the source.
+
+        Args:
+            columns (Optional[List[str]], optional): The columns to load.
+                Defaults to None (all columns).
+
+        Raises:
+            InvalidQueryException: If a column is not in the dataset.
+
         Returns:
             pd.DataFrame: The pandas dataframe for this dataset.
         """
+        if columns is None:
+            if self.df is None:
+                if self.cache_key is None:
+                    self.df = set_read_only(self.read_dataset())
+                else:
+                    self.df = DATASET_CACHE.get_or_load(self.cache_key, self.load_versioned_df)
+            return self.df
+
+        columns = list(dict.fromkeys(columns))
+        self.check_columns(columns)
+
+        df = self.df
+        if df is None and self.cache_key is not None:
+            df = DATASET_CACHE.get(self.cache_key)
+        if df is not None:
+            return project_columns(df, columns)
+
+        if self.cache_key is None:
+            return set_read_only(self.read_dataset(columns))
+        return DATASET_CACHE.get_or_load(
+            get_projection_cache_key(self.cache_key, columns),
+            lambda: self.load_versioned_df(columns),
+        )
+
+    def load_versioned_df(self, columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, Optional[str]]:
+        """Reads the dataset and the version of its source, through the dataset store if enabled.
+
+        The connector is registered for the revalidation of the cached copies.
+
+        Args:
+            columns (Optional[List[str]], optional): The columns to read.
+                Defaults to None (all columns).
+
+        Returns:
+            Tuple[pd.DataFrame, Optional[str]]: The pandas dataframe and
+                the version of the source it was read from.
+        """
+        # Versioned first: a source changing during the read is seen as modified.
+        version = self.get_version()  # pylint: disable=E1128
+        DATASET_REFRESHER.register(self)
+
+        if self.cache_key is None or not DATASET_STORE.enabled:
+            df = self.read_dataset(columns)
+        elif columns is None:
+            df = DATASET_STORE.get_or_materialize(self.cache_key, self.read_dataset, version)
+        else:
+            df = DATASET_STORE.read(self.cache_key, columns, version)
+            if df is None:
+                df = self.read_dataset(columns)
+        return set_read_only(df), version
+
+    def read_file(
+        self,
+        source: str | IO | pa.NativeFile,
+        file_format: DatasetFileFormat,
+        columns: Optional[List[str]] = None,
+    ) -> pd.DataFrame:
+        """Reads a dataset file with the column types from the metadata.
+
+        Columnar files (parquet, arrow) are cast to the metadata types
+        directly on the arrow table, without going through text. Csv files
+        are parsed to the metadata types by the configured engine, the
+        pyarrow one parses blocks of the file in parallel. Only the
+        requested columns are read from columnar files, and only those are
+        parsed from csv files.
+
+        Args:
+            source (str | IO | pa.NativeFile): The file path or file object.
+            file_format (DatasetFileFormat): The format of the file.
+            columns (Optional[List[str]], optional): The columns to read.
+                Defaults to None (all columns).
+
+        Returns:
+            pd.DataFrame: The pandas dataframe of the file.
+        """
+        match file_format:
+            case DatasetFileFormat.CSV if self.csv_reader.engine == CSVEngine.PYARROW:
+                # Blocks of the file are parsed in parallel, directly to the metadata types.
+                table = pa_csv.read_csv(
+                    source,
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types=self.arrow_types,
+                        include_columns=columns,
+                        strings_can_be_null=True,
+                    ),
+                )
+            case DatasetFileFormat.CSV:
+                datetime_columns = self.datetime_columns
+                if columns is not None:
+                    datetime_columns = [col for col in datetime_columns if col in columns]
+                df = pd.read_csv(
+                    source,
+                    usecols=columns,
+                    dtype=self.parse_dtypes,
+                    parse_dates=datetime_columns,
+                )
+                # usecols keeps the file order of the columns
+                return self.set_categories(df if columns is None else df[columns])
+            case DatasetFileFormat.PARQUET:
+                table = parquet.read_table(source, columns=columns)
+            case DatasetFileFormat.ARROW:
+                table = feather.read_table(source, columns=columns)
+        return self.arrow_table_to_pandas(table)
+
+    def read_file_batches(
+        self,
+        source: str | IO | pa.NativeFile,
+        file_format: DatasetFileFormat,
+        columns: Optional[List[str]] = None,
+        batch_size: int = DATASET_BATCH_SIZE,
+    ) -> Iterator[pd.DataFrame]:
+        """Reads a dataset file in batches of rows, with the column types from the metadata.
+
+        Only one batch (and one block of the file) is held in memory at a
+        time: csv files are parsed block by block, parquet files row group
+        by row group and arrow files record batch by record batch. Parquet
+        and arrow sources must be random access files.
+
+        Args:
+            source (str | IO | pa.NativeFile): The file path or file object.
+            file_format (DatasetFileFormat): The format of the file.
+            columns (Optional[List[str]], optional): The columns to read.
+                Defaults to None (all columns).
+            batch_size (int, optional): The number of rows of each batch.
+                Defaults to DATASET_BATCH_SIZE.
+
+        Returns:
+            Iterator[pd.DataFrame]: The batches of the file, in order.
+        """
+        record_batches: Iterable[pa.RecordBatch]
+        match file_format:
+            case DatasetFileFormat.CSV if self.csv_reader.engine == CSVEngine.PYARROW:
+                record_batches = pa_csv.open_csv(
+                    source,
+                    convert_options=pa_csv.ConvertOptions(
+                        column_types=self.arrow_types,
+                        include_columns=columns,
+                        strings_can_be_null=True,
+                    ),
+                )
+            case DatasetFileFormat.CSV:
+                datetime_columns = self.datetime_columns
+                if columns is not None:
+                    datetime_columns = [col for col in datetime_columns if col in columns]
+                with pd.read_csv(
+                    source,
+                    usecols=columns,
+                    dtype=self.parse_dtypes,
+                    parse_dates=datetime_columns,
+                    chunksize=batch_size,
+                ) as reader:
+                    for df in reader:
+                        yield set_read_only(self.set_categories(df if columns is None else df[columns]))
+                return
+            case DatasetFileFormat.PARQUET:
+                record_batches = parquet.ParquetFile(source).iter_batches(
+                    batch_size=batch_size, columns=columns
+                )
+            case DatasetFileFormat.ARROW:
+                ipc_reader = pa.ipc.open_file(source)
+                record_batches = (
+                    ipc_reader.get_batch(i) if columns is None else ipc_reader.get_batch(i).select(columns)
+                    for i in range(ipc_reader.num_record_batches)
+                )
+        for table in rebatch(record_batches, batch_size):
+            yield set_read_only(self.arrow_table_to_pandas(table))
+
+    def arrow_table_to_pandas(self, table: pa.Table) -> pd.DataFrame:
+        """Casts an arrow table to the metadata types and converts it to pandas.
+
+        Columns which are not in the metadata keep their type.
+
+        Args:
+            table (pa.Table): The arrow table.
+
+        Returns:
+            pd.DataFrame: The pandas dataframe.
+        """
+        schema = pa.schema(
+            [pa.field(field.name, self.arrow_types.get(field.name, field.type)) for field in table.schema]
+        )
+        df = table.cast(schema).to_pandas(types_mapper=ARROW_TO_PANDAS_TYPES.get)
+        # Categorical and masked dtypes have no direct arrow equivalent.
+        df = df.astype(
+            {
+                col: dtype
+                for col, dtype in self.parse_dtypes.items()
+                if col in df.columns and col not in self.datetime_columns and df[col].dtype != dtype
+            },
+            copy=False,
+        )
+        return self.set_categories(df)
+
+    def set_categories(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Casts the categorical columns of a dataframe to the categories of the metadata.
+
+        Values outside of the categories become missing values. As this
+        changes the query results, the number of such values of each column
+        is logged (not the values themselves, which are private).
+
+        Args:
+            df (pd.DataFrame): The dataframe, with categorical columns
+                of the type of their categories.
+
+        Returns:
+            pd.DataFrame: The dataframe with categorical columns.
+        """
+        categorical = {
+            col: dtype
+            for col, dtype in self.dtypes.items()
+            if isinstance(dtype, pd.CategoricalDtype) and col in df.columns
+        }
+        if not categorical:
+            return df
+        nb_values = df[list(categorical)].notna().sum()
+        df = df.astype(categorical, copy=False)
+        nb_dropped = nb_values - df[list(categorical)].notna().sum()
+        for col, nb in nb_dropped[nb_dropped > 0].items():
+            logging.warning(
+                f"{nb} values of column {col} are not in its metadata categories "
+                "and were replaced by missing values."
+            )
+        return df
 
     def get_metadata(self) -> Metadata:
         """Get the metadata for this dataset.
@@ -40,24 +498,261 @@ class DataConnector(ABC):
         return self.metadata
 
 
-def get_column_dtypes(metadata: Metadata) -> Tuple[Dict[str, str], List[str]]:
+def set_csv_reader_config(config: CSVReaderConfig) -> None:
+    """Sets the CSV parser of all the data connectors.
+
+    The number of threads applies to all the pyarrow readers of the process.
+
+    Args:
+        config (CSVReaderConfig): The CSV reader config.
+    """
+    DataConnector.csv_reader = config
+    if config.nb_threads is not None:
+        pa.set_cpu_count(config.nb_threads)
+
+
+def get_column_dtypes(metadata: Metadata, compact: bool = True) -> Tuple[Dict[str, ColumnDtype], List[str]]:
     """Extracts and returns the column types from the metadata.
 
+    With compact dtypes, categorical columns are loaded as pandas categoricals
+    of the metadata categories, values outside of the categories become
+    missing values (see :py:meth:`DataConnector.set_categories`). Numeric
+    columns are loaded at their declared precision, with a masked dtype if
+    they are nullable.
+
     Args:
         metadata (Metadata): The metadata.
+        compact (bool, optional): Whether to use the compact dtypes, otherwise
+            the metadata types. Defaults to True.
 
     Returns:
-        Tuple[Dict[str, str], List[str]]:
+        Tuple[Dict[str, ColumnDtype], List[str]]:
            dict: The dictionary of the column type.
             list: The list of columns of datetime type
     """
 
-    dtypes = {}
+    dtypes: Dict[str, ColumnDtype] = {}
     datetime_columns = []
     for col_name, data in metadata.columns.items():
-        if isinstance(data, DatetimeMetadata):
-            dtypes[col_name] = "string"
-            datetime_columns.append(col_name)
-        else:
-            dtypes[col_name] = data.type
+        match data:
+            case DatetimeMetadata():
+                dtypes[col_name] = "string"
+                datetime_columns.append(col_name)
+            case _ if not compact:
+                dtypes[col_name] = data.type
+            case StrCategoricalMetadata():
+                dtypes[col_name] = pd.CategoricalDtype(data.categories)
+            case IntCategoricalMetadata():
+                categories = pd.Index(data.categories, dtype=get_numeric_dtype("int", data.precision))
+                dtypes[col_name] = pd.CategoricalDtype(categories)
+            case IntMetadata() | FloatMetadata():
+                dtypes[col_name] = get_numeric_dtype(data.type, data.precision, data.nullable)
+            case _:
+                dtypes[col_name] = data.type
     return dtypes, datetime_columns
+
+
+def get_parse_dtypes(dtypes: Dict[str, ColumnDtype]) -> Dict[str, ColumnDtype]:
+    """Gets the dtypes to parse the columns to, before casting to categoricals.
+
+    Categorical columns are parsed to the type of their categories,
+    nullable so that missing values are kept.
+
+    Args:
+        dtypes (Dict[str, ColumnDtype]): The dtypes from :py:func:`get_column_dtypes`.
+
+    Returns:
+        Dict[str, ColumnDtype]: The dtypes to parse the columns to.
+    """
+    parse_dtypes: Dict[str, ColumnDtype] = {}
+    for col_name, dtype in dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            parse_dtypes[col_name] = dtype
+        elif pd.api.types.is_integer_dtype(dtype.categories.dtype):
+            parse_dtypes[col_name] = dtype.categories.dtype.name.capitalize()
+        else:
+            parse_dtypes[col_name] = "object"
+    return parse_dtypes
+
+
+def get_numeric_dtype(col_type: str, precision: Precision, nullable: bool = False) -> str:
+    """Gets the pandas dtype of a numeric column.
+
+    Args:
+        col_type (str): The metadata type, "int" or "float".
+        precision (Precision): The precision of the column.
+        nullable (bool, optional): Whether the column has missing values.
+            Defaults to False.
+
+    Returns:
+        str: The dtype name, masked (capitalized) if nullable.
+    """
+    dtype = f"{col_type}{precision.value}"
+    return dtype.capitalize() if nullable else dtype
+
+
+def get_column_arrow_types(metadata: Metadata) -> Dict[str, pa.DataType]:
+    """Extracts the arrow type of each column from the metadata.
+
+    The types match the pandas dtypes of :py:func:`get_column_dtypes`,
+    categorical and masked dtypes are applied after the conversion to pandas.
+
+    Args:
+        metadata (Metadata): The metadata.
+
+    Returns:
+        Dict[str, pa.DataType]: The dictionary of the column arrow types.
+    """
+    arrow_types = {}
+    for col_name, data in metadata.columns.items():
+        match data:
+            case IntMetadata() | IntCategoricalMetadata():
+                arrow_types[col_name] = pa.int32() if data.precision == Precision.SINGLE else pa.int64()
+            case FloatMetadata():
+                arrow_types[col_name] = pa.float32() if data.precision == Precision.SINGLE else pa.float64()
+            case BooleanMetadata():
+                arrow_types[col_name] = pa.bool_()
+            case DatetimeMetadata():
+                arrow_types[col_name] = pa.timestamp("ns")
+            case _:
+                arrow_types[col_name] = pa.string()
+    return arrow_types
+
+
+def get_file_format(path: str, file_format: Optional[DatasetFileFormat] = None) -> DatasetFileFormat:
+    """Gets the format of a dataset file, from its extension if not specified.
+
+    Args:
+        path (str): The file path or key.
+        file_format (Optional[DatasetFileFormat], optional): The format
+            set in the dataset access, if any. Defaults to None.
+
+    Raises:
+        InvalidQueryException: If the format cannot be inferred.
+
+    Returns:
+        DatasetFileFormat: The file format.
+    """
+    if file_format is not None:
+        return file_format
+
+    for fmt, extensions in DATASET_FILE_EXTENSIONS.items():
+        if path.lower().endswith(extensions):
+            return fmt
+
+    raise InvalidQueryException(
+        f"File type of {path} not supported for loading into pandas DataFrame. "
+        + f"Supported formats are {[fmt.value for fmt in DatasetFileFormat]}."
+    )
+
+
+def iter_df_batches(df: pd.DataFrame, batch_size: int) -> Iterator[pd.DataFrame]:
+    """Slices a dataframe in batches of rows, without copy.
+
+    Args:
+        df (pd.DataFrame): The dataframe.
+        batch_size (int): The number of rows of each batch.
+
+    Returns:
+        Iterator[pd.DataFrame]: The batches of the dataframe, in order.
+    """
+    for start in range(0, len(df), batch_size):
+        yield df.iloc[start : start + batch_size]  # noqa: E203
+
+
+def rebatch(record_batches: Iterable[pa.RecordBatch], batch_size: int) -> Iterator[pa.Table]:
+    """Regroups arrow record batches of any size in tables of batch_size rows.
+
+    Args:
+        record_batches (Iterable[pa.RecordBatch]): The record batches, in order.
+        batch_size (int): The number of rows of each table, the last one
+            may be smaller.
+
+    Returns:
+        Iterator[pa.Table]: The tables, in order.
+    """
+    pending: List[pa.RecordBatch] = []
+    nb_pending = 0
+    for record_batch in record_batches:
+        pending.append(record_batch)
+        nb_pending += record_batch.num_rows
+        while nb_pending >= batch_size:
+            table = pa.Table.from_batches(pending)
+            yield table.slice(0, batch_size)
+            rest = table.slice(batch_size)
+            pending, nb_pending = rest.to_batches(), rest.num_rows
+    if nb_pending:
+        yield pa.Table.from_batches(pending)
+
+
+def batches_to_csv(batches: Iterable[pd.DataFrame]) -> str:
+    """Serializes batches of rows as a single headerless csv.
+
+    Args:
+        batches (Iterable[pd.DataFrame]): The batches of a dataset.
+
+    Returns:
+        str: The csv serialization of the rows, without header nor index.
+    """
+    buffer = io.StringIO()
+    for batch in batches:
+        batch.to_csv(buffer, header=False, index=False)
+    return buffer.getvalue()
+
+
+def set_read_only(df: pd.DataFrame) -> pd.DataFrame:
+    """Marks the numpy arrays backing a dataframe as read-only.
+
+    Modifying the dataframe in place then raises a ValueError instead of
+    silently changing the data seen by the other queries. The buffers of
+    extension arrays (categorical codes, masked values and masks, strings)
+    are marked too.
+
+    Args:
+        df (pd.DataFrame): The dataframe, marked in place.
+
+    Returns:
+        pd.DataFrame: The same dataframe.
+    """
+    for array in df._mgr.arrays:  # pylint: disable=W0212
+        for buffer in get_backing_arrays(array):
+            buffer.flags.writeable = False
+    return df
+
+
+def get_backing_arrays(array: Any) -> List[np.ndarray]:
+    """Gets the numpy arrays holding the values of a block of a dataframe.
+
+    Arrow-backed arrays are immutable and have no numpy buffer.
+
+    Args:
+        array (Any): A numpy array or a pandas extension array.
+
+    Returns:
+        List[np.ndarray]: The numpy arrays backing the block.
+    """
+    if isinstance(array, np.ndarray):
+        return [array]
+    # pylint: disable=W0212
+    if isinstance(array, BaseMaskedArray):
+        return [array._data, array._mask]
+    if isinstance(array, NDArrayBackedExtensionArray):
+        # Categorical codes, strings and datetimes.
+        return [array._ndarray]
+    return []
+
+
+def project_columns(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """Selects columns of a shared dataframe without copying them.
+
+    Unlike `df[columns]`, which copies the selected columns, the
+    projection references the read-only arrays of the dataframe.
+
+    Args:
+        df (pd.DataFrame): The read-only dataframe.
+        columns (List[str]): The columns to select, in order.
+
+    Returns:
+        pd.DataFrame: The read-only projection.
+    """
+    return set_read_only(pd.DataFrame({col: df[col] for col in columns}, copy=False))
@@ -0,0 +1,321 @@
+import logging
+import sys
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar, Union, cast
+
+import pandas as pd
+from pydantic import BaseModel
+
+from lomas_core.models.collections import DSAccess
+from lomas_core.models.constants import DATASET_CACHE_MAX_MEMORY
+from lomas_server.utils.metrics import (
+    DATASET_CACHE_EVICTION_COUNTER,
+    DATASET_CACHE_HIT_COUNTER,
+    DATASET_CACHE_MISS_COUNTER,
+)
+
+DatasetCacheKey = Tuple[str, str]
+
+# A dataset, or a serialization of it such as the OpenDP csv payload.
+CachedData = Union[pd.DataFrame, str]
+CachedDataT = TypeVar("CachedDataT", pd.DataFrame, str)
+
+# Access fields that must never end up in a cache key.
+SECRET_ACCESS_FIELDS = {"access_key_id", "secret_access_key", "user", "password"}
+
+
+class DatasetCacheStats(BaseModel):
+    """BaseModel for the dataset cache counters."""
+
+    hits: int
+    misses: int
+    evictions: int
+    nb_datasets: int
+    memory_bytes: int
+    max_memory_bytes: int
+
+
+class DatasetCache:  # pylint: disable=R0902
+    """Process-wide, thread-safe LRU cache of loaded private datasets.
+
+    Datasets are kept in memory until the sum of their sizes exceeds
+    the memory budget, in which case the least recently used ones are
+    evicted. Concurrent loads of the same dataset are serialised so
+    that the source is only read once.
+
+    Each entry records the version of the source it was read from,
+    so that the refresh subsystem can revalidate it. The dataframes
+    handed out are shared between requests and must not be modified
+    in place: a refresh replaces the entry, queries that already got
+    the previous dataframe finish on it.
+
+    Serializations of a dataset, such as the OpenDP csv payload, are
+    cached under their own key with the version of the dataframe they
+    were built from, and are revalidated along with the projections.
+    """
+
+    def __init__(self, max_memory_bytes: int = DATASET_CACHE_MAX_MEMORY) -> None:
+        """Initializer.
+
+        Args:
+            max_memory_bytes (int, optional): The memory budget in bytes.
+                Defaults to DATASET_CACHE_MAX_MEMORY.
+        """
+        self.max_memory_bytes: int = max_memory_bytes
+        self.memory_bytes: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[DatasetCacheKey, Tuple[CachedData, int, Optional[str]]] = OrderedDict()
+        self._load_locks: Dict[DatasetCacheKey, threading.Lock] = {}
+
+    def set_max_memory(self, max_memory_bytes: int) -> None:
+        """Sets the memory budget and evicts datasets that no longer fit.
+
+        Args:
+            max_memory_bytes (int): The new memory budget in bytes.
+        """
+        with self._lock:
+            self.max_memory_bytes = max_memory_bytes
+            self._evict(0)
+
+    def get(self, key: DatasetCacheKey) -> pd.DataFrame | None:
+        """Gets a dataset from the cache and marks it as recently used.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+
+        Returns:
+            pd.DataFrame | None: The cached dataframe, None if not cached.
+        """
+        with self._lock:
+            df = self._get(key)
+        return df if isinstance(df, pd.DataFrame) else None
+
+    def get_with_version(self, key: DatasetCacheKey) -> Optional[Tuple[pd.DataFrame, Optional[str]]]:
+        """Gets a dataset from the cache with the version of its source.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+
+        Returns:
+            Optional[Tuple[pd.DataFrame, Optional[str]]]: The cached dataframe
+                and its version, None if not cached.
+        """
+        with self._lock:
+            df = self._get(key)
+            if not isinstance(df, pd.DataFrame):
+                return None
+            return df, self._entries[key][2]
+
+    def put(self, key: DatasetCacheKey, df: CachedData, version: Optional[str] = None) -> None:
+        """Adds (or atomically replaces) a dataset in the cache.
+
+        Datasets larger than the whole memory budget are not cached.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+            df (CachedData): The loaded dataframe, or its serialization.
+            version (Optional[str], optional): The version of the source.
+                Defaults to None (unknown).
+        """
+        nbytes = get_memory_size(df)
+        with self._lock:
+            self._pop(key)
+            if nbytes > self.max_memory_bytes:
+                logging.info(f"Dataset {key[0]} ({nbytes} bytes) does not fit in dataset cache.")
+                return
+            self._evict(nbytes)
+            self._entries[key] = (df, nbytes, version)
+            self.memory_bytes += nbytes
+
+    def get_or_load(
+        self,
+        key: DatasetCacheKey,
+        loader: Callable[[], Tuple[CachedDataT, Optional[str]]],
+    ) -> CachedDataT:
+        """Gets a dataset from the cache, loading it on a miss.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+            loader (Callable[[], Tuple[CachedDataT, Optional[str]]]): Function
+                reading the dataset (or its serialization) and the version
+                of its source.
+
+        Returns:
+            CachedDataT: The dataframe of the dataset, or its serialization.
+        """
+        with self._lock:
+            df = self._get(key)
+            if df is not None:
+                return cast(CachedDataT, df)
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # Another thread may have loaded the dataset in the meantime.
+            with self._lock:
+                df = self._get(key)
+                if df is not None:
+                    return cast(CachedDataT, df)
+                self.misses += 1
+            DATASET_CACHE_MISS_COUNTER.add(1, {"dataset": key[0]})
+
+            try:
+                loaded, version = loader()
+                self.put(key, loaded, version)
+            finally:
+                with self._lock:
+                    self._load_locks.pop(key, None)
+
+        return loaded
+
+    def invalidate(self, key: DatasetCacheKey) -> None:
+        """Removes a dataset from the cache.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+        """
+        with self._lock:
+            self._pop(key)
+
+    def get_dataset_versions(self, key: DatasetCacheKey) -> Dict[DatasetCacheKey, Optional[str]]:
+        """Gets the source versions of a cached dataset and of its cached projections and serializations.
+
+        Args:
+            key (DatasetCacheKey): The cache key of the whole dataset.
+
+        Returns:
+            Dict[DatasetCacheKey, Optional[str]]: The version of each cache entry.
+        """
+        with self._lock:
+            return {
+                entry_key: entry[2]
+                for entry_key, entry in self._entries.items()
+                if entry_key[0] == key[0] and entry_key[1].startswith(key[1])
+            }
+
+    def clear(self) -> None:
+        """Removes all datasets from the cache and resets the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.memory_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self) -> DatasetCacheStats:
+        """Gets the current counters of the cache.
+
+        Returns:
+            DatasetCacheStats: The cache counters.
+        """
+        with self._lock:
+            return DatasetCacheStats(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                nb_datasets=len(self._entries),
+                memory_bytes=self.memory_bytes,
+                max_memory_bytes=self.max_memory_bytes,
+            )
+
+    def _get(self, key: DatasetCacheKey) -> CachedData | None:
+        """Gets a dataset and marks it as recently used, with the lock held.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+
+        Returns:
+            CachedData | None: The cached data, None if not cached.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        DATASET_CACHE_HIT_COUNTER.add(1, {"dataset": key[0]})
+        return entry[0]
+
+    def _pop(self, key: DatasetCacheKey) -> None:
+        """Removes a dataset, with the lock held.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.memory_bytes -= entry[1]
+
+    def _evict(self, nbytes: int) -> None:
+        """Evicts least recently used datasets, with the lock held.
+
+        Args:
+            nbytes (int): Number of bytes that must fit in the budget
+                after eviction.
+        """
+        while self._entries and self.memory_bytes + nbytes > self.max_memory_bytes:
+            key, (_, evicted_bytes, _) = self._entries.popitem(last=False)
+            self.memory_bytes -= evicted_bytes
+            self.evictions += 1
+            DATASET_CACHE_EVICTION_COUNTER.add(1, {"dataset": key[0]})
+            logging.info(f"Evicted dataset {key[0]} from dataset cache.")
+
+
+def get_memory_size(df: CachedData) -> int:
+    """Computes the memory footprint of a dataframe, including string data.
+
+    Args:
+        df (CachedData): The dataframe, or its serialization.
+
+    Returns:
+        int: The size of the dataframe in bytes.
+    """
+    if isinstance(df, str):
+        return sys.getsizeof(df)
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def get_dataset_cache_key(dataset_name: str, ds_access: DSAccess) -> DatasetCacheKey:
+    """Builds the cache key of a dataset from its name and access descriptor.
+
+    Credentials are excluded from the key.
+
+    Args:
+        dataset_name (str): The dataset name.
+        ds_access (DSAccess): The dataset access descriptor.
+
+    Returns:
+        DatasetCacheKey: The dataset cache key.
+    """
+    return (dataset_name, ds_access.model_dump_json(exclude=SECRET_ACCESS_FIELDS))
+
+
+def get_projection_cache_key(key: DatasetCacheKey, columns: List[str]) -> DatasetCacheKey:
+    """Builds the cache key of a column projection of a dataset.
+
+    Args:
+        key (DatasetCacheKey): The cache key of the whole dataset.
+        columns (List[str]): The projected columns, in order.
+
+    Returns:
+        DatasetCacheKey: The cache key of the projection.
+    """
+    return (key[0], f"{key[1]}{columns}")
+
+
+def get_csv_payload_cache_key(key: DatasetCacheKey) -> DatasetCacheKey:
+    """Builds the cache key of the headerless csv serialization of a dataset.
+
+    Args:
+        key (DatasetCacheKey): The cache key of the whole dataset.
+
+    Returns:
+        DatasetCacheKey: The cache key of the csv payload.
+    """
+    return (key[0], f"{key[1]}#csv")
+
+
+DATASET_CACHE = DatasetCache()
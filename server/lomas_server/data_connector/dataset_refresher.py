@@ -0,0 +1,140 @@
+import asyncio
+import copy
+import logging
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from lomas_server.constants import DatasetRefreshStatus
+from lomas_server.data_connector.dataset_cache import DATASET_CACHE, DatasetCacheKey
+from lomas_server.data_connector.dataset_store import DATASET_STORE
+
+if TYPE_CHECKING:
+    from lomas_server.data_connector.data_connector import DataConnector
+
+
+class DatasetRefreshResult(BaseModel):
+    """BaseModel for the outcome of the revalidation of a cached dataset."""
+
+    dataset_name: str
+    status: DatasetRefreshStatus
+    message: Optional[str] = None
+
+
+class DatasetRefresher:
+    """Revalidates cached datasets against their source and reloads the modified ones.
+
+    The data connectors which loaded a dataset in the dataset cache are
+    registered (without their dataframe) to revalidate it later. A
+    modified dataset is read again and atomically swapped in the cache,
+    queries which already got the previous dataframe finish on it.
+    """
+
+    def __init__(self) -> None:
+        """Initializer."""
+        self._lock = threading.Lock()
+        # Only one refresh at a time, periodic or requested by an admin.
+        self._refresh_lock = threading.Lock()
+        self._sources: Dict[DatasetCacheKey, "DataConnector"] = {}
+
+    def register(self, connector: "DataConnector") -> None:
+        """Registers the source of a cached dataset.
+
+        Args:
+            connector (DataConnector): The data connector which loaded the dataset.
+        """
+        if connector.cache_key is None:
+            return
+        source = copy.copy(connector)
+        source.df = None
+        with self._lock:
+            self._sources[connector.cache_key] = source
+
+    def refresh(self, dataset_name: Optional[str] = None) -> List[DatasetRefreshResult]:
+        """Revalidates the cached datasets and reloads the modified ones.
+
+        Args:
+            dataset_name (Optional[str], optional): Only refresh this dataset.
+                Defaults to None (all cached datasets).
+
+        Returns:
+            List[DatasetRefreshResult]: The outcome for each cached dataset.
+        """
+        with self._lock:
+            sources = {
+                key: source
+                for key, source in self._sources.items()
+                if dataset_name is None or key[0] == dataset_name
+            }
+
+        results = []
+        with self._refresh_lock:
+            for key, source in sources.items():
+                result = self._refresh_dataset(key, source)
+                if result is not None:
+                    results.append(result)
+        return results
+
+    async def run(self, interval_seconds: float) -> None:
+        """Refreshes the cached datasets periodically, until cancelled.
+
+        Args:
+            interval_seconds (float): The time between two refreshes.
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            for result in await asyncio.to_thread(self.refresh):
+                if result.status != DatasetRefreshStatus.UNCHANGED:
+                    logging.info(f"Dataset {result.dataset_name} refresh: {result.status}.")
+
+    def _refresh_dataset(
+        self, key: DatasetCacheKey, source: "DataConnector"
+    ) -> Optional[DatasetRefreshResult]:
+        """Revalidates the cache entries of one dataset.
+
+        Args:
+            key (DatasetCacheKey): The cache key of the whole dataset.
+            source (DataConnector): The registered data connector.
+
+        Returns:
+            Optional[DatasetRefreshResult]: The outcome, None if nothing
+                of the dataset is cached anymore.
+        """
+        versions = DATASET_CACHE.get_dataset_versions(key)
+        if not versions:
+            with self._lock:
+                self._sources.pop(key, None)
+            return None
+
+        try:
+            # Revalidate each distinct version once.
+            modified = {version: source.is_modified(version) for version in set(versions.values())}
+            stale_keys = [entry_key for entry_key, version in versions.items() if modified[version]]
+            if not stale_keys:
+                return DatasetRefreshResult(dataset_name=key[0], status=DatasetRefreshStatus.UNCHANGED)
+
+            for entry_key in stale_keys:
+                if entry_key != key:
+                    DATASET_CACHE.invalidate(entry_key)
+
+            if key not in stale_keys:
+                return DatasetRefreshResult(dataset_name=key[0], status=DatasetRefreshStatus.INVALIDATED)
+
+            df, version = source.load_versioned_df()
+            DATASET_CACHE.put(key, df, version)
+            if DATASET_STORE.enabled:
+                DATASET_STORE.invalidate(key, versions[key])
+            return DatasetRefreshResult(
+                dataset_name=key[0], status=DatasetRefreshStatus.RELOADED, message=f"version {version}"
+            )
+        except Exception as e:  # pylint: disable=W0718
+            logging.exception(f"Failed to refresh dataset {key[0]}: {e}")
+            return DatasetRefreshResult(
+                dataset_name=key[0],
+                status=DatasetRefreshStatus.FAILED,
+                message=getattr(e, "error_message", str(e)),
+            )
+
+
+DATASET_REFRESHER = DatasetRefresher()
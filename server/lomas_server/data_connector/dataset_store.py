@@ -0,0 +1,199 @@
+import fcntl
+import hashlib
+import logging
+import os
+import re
+from typing import Callable, List, Optional
+
+import pandas as pd
+from pyarrow import feather
+
+from lomas_server.data_connector.dataset_cache import DatasetCacheKey
+
+# Names of the files written by the store, see get_path and _write.
+STORE_FILE_PATTERN = re.compile(r"[\w-]+-[0-9a-f]{16}\.arrow(\.lock|\.\d+\.tmp)?")
+
+
+class DatasetStore:
+    """Local directory of private datasets materialized as Arrow IPC files.
+
+    A dataset is read from its source once, by a single server worker,
+    and written uncompressed to the store directory. All the worker
+    processes then memory-map the same file: its pages are shared
+    through the operating system page cache and numeric columns
+    without missing values are handed to pandas without copy.
+
+    Files are named after the version of the source, a refreshed
+    dataset is written to a new file while processes which mapped the
+    previous one keep reading it. The dataframes read from the store
+    are backed by read-only memory and must not be modified in place.
+
+    The files hold private data: the directory is created readable by
+    the server user only and the store only ever removes its own files.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        """Initializer.
+
+        Args:
+            directory (Optional[str], optional): The store directory.
+                Defaults to None (store disabled).
+        """
+        self.directory: Optional[str] = directory
+
+    def set_directory(self, directory: Optional[str]) -> None:
+        """Sets the store directory, creating it if needed.
+
+        Args:
+            directory (Optional[str]): The store directory, None disables
+                the store.
+        """
+        if directory is not None:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        self.directory = directory
+
+    @property
+    def enabled(self) -> bool:
+        """Whether datasets are materialized in the store.
+
+        Returns:
+            bool: True if the store has a directory, False otherwise.
+        """
+        return self.directory is not None
+
+    def get_path(self, key: DatasetCacheKey, version: Optional[str] = None) -> str:
+        """Gets the path of the materialized file of a dataset.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+            version (Optional[str], optional): The version of the source.
+                Defaults to None (unknown).
+
+        Raises:
+            ValueError: If the store is disabled.
+
+        Returns:
+            str: The path of the Arrow file.
+        """
+        if self.directory is None:
+            raise ValueError("Dataset store is disabled.")
+        name = re.sub(r"[^\w-]", "_", key[0])
+        digest = hashlib.sha256(f"{key[1]}{version}".encode()).hexdigest()[:16]
+        return os.path.join(self.directory, f"{name}-{digest}.arrow")
+
+    def read(
+        self,
+        key: DatasetCacheKey,
+        columns: Optional[List[str]] = None,
+        version: Optional[str] = None,
+    ) -> Optional[pd.DataFrame]:
+        """Reads a dataset from the store if it is materialized.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+            columns (Optional[List[str]], optional): The columns to read.
+                Defaults to None (all columns).
+            version (Optional[str], optional): The version of the source.
+                Defaults to None (unknown).
+
+        Returns:
+            Optional[pd.DataFrame]: The dataframe, None if the dataset
+                is not materialized.
+        """
+        path = self.get_path(key, version)
+        if not os.path.exists(path):
+            return None
+        table = feather.read_table(path, columns=columns, memory_map=True)
+        # One block per column so that columns can reference the mapped memory.
+        return table.to_pandas(split_blocks=True)
+
+    def get_or_materialize(
+        self,
+        key: DatasetCacheKey,
+        loader: Callable[[], pd.DataFrame],
+        version: Optional[str] = None,
+    ) -> pd.DataFrame:
+        """Reads a dataset from the store, materializing it first if needed.
+
+        An exclusive file lock ensures only one process reads the source
+        and writes the file, the others wait for it and map the result.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+            loader (Callable[[], pd.DataFrame]): Function reading the dataset
+                from its source.
+            version (Optional[str], optional): The version of the source.
+                Defaults to None (unknown).
+
+        Returns:
+            pd.DataFrame: The dataframe of the dataset.
+        """
+        df = self.read(key, version=version)
+        if df is not None:
+            return df
+
+        path = self.get_path(key, version)
+        lock_fd = os.open(f"{path}.lock", os.O_WRONLY | os.O_CREAT, 0o600)
+        with os.fdopen(lock_fd, "w", encoding="utf-8") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                df = self.read(key, version=version)
+                if df is None:
+                    self._write(path, loader())
+                    logging.info(f"Materialized dataset {key[0]} in {path}.")
+                    df = self.read(key, version=version)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return df  # type: ignore [return-value]
+
+    def invalidate(self, key: DatasetCacheKey, version: Optional[str] = None) -> None:
+        """Removes the materialized file of a dataset.
+
+        Processes which already mapped the file keep their mapping.
+
+        Args:
+            key (DatasetCacheKey): The dataset cache key.
+            version (Optional[str], optional): The version of the source.
+                Defaults to None (unknown).
+        """
+        path = self.get_path(key, version)
+        for file_path in (path, f"{path}.lock"):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        """Removes all the materialized datasets.
+
+        Only the files written by the store (Arrow files, their locks and
+        interrupted writes) are removed, other files of the directory are kept.
+        """
+        if self.directory is None or not os.path.isdir(self.directory):
+            return
+        for file_name in os.listdir(self.directory):
+            if STORE_FILE_PATTERN.fullmatch(file_name):
+                try:
+                    os.remove(os.path.join(self.directory, file_name))
+                except FileNotFoundError:
+                    pass
+
+    def _write(self, path: str, df: pd.DataFrame) -> None:
+        """Writes a dataframe to an uncompressed Arrow file, atomically.
+
+        Args:
+            path (str): The path of the Arrow file.
+            df (pd.DataFrame): The dataframe.
+        """
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            # Uncompressed so that the file can be mapped without decoding.
+            feather.write_feather(df, tmp_path, compression="uncompressed")
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+DATASET_STORE = DatasetStore()
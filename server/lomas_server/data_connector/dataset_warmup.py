@@ -0,0 +1,50 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from lomas_core.models.config import PrivateDBCredentials
+from lomas_core.models.constants import DATASET_WARMUP_MAX_WORKERS
+from lomas_server.admin_database.admin_database import AdminDatabase
+from lomas_server.constants import DatasetWarmupStatus
+from lomas_server.data_connector.factory import data_connector_factory
+
+
+def warm_up_datasets(
+    dataset_names: List[str],
+    admin_database: AdminDatabase,
+    private_db_credentials: List[PrivateDBCredentials],
+    progress: Dict[str, DatasetWarmupStatus],
+    max_workers: int = DATASET_WARMUP_MAX_WORKERS,
+) -> None:
+    """Loads datasets in the dataset cache, in parallel.
+
+    A dataset which fails to load is reported and left to be loaded
+    on its first query.
+
+    Args:
+        dataset_names (List[str]): The names of the datasets to load.
+        admin_database (AdminDatabase): An initialized instance
+            of AdminDatabase.
+        private_db_credentials (List[PrivateDBCredentials]): The list of
+            private database credentials.
+        progress (Dict[str, DatasetWarmupStatus]): The status of each
+            dataset, updated as the datasets are loaded.
+        max_workers (int, optional): Number of datasets loaded in parallel.
+            Defaults to DATASET_WARMUP_MAX_WORKERS.
+    """
+    for dataset_name in dataset_names:
+        progress[dataset_name] = DatasetWarmupStatus.PENDING
+
+    def warm_up_dataset(dataset_name: str) -> None:
+        progress[dataset_name] = DatasetWarmupStatus.LOADING
+        try:
+            data_connector_factory(dataset_name, admin_database, private_db_credentials).get_pandas_df()
+        except Exception as e:  # pylint: disable=W0718
+            logging.exception(f"Failed to warm up dataset {dataset_name}: {getattr(e, 'error_message', e)}")
+            progress[dataset_name] = DatasetWarmupStatus.FAILED
+            return
+        logging.info(f"Dataset {dataset_name} warmed up.")
+        progress[dataset_name] = DatasetWarmupStatus.LOADED
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(warm_up_dataset, dataset_names))
@@ -1,13 +1,20 @@
 from typing import List
 
 from lomas_core.error_handler import InternalServerException
-from lomas_core.models.collections import DSPathAccess, DSS3Access
-from lomas_core.models.config import PrivateDBCredentials, S3CredentialsConfig
+from lomas_core.models.collections import DSPathAccess, DSS3Access, DSSQLAccess
+from lomas_core.models.config import (
+    PrivateDBCredentials,
+    S3CredentialsConfig,
+    SQLCredentialsConfig,
+)
 from lomas_core.models.constants import PrivateDatabaseType
 from lomas_server.admin_database.admin_database import AdminDatabase
 from lomas_server.data_connector.data_connector import DataConnector
+from lomas_server.data_connector.dataset_cache import get_dataset_cache_key
 from lomas_server.data_connector.path_connector import PathConnector
 from lomas_server.data_connector.s3_connector import S3Connector
+from lomas_server.data_connector.sql_connector import SQLConnector
+from lomas_server.utils.config import get_config
 
 
 def data_connector_factory(
@@ -22,6 +29,8 @@ def data_connector_factory(
         dataset_name (str): The dataset name.
         admin_database (AdminDatabase): An initialized instance
             of AdminDatabase.
+        private_db_credentials (List[PrivateDBCredentials]): The list of
+            private database credentials.
 
     Raises:
         InternalServerException: If the dataset type does not exist.
@@ -32,10 +41,11 @@ def data_connector_factory(
     ds_access = admin_database.get_dataset(dataset_name).dataset_access
 
     ds_metadata = admin_database.get_dataset_metadata(dataset_name)
+    cache_key = get_dataset_cache_key(dataset_name, ds_access)
 
     match ds_access:
         case DSPathAccess():
-            return PathConnector(ds_metadata, ds_access.path)
+            return PathConnector(ds_metadata, ds_access.path, ds_access.file_format, cache_key)
         case DSS3Access():
 
             credentials = get_dataset_credentials(
@@ -51,7 +61,23 @@ def data_connector_factory(
             ds_access.access_key_id = credentials.access_key_id
             ds_access.secret_access_key = credentials.secret_access_key
 
-            return S3Connector(ds_metadata, ds_access)
+            return S3Connector(ds_metadata, ds_access, cache_key, get_config().s3_download)
+        case DSSQLAccess():
+            ds_access = DSSQLAccess.model_validate(ds_access)
+            if ds_access.credentials_name is not None:
+                credentials = get_dataset_credentials(
+                    private_db_credentials,
+                    ds_access.database_type,
+                    ds_access.credentials_name,
+                )
+
+                if not isinstance(credentials, SQLCredentialsConfig):
+                    raise InternalServerException("Could not get correct credentials")
+
+                ds_access.user = credentials.user
+                ds_access.password = credentials.password
+
+            return SQLConnector(ds_metadata, ds_access, cache_key)
         case _:
             raise InternalServerException(f"Unknown database type: {ds_access.database_type}")
 
@@ -83,6 +109,10 @@ def get_dataset_credentials(
         for c in private_db_credentials:
             if isinstance(c, S3CredentialsConfig) and (credentials_name == c.credentials_name):
                 return c
+    elif db_type == PrivateDatabaseType.SQL:
+        for c in private_db_credentials:
+            if isinstance(c, SQLCredentialsConfig) and (credentials_name == c.credentials_name):
+                return c
 
     raise InternalServerException(
         "Could not find credentials for private dataset. Please contact server administrator."
@@ -1,11 +1,21 @@
+from typing import List, Optional
+
 import pandas as pd
 
 from lomas_core.models.collections import Metadata
-from lomas_server.data_connector.data_connector import DataConnector
+from lomas_server.data_connector.data_connector import (
+    DataConnector,
+    project_columns,
+    set_read_only,
+)
 
 
 class InMemoryConnector(DataConnector):
-    """DataConnector for a dataset created from an in-memory pandas DataFrame."""
+    """DataConnector for a dataset created from an in-memory pandas DataFrame.
+
+    The connector takes ownership of the dataframe, without copy, and marks
+    it read-only: all the queriers share the same buffers.
+    """
 
     def __init__(
         self,
@@ -16,16 +26,27 @@ class InMemoryConnector(DataConnector):
 
         Args:
             metadata (Metadata): Metadata dictionary.
-            dataset_df (pd.DataFrame): Dataframe of the dataset
+            dataset_df (pd.DataFrame): Dataframe of the dataset, must not
+                be modified by the caller afterwards.
         """
         super().__init__(metadata)
-        self.df: pd.DataFrame = dataset_df.copy()
+        self.df: pd.DataFrame = set_read_only(dataset_df)
 
-    def get_pandas_df(self) -> pd.DataFrame:
+    def get_pandas_df(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """Get the data in pandas dataframe format.
 
+        Args:
+            columns (Optional[List[str]], optional): The columns to load.
+                Defaults to None (all columns).
+
+        Raises:
+            InvalidQueryException: If a column is not in the dataset.
+
         Returns:
-            pd.DataFrame: pandas dataframe of dataset (a copy)
+            pd.DataFrame: pandas dataframe of dataset (shared, read-only)
         """
-        # We use a copy here for safety.
-        return self.df.copy()
+        if columns is None:
+            return self.df
+
+        self.check_columns(columns)
+        return project_columns(self.df, columns)
@@ -1,10 +1,16 @@
-from typing import Optional
+import os
+from typing import Iterator, List, Optional
+from urllib.parse import urlparse
+from urllib.request import Request, urlopen
 
 import pandas as pd
+import pyarrow as pa
 
-from lomas_core.error_handler import InternalServerException, InvalidQueryException
+from lomas_core.error_handler import InternalServerException
 from lomas_core.models.collections import Metadata
-from lomas_server.data_connector.data_connector import DataConnector
+from lomas_core.models.constants import DatasetFileFormat
+from lomas_server.data_connector.data_connector import DataConnector, get_file_format
+from lomas_server.data_connector.dataset_cache import DatasetCacheKey
 
 
 class PathConnector(DataConnector):
@@ -18,41 +24,128 @@ class PathConnector(DataConnector):
         self,
         metadata: Metadata,
         dataset_path: str,
+        file_format: Optional[DatasetFileFormat] = None,
+        cache_key: Optional[DatasetCacheKey] = None,
     ) -> None:
         """Initializer.
 
         Args:
             metadata (Metadata): The metadata dictionary.
             dataset_path (str): path of the dataset (local or remote).
+            file_format (Optional[DatasetFileFormat], optional): format of the
+                dataset file. Defaults to None (inferred from the path extension).
+            cache_key (Optional[DatasetCacheKey], optional): Key of the dataset
+                in the dataset cache. Defaults to None (not cached).
         """
-        super().__init__(metadata)
+        super().__init__(metadata, cache_key)
         self.ds_path: str = dataset_path
-        self.df: Optional[pd.DataFrame] = None
+        self.file_format: DatasetFileFormat = get_file_format(dataset_path, file_format)
 
-    def get_pandas_df(self) -> pd.DataFrame:
+    def get_pandas_df(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """Get the data in pandas dataframe format.
 
+        Args:
+            columns (Optional[List[str]], optional): The columns to load.
+                Defaults to None (all columns).
+
+        Raises:
+            InternalServerException: If the dataset cannot be read.
+            InvalidQueryException: If a column is not in the dataset.
+
+        Returns:
+            pd.DataFrame: pandas dataframe of dataset
+        """
+        return self.load_pandas_df(columns)
+
+    def read_dataset(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Read the dataset file at the dataset path.
+
+        Args:
+            columns (Optional[List[str]], optional): The columns to read.
+                Defaults to None (all columns).
+
         Raises:
-            InternalServerException: If the file format is not supported.
+            InternalServerException: If the dataset cannot be read.
 
         Returns:
             pd.DataFrame: pandas dataframe of dataset
         """
-        if self.df is None:
-            if self.ds_path.endswith(".csv"):
-                try:
-                    self.df = pd.read_csv(
-                        self.ds_path,
-                        dtype=self.dtypes,
-                        parse_dates=self.datetime_columns,
+        try:
+            if is_http_path(self.ds_path):
+                with urlopen(self.ds_path) as response:
+                    if self.file_format == DatasetFileFormat.CSV:
+                        return self.read_file(response, self.file_format, columns)
+                    # Arrow readers need a random access file, download it first.
+                    return self.read_file(pa.BufferReader(response.read()), self.file_format, columns)
+            return self.read_file(self.ds_path, self.file_format, columns)
+        except Exception as err:
+            raise InternalServerException(
+                f"Error reading {self.file_format} at path: {self.ds_path}: {err}",
+            ) from err
+
+    def read_dataset_batches(self, columns: Optional[List[str]], batch_size: int) -> Iterator[pd.DataFrame]:
+        """Reads the dataset file at the dataset path in batches of rows.
+
+        Local files and remote csv files are streamed, remote columnar
+        files are downloaded first as their readers need random access.
+
+        Args:
+            columns (Optional[List[str]]): The columns to read, None for all columns.
+            batch_size (int): The number of rows of each batch.
+
+        Raises:
+            InternalServerException: If the dataset cannot be read.
+
+        Returns:
+            Iterator[pd.DataFrame]: The batches of the dataset, in order.
+        """
+        try:
+            if is_http_path(self.ds_path):
+                with urlopen(self.ds_path) as response:
+                    source = (
+                        response
+                        if self.file_format == DatasetFileFormat.CSV
+                        else pa.BufferReader(response.read())
                     )
-                except Exception as err:
-                    raise InternalServerException(
-                        "Error reading csv at http path:" f"{self.ds_path}: {err}",
-                    ) from err
+                    yield from self.read_file_batches(source, self.file_format, columns, batch_size)
             else:
-                return InvalidQueryException(
-                    "File type other than .csv not supported for loading into pandas DataFrame."
-                )
+                yield from self.read_file_batches(self.ds_path, self.file_format, columns, batch_size)
+        except Exception as err:
+            raise InternalServerException(
+                f"Error reading {self.file_format} at path: {self.ds_path}: {err}",
+            ) from err
+
+    def get_version(self) -> Optional[str]:
+        """Gets the version of the dataset file.
+
+        It is the modification time and size of a local file, the ETag
+        or Last-Modified header of a remote one.
+
+        Raises:
+            InternalServerException: If the file cannot be reached.
 
-        return self.df
+        Returns:
+            Optional[str]: The version, None if a remote file has neither header.
+        """
+        try:
+            if is_http_path(self.ds_path):
+                with urlopen(Request(self.ds_path, method="HEAD")) as response:
+                    return response.headers.get("ETag") or response.headers.get("Last-Modified")
+            stat = os.stat(self.ds_path)
+            return f"{stat.st_mtime_ns}-{stat.st_size}"
+        except Exception as err:
+            raise InternalServerException(
+                f"Error getting version of {self.file_format} at path: {self.ds_path}: {err}",
+            ) from err
+
+
+def is_http_path(path: str) -> bool:
+    """Checks if a dataset path is a remote http(s) url.
+
+    Args:
+        path (str): The dataset path.
+
+    Returns:
+        bool: True if the path is an http(s) url, False otherwise.
+    """
+    return urlparse(path).scheme in ("http", "https")
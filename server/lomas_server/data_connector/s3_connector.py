@@ -1,55 +1,334 @@
-from typing import Optional
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import IO, Any, Iterator, List, Optional, Tuple
 
 import boto3
 import pandas as pd
+import pyarrow as pa
+from botocore.config import Config as BotoConfig
+from botocore.exceptions import ClientError
 
 from lomas_core.error_handler import InternalServerException
 from lomas_core.models.collections import DSS3Access, Metadata
-from lomas_server.data_connector.data_connector import DataConnector
+from lomas_core.models.config import S3DownloadConfig
+from lomas_core.models.constants import DatasetFileFormat
+from lomas_server.data_connector.data_connector import DataConnector, get_file_format
+from lomas_server.data_connector.dataset_cache import DatasetCacheKey
 
 
 class S3Connector(DataConnector):
-    """DataConnector for dataset in S3 storage."""
+    """DataConnector for dataset in S3 storage.
+
+    Objects larger than one part are downloaded with parallel byte-range
+    requests and reassembled in memory, or in a local spill file above
+    the configured buffer size.
+    """
 
     def __init__(
         self,
         metadata: Metadata,
         credentials: DSS3Access,
+        cache_key: Optional[DatasetCacheKey] = None,
+        download_config: Optional[S3DownloadConfig] = None,
     ) -> None:
         """Initializer.
 
         Args:
             metadata (Metadata): The metadata dictionary.
             s3_parameters (dict): informations to access metadata
+            cache_key (Optional[DatasetCacheKey], optional): Key of the dataset
+                in the dataset cache. Defaults to None (not cached).
+            download_config (Optional[S3DownloadConfig], optional): Parallel
+                download parameters. Defaults to None (default parameters).
         """
-        super().__init__(metadata)
+        super().__init__(metadata, cache_key)
 
+        self.download_config: S3DownloadConfig = download_config or S3DownloadConfig()
         self.client = boto3.client(
             "s3",
             endpoint_url=credentials.endpoint_url,
             aws_access_key_id=credentials.access_key_id,
             aws_secret_access_key=credentials.secret_access_key,
+            config=BotoConfig(max_pool_connections=max(10, self.download_config.max_concurrency)),
         )
         self.bucket: str = credentials.bucket
         self.key: str = credentials.key
-        self.df: Optional[pd.DataFrame] = None
+        self.file_format: DatasetFileFormat = get_file_format(credentials.key, credentials.file_format)
 
-    def get_pandas_df(self) -> pd.DataFrame:
+    def get_pandas_df(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
         """Get the data in pandas dataframe format.
 
+        Args:
+            columns (Optional[List[str]], optional): The columns to load.
+                Defaults to None (all columns).
+
+        Raises:
+            InternalServerException: If the dataset cannot be read.
+            InvalidQueryException: If a column is not in the dataset.
+
+        Returns:
+            pd.DataFrame: pandas dataframe of dataset
+        """
+        return self.load_pandas_df(columns)
+
+    def read_dataset(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Download and read the dataset object from S3.
+
+        Args:
+            columns (Optional[List[str]], optional): The columns to read.
+                Defaults to None (all columns).
+
         Raises:
             InternalServerException: If the dataset cannot be read.
 
         Returns:
             pd.DataFrame: pandas dataframe of dataset
         """
-        if self.df is None:
-            obj = self.client.get_object(Bucket=self.bucket, Key=self.key)
-            try:
-                self.df = pd.read_csv(obj["Body"], dtype=self.dtypes)
-            except Exception as err:
-                raise InternalServerException(
-                    "Error reading csv at s3 path:" + f"{self.bucket}/{self.key}: {err}"
-                ) from err
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self.key)
+            size, etag = head["ContentLength"], head["ETag"]
+
+            if size <= self.download_config.part_size_bytes or self.download_config.max_concurrency == 1:
+                obj = self.client.get_object(Bucket=self.bucket, Key=self.key, IfMatch=etag)
+                if self.file_format == DatasetFileFormat.CSV:
+                    return self.read_file(obj["Body"], self.file_format, columns)
+                # Arrow readers need a random access file.
+                return self.read_file(pa.BufferReader(obj["Body"].read()), self.file_format, columns)
+
+            if size <= self.download_config.max_buffer_bytes:
+                buffer = bytearray(size)
+                self._download_ranges(size, etag, buffer=buffer)
+                return self.read_file(pa.BufferReader(buffer), self.file_format, columns)
+
+            with tempfile.NamedTemporaryFile(dir=self.download_config.spill_directory) as spill_file:
+                spill_file.truncate(size)
+                self._download_ranges(size, etag, spill_file=spill_file)
+                return self.read_file(spill_file.name, self.file_format, columns)
+        except Exception as err:
+            raise InternalServerException(
+                f"Error reading {self.file_format} at s3 path: {self.bucket}/{self.key}: {err}"
+            ) from err
+
+    def read_dataset_batches(self, columns: Optional[List[str]], batch_size: int) -> Iterator[pd.DataFrame]:
+        """Reads the dataset object from S3 in batches of rows, without downloading it whole.
+
+        Csv objects are parsed from the response stream. Parquet and arrow
+        objects are read through a random access file issuing byte-range
+        requests, so that only the footer and the row groups (or record
+        batches) of the requested columns are downloaded, one at a time.
+
+        Args:
+            columns (Optional[List[str]]): The columns to read, None for all columns.
+            batch_size (int): The number of rows of each batch.
+
+        Raises:
+            InternalServerException: If the dataset cannot be read.
+
+        Returns:
+            Iterator[pd.DataFrame]: The batches of the dataset, in order.
+        """
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=self.key)
+            size, etag = head["ContentLength"], head["ETag"]
+            if self.file_format == DatasetFileFormat.CSV:
+                obj = self.client.get_object(Bucket=self.bucket, Key=self.key, IfMatch=etag)
+                yield from self.read_file_batches(obj["Body"], self.file_format, columns, batch_size)
+            else:
+                source = S3ObjectFile(self.client, self.bucket, self.key, size, etag)
+                yield from self.read_file_batches(source, self.file_format, columns, batch_size)
+        except Exception as err:
+            raise InternalServerException(
+                f"Error reading {self.file_format} at s3 path: {self.bucket}/{self.key}: {err}"
+            ) from err
+
+    def get_version(self) -> Optional[str]:
+        """Gets the ETag of the dataset object.
+
+        Raises:
+            InternalServerException: If the object cannot be reached.
+
+        Returns:
+            Optional[str]: The ETag of the object.
+        """
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.key)["ETag"]
+        except ClientError as err:
+            raise InternalServerException(
+                f"Error getting version of s3 path: {self.bucket}/{self.key}: {err}"
+            ) from err
+
+    def is_modified(self, version: Optional[str]) -> bool:
+        """Checks if the dataset object changed, with a request conditional on its ETag.
+
+        Args:
+            version (Optional[str]): The ETag of a cached copy.
+
+        Raises:
+            InternalServerException: If the object cannot be reached.
+
+        Returns:
+            bool: True if the object changed, False otherwise.
+        """
+        if version is None:
+            return False
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.key, IfNoneMatch=version)
+        except ClientError as err:
+            if err.response["Error"]["Code"] in ("304", "NotModified"):
+                return False
+            raise InternalServerException(
+                f"Error revalidating s3 path: {self.bucket}/{self.key}: {err}"
+            ) from err
+        return True
+
+    def _download_ranges(
+        self,
+        size: int,
+        etag: str,
+        buffer: Optional[bytearray] = None,
+        spill_file: Optional[IO[bytes]] = None,
+    ) -> None:
+        """Downloads the object with parallel byte-range requests.
+
+        Each part is written at its offset, in the buffer or in the spill file.
+        All the requests are conditional on the ETag so that an object
+        replaced during the download is not reassembled from two versions.
+
+        Args:
+            size (int): The size of the object in bytes.
+            etag (str): The ETag of the object.
+            buffer (Optional[bytearray], optional): The buffer of the object size.
+                Defaults to None.
+            spill_file (Optional[IO[bytes]], optional): The spill file.
+                Defaults to None.
+        """
+        view = memoryview(buffer) if buffer is not None else None
+
+        def download_part(part: Tuple[int, int]) -> None:
+            start, end = part
+            obj = self.client.get_object(
+                Bucket=self.bucket,
+                Key=self.key,
+                Range=f"bytes={start}-{end - 1}",
+                IfMatch=etag,
+            )
+            data = obj["Body"].read()
+            if len(data) != end - start:
+                raise InternalServerException(f"Incomplete download of bytes {start}-{end - 1}.")
+            if view is not None:
+                view[start:end] = data
+            else:
+                os.pwrite(spill_file.fileno(), data, start)  # type: ignore [union-attr]
+
+        parts = get_byte_ranges(size, self.download_config.part_size_bytes)
+        with ThreadPoolExecutor(max_workers=self.download_config.max_concurrency) as executor:
+            # Consume the results to raise the first error.
+            list(executor.map(download_part, parts))
+
+
+class S3ObjectFile(io.RawIOBase):
+    """Read-only random access file over an S3 object.
+
+    Each read is a byte-range request, conditional on the ETag so that
+    an object replaced during the reads is not mixed from two versions.
+    """
+
+    def __init__(self, client: Any, bucket: str, key: str, size: int, etag: str) -> None:
+        """Initializer.
+
+        Args:
+            client (Any): The boto3 S3 client.
+            bucket (str): The bucket of the object.
+            key (str): The key of the object.
+            size (int): The size of the object in bytes.
+            etag (str): The ETag of the object.
+        """
+        super().__init__()
+        self.client = client
+        self.bucket: str = bucket
+        self.key: str = key
+        self.size: int = size
+        self.etag: str = etag
+        self.position: int = 0
+
+    def readable(self) -> bool:
+        """The object can be read.
+
+        Returns:
+            bool: True.
+        """
+        return True
+
+    def seekable(self) -> bool:
+        """The object can be read at any position.
+
+        Returns:
+            bool: True.
+        """
+        return True
+
+    def tell(self) -> int:
+        """Gets the current position in the object.
+
+        Returns:
+            int: The position in bytes.
+        """
+        return self.position
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        """Moves the current position in the object.
+
+        Args:
+            offset (int): The offset in bytes.
+            whence (int, optional): The reference of the offset, as for
+                :py:meth:`io.IOBase.seek`. Defaults to io.SEEK_SET.
+
+        Returns:
+            int: The new position in bytes.
+        """
+        match whence:
+            case io.SEEK_SET:
+                self.position = offset
+            case io.SEEK_CUR:
+                self.position += offset
+            case io.SEEK_END:
+                self.position = self.size + offset
+        return self.position
+
+    def readinto(self, buffer: Any) -> int:
+        """Reads bytes at the current position with a byte-range request.
+
+        Args:
+            buffer (Any): The writable buffer to fill.
+
+        Returns:
+            int: The number of bytes read, 0 at the end of the object.
+        """
+        nb_bytes = min(len(buffer), self.size - self.position)
+        if nb_bytes <= 0:
+            return 0
+        obj = self.client.get_object(
+            Bucket=self.bucket,
+            Key=self.key,
+            Range=f"bytes={self.position}-{self.position + nb_bytes - 1}",
+            IfMatch=self.etag,
+        )
+        data = obj["Body"].read()
+        buffer[: len(data)] = data
+        self.position += len(data)
+        return len(data)
+
+
+def get_byte_ranges(size: int, part_size: int) -> List[Tuple[int, int]]:
+    """Splits an object in byte ranges.
+
+    Args:
+        size (int): The size of the object in bytes.
+        part_size (int): The size of a range in bytes.
 
-        return self.df
+    Returns:
+        List[Tuple[int, int]]: The (start, end) of each range, end excluded.
+    """
+    return [(start, min(start + part_size, size)) for start in range(0, size, part_size)]
@@ -0,0 +1,212 @@
+import sqlite3
+from typing import Any, Iterator, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from lomas_core.error_handler import InternalServerException
+from lomas_core.models.collections import DSSQLAccess, Metadata
+from lomas_core.models.constants import SQLEngine
+from lomas_server.constants import SSQL_TABLE_NAME
+from lomas_server.data_connector.data_connector import DataConnector, set_read_only
+from lomas_server.data_connector.dataset_cache import DatasetCacheKey
+
+
+class SQLConnector(DataConnector):
+    """DataConnector for a dataset in a table of a SQL database.
+
+    Smartnoise-sql queries are executed by the database engine on a live
+    connection (see :py:meth:`get_connection`), so that the table is never
+    loaded in the server. The other libraries get the table as a pandas
+    dataframe, through the dataset cache.
+    """
+
+    def __init__(
+        self,
+        metadata: Metadata,
+        credentials: DSSQLAccess,
+        cache_key: Optional[DatasetCacheKey] = None,
+    ) -> None:
+        """Initializer.
+
+        Args:
+            metadata (Metadata): The metadata dictionary.
+            credentials (DSSQLAccess): Informations to access the table,
+                with the user and password of the database if needed.
+            cache_key (Optional[DatasetCacheKey], optional): Key of the dataset
+                in the dataset cache. Defaults to None (not cached).
+        """
+        super().__init__(metadata, cache_key)
+        self.access: DSSQLAccess = credentials
+        self.engine: SQLEngine = credentials.engine
+
+    def get_pandas_df(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Get the data in pandas dataframe format.
+
+        Args:
+            columns (Optional[List[str]], optional): The columns to load.
+                Defaults to None (all columns).
+
+        Raises:
+            InternalServerException: If the table cannot be read.
+            InvalidQueryException: If a column is not in the dataset.
+
+        Returns:
+            pd.DataFrame: pandas dataframe of dataset
+        """
+        return self.load_pandas_df(columns)
+
+    def read_dataset(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Reads the table, or some of its columns, from the database.
+
+        Args:
+            columns (Optional[List[str]], optional): The columns to read.
+                Defaults to None (all the columns of the metadata).
+
+        Raises:
+            InternalServerException: If the table cannot be read.
+
+        Returns:
+            pd.DataFrame: pandas dataframe of dataset
+        """
+        columns = columns or list(self.metadata.columns)
+        query = f"SELECT {', '.join(quote_identifier(col) for col in columns)} FROM {self.get_table_name()}"
+
+        connection = self.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(query)
+            rows = cursor.fetchall()
+        except Exception as err:
+            raise InternalServerException(
+                f"Error reading table {self.get_table_name()} of {self.engine} database: {err}"
+            ) from err
+        finally:
+            connection.close()
+
+        return self.rows_to_pandas(columns, rows)
+
+    def read_dataset_batches(self, columns: Optional[List[str]], batch_size: int) -> Iterator[pd.DataFrame]:
+        """Reads the table, or some of its columns, from the database in batches of rows.
+
+        The rows are fetched from the cursor batch by batch.
+
+        Args:
+            columns (Optional[List[str]]): The columns to read, None for all
+                the columns of the metadata.
+            batch_size (int): The number of rows of each batch.
+
+        Raises:
+            InternalServerException: If the table cannot be read.
+
+        Returns:
+            Iterator[pd.DataFrame]: The batches of the table, in order.
+        """
+        columns = columns or list(self.metadata.columns)
+        query = f"SELECT {', '.join(quote_identifier(col) for col in columns)} FROM {self.get_table_name()}"
+
+        connection = self.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(query)
+            while rows := cursor.fetchmany(batch_size):
+                yield set_read_only(self.rows_to_pandas(columns, rows))
+        except Exception as err:
+            raise InternalServerException(
+                f"Error reading table {self.get_table_name()} of {self.engine} database: {err}"
+            ) from err
+        finally:
+            connection.close()
+
+    def rows_to_pandas(self, columns: List[str], rows: List[tuple]) -> pd.DataFrame:
+        """Converts rows fetched from the database to a dataframe with the metadata types.
+
+        Args:
+            columns (List[str]): The columns of the rows.
+            rows (List[tuple]): The rows.
+
+        Returns:
+            pd.DataFrame: The pandas dataframe.
+        """
+        values = list(zip(*rows)) if rows else [() for _ in columns]
+        table = pa.Table.from_pydict({col: list(col_values) for col, col_values in zip(columns, values)})
+        return self.arrow_table_to_pandas(table)
+
+    def get_connection(self) -> Any:
+        """Opens a connection on which the table can be queried as `df`.
+
+        The table is exposed through a temporary view, which only lives
+        as long as the connection, so that the queries keep referring
+        to the private table as for the other types of databases.
+        The caller closes the connection once the query is done.
+
+        Raises:
+            InternalServerException: If the database cannot be reached.
+
+        Returns:
+            Any: The DB-API connection, sqlite3 or psycopg2 depending on the engine.
+        """
+        connection = self.connect()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(
+                f"CREATE TEMPORARY VIEW {quote_identifier(SSQL_TABLE_NAME)} "
+                + f"AS SELECT * FROM {self.get_table_name()}"
+            )
+            connection.commit()
+        except Exception as err:
+            connection.close()
+            raise InternalServerException(
+                f"Error opening table {self.get_table_name()} of {self.engine} database: {err}"
+            ) from err
+        return connection
+
+    def connect(self) -> Any:
+        """Opens a new connection to the database.
+
+        Raises:
+            InternalServerException: If the database cannot be reached.
+
+        Returns:
+            Any: The DB-API connection, sqlite3 or psycopg2 depending on the engine.
+        """
+        try:
+            match self.engine:
+                case SQLEngine.SQLITE:
+                    # The querier may run the cost and the query in different threads.
+                    return sqlite3.connect(self.access.database, check_same_thread=False)
+                case SQLEngine.POSTGRES:
+                    import psycopg2  # pylint: disable=C0415
+
+                    return psycopg2.connect(
+                        host=self.access.host,
+                        port=self.access.port,
+                        dbname=self.access.database,
+                        user=self.access.user,
+                        password=self.access.password,
+                    )
+        except Exception as err:
+            raise InternalServerException(f"Error connecting to {self.engine} database: {err}") from err
+        raise InternalServerException(f"Unknown SQL engine: {self.engine}")
+
+    def get_table_name(self) -> str:
+        """Gets the quoted name of the table, with its schema if any.
+
+        Returns:
+            str: The qualified table name.
+        """
+        if self.access.db_schema is None:
+            return quote_identifier(self.access.table)
+        return f"{quote_identifier(self.access.db_schema)}.{quote_identifier(self.access.table)}"
+
+
+def quote_identifier(identifier: str) -> str:
+    """Quotes a SQL identifier, for PostgreSQL and SQLite.
+
+    Args:
+        identifier (str): The table, schema or column name.
+
+    Returns:
+        str: The quoted identifier.
+    """
+    return '"' + identifier.replace('"', '""') + '"'
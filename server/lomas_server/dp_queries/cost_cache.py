@@ -0,0 +1,186 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Callable, Optional, Tuple
+
+from lomas_core.constants import DPLibraries
+from lomas_core.models.config import CostCacheConfig
+from lomas_core.models.constants import COST_CACHE_MAX_ENTRIES, COST_CACHE_TTL
+from lomas_core.models.requests import LomasRequestModel, QueryModel
+from lomas_server.utils.metrics import COST_CACHE_HIT_COUNTER, COST_CACHE_MISS_COUNTER
+
+if TYPE_CHECKING:
+    from lomas_server.dp_queries.dp_querier import DPQuerier
+
+# (library, request hash, dataset version)
+CostCacheKey = Tuple[str, str, str]
+Cost = Tuple[float, float]
+
+
+class CostCache:
+    """Process-wide, thread-safe cache of estimated query costs.
+
+    Estimating the cost of some queries (smartnoise-synth, diffprivlib)
+    requires fitting the whole model. The costs are cached per library,
+    request and version of the dataset, so that the same estimation
+    repeated while tuning a query is answered without fitting again.
+    Entries expire after a time to live and the least recently used
+    ones are evicted above the maximum number of entries.
+    """
+
+    def __init__(
+        self, max_entries: int = COST_CACHE_MAX_ENTRIES, ttl_seconds: float = COST_CACHE_TTL
+    ) -> None:
+        """Initializer.
+
+        Args:
+            max_entries (int, optional): The maximum number of cached costs.
+                Defaults to COST_CACHE_MAX_ENTRIES.
+            ttl_seconds (float, optional): The time to live of a cached cost.
+                Defaults to COST_CACHE_TTL.
+        """
+        self.max_entries: int = max_entries
+        self.ttl_seconds: float = ttl_seconds
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[CostCacheKey, Tuple[Cost, float]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether costs are cached.
+
+        Returns:
+            bool: True if costs are cached, False otherwise.
+        """
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def set_config(self, config: CostCacheConfig) -> None:
+        """Sets the size and time to live, and evicts costs that no longer fit.
+
+        Args:
+            config (CostCacheConfig): The cost cache config.
+        """
+        with self._lock:
+            self.max_entries = config.max_entries
+            self.ttl_seconds = config.ttl_seconds
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: CostCacheKey) -> Optional[Cost]:
+        """Gets a cost from the cache and marks it as recently used.
+
+        Args:
+            key (CostCacheKey): The cost cache key.
+
+        Returns:
+            Optional[Cost]: The cached (epsilon, delta), None if not
+                cached or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            cost, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return cost
+
+    def put(self, key: CostCacheKey, cost: Cost) -> None:
+        """Adds (or replaces) a cost in the cache.
+
+        Args:
+            key (CostCacheKey): The cost cache key.
+            cost (Cost): The (epsilon, delta) cost.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (cost, time.monotonic() + self.ttl_seconds)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key: CostCacheKey, estimator: Callable[[], Cost]) -> Cost:
+        """Gets a cost from the cache, estimating it on a miss.
+
+        Failed estimations are not cached.
+
+        Args:
+            key (CostCacheKey): The cost cache key.
+            estimator (Callable[[], Cost]): Function estimating the cost.
+
+        Returns:
+            Cost: The (epsilon, delta) cost.
+        """
+        cost = self.get(key)
+        if cost is not None:
+            COST_CACHE_HIT_COUNTER.add(1, {"library": key[0]})
+            return cost
+
+        COST_CACHE_MISS_COUNTER.add(1, {"library": key[0]})
+        cost = estimator()
+        self.put(key, cost)
+        return cost
+
+    def clear(self) -> None:
+        """Removes all costs from the cache."""
+        with self._lock:
+            self._entries.clear()
+
+
+def get_request_hash(request_model: LomasRequestModel) -> str:
+    """Computes a canonical hash of the parameters of a request which determine its cost.
+
+    Fields of the query models which only affect the result (such as
+    the number of samples or the post-processing) are left out, so that
+    a cost estimation and the matching query share the same hash.
+
+    Args:
+        request_model (LomasRequestModel): The request or query model.
+
+    Returns:
+        str: The hexadecimal sha256 of the request parameters.
+    """
+    request_class = next(
+        cls
+        for cls in type(request_model).__mro__
+        if issubclass(cls, LomasRequestModel) and not issubclass(cls, QueryModel)
+    )
+    params = request_model.model_dump(mode="json", include=set(request_class.model_fields))
+    canonical = json.dumps(params, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def estimate_cost(
+    library: DPLibraries,
+    querier: "DPQuerier",
+    request_model: LomasRequestModel,
+    version: Optional[str],
+) -> Cost:
+    """Estimates the cost of a request, through the cost cache for the libraries fitting a model.
+
+    Costs are only cached for datasets with a version, so that a change
+    of the data is never answered with a stale cost.
+
+    Args:
+        library (DPLibraries): The DP library of the request.
+        querier (DPQuerier): The querier of the library, on the private dataset.
+        request_model (LomasRequestModel): The request model.
+        version (Optional[str]): The version of the dataset, taken before
+            the estimation. None if the dataset has no version.
+
+    Returns:
+        Cost: The (epsilon, delta) cost.
+    """
+    if not (querier.memoize_cost and COST_CACHE.enabled) or version is None:
+        return querier.run_cost(request_model)
+
+    key = (str(library), get_request_hash(request_model), version)
+    return COST_CACHE.get_or_compute(key, lambda: querier.run_cost(request_model))
+
+
+COST_CACHE = CostCache()
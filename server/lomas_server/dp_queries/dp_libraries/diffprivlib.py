@@ -1,5 +1,5 @@
 import warnings
-from typing import Optional
+from typing import List, Optional
 
 import pandas as pd
 from diffprivlib.utils import PrivacyLeakWarning
@@ -20,6 +20,7 @@ from lomas_core.models.responses import DiffPrivLibQueryResult
 from lomas_server.admin_database.admin_database import AdminDatabase
 from lomas_server.data_connector.data_connector import DataConnector
 from lomas_server.dp_queries.dp_libraries.utils import (
+    decode_categoricals,
     handle_missing_data,
 )
 from lomas_server.dp_queries.dp_querier import DPQuerier
@@ -28,6 +29,10 @@ from lomas_server.dp_queries.dp_querier import DPQuerier
 class DiffPrivLibQuerier(DPQuerier[DiffPrivLibRequestModel, DiffPrivLibQueryModel, DiffPrivLibQueryResult]):
     """Concrete implementation of the DPQuerier ABC for the DiffPrivLib library."""
 
+    dp_library = DPLibraries.DIFFPRIVLIB
+    # The cost is only known once the model is fitted.
+    memoize_cost = True
+
     def __init__(
         self,
         data_connector: DataConnector,
@@ -56,7 +61,8 @@ class DiffPrivLibQuerier(DPQuerier[DiffPrivLibRequestModel, DiffPrivLibQueryMode
             y_test (pd.DataFrame): test data target
         """
         # Prepare data
-        raw_data = self.data_connector.get_pandas_df()
+        columns = self.get_dataset_columns(query_json)
+        raw_data = decode_categoricals(self.data_connector.get_private_pandas_df(columns))
         data = handle_missing_data(raw_data, query_json.imputer_strategy)
         x_train, x_test, y_train, y_test = split_train_test_data(data, query_json)
 
@@ -84,6 +90,17 @@ class DiffPrivLibQuerier(DPQuerier[DiffPrivLibRequestModel, DiffPrivLibQueryMode
 
         return dpl_pipeline, x_test, y_test
 
+    def get_dataset_columns(self, query_json: DiffPrivLibRequestModel) -> Optional[List[str]]:
+        """Gets the columns of the dataset read by a request, shared with the process pool.
+
+        Args:
+            query_json (DiffPrivLibRequestModel): The input object of the request.
+
+        Returns:
+            Optional[List[str]]: The feature and target columns.
+        """
+        return query_json.feature_columns + (query_json.target_columns or [])
+
     def cost(self, query_json: DiffPrivLibRequestModel) -> tuple[float, float]:
         """Estimate cost of query.
 
@@ -108,6 +125,26 @@ class DiffPrivLibQuerier(DPQuerier[DiffPrivLibRequestModel, DiffPrivLibQueryMode
             spent_delta += step[1].accountant.spent_budget[0][1]
         return spent_epsilon, spent_delta
 
+    def get_fitted_model(self) -> Optional[tuple[Pipeline, pd.DataFrame, pd.DataFrame]]:
+        """Gets the pipeline fitted by the last call to `cost`, with its test data.
+
+        Returns:
+            Optional[tuple[Pipeline, pd.DataFrame, pd.DataFrame]]: The fitted
+                pipeline, the test features and targets, None if not fitted.
+        """
+        if self.dpl_pipeline is None:
+            return None
+        return self.dpl_pipeline, self.x_test, self.y_test
+
+    def set_fitted_model(self, fitted_model: tuple[Pipeline, pd.DataFrame, pd.DataFrame]) -> None:
+        """Sets a pipeline fitted by `cost` on another querier, with its test data.
+
+        Args:
+            fitted_model (tuple[Pipeline, pd.DataFrame, pd.DataFrame]): The
+                fitted pipeline, the test features and targets.
+        """
+        self.dpl_pipeline, self.x_test, self.y_test = fitted_model
+
     def query(
         self,
         query_json: DiffPrivLibQueryModel,  # pylint: disable=unused-argument
@@ -24,6 +24,8 @@ from lomas_server.dp_queries.dp_querier import DPQuerier
 class OpenDPQuerier(DPQuerier[OpenDPRequestModel, OpenDPQueryModel, OpenDPQueryResult]):
     """Concrete implementation of the DPQuerier ABC for the OpenDP library."""
 
+    dp_library = DPLibraries.OPENDP
+
     def cost(self, query_json: OpenDPRequestModel) -> tuple[float, float]:
         """
         Estimate cost of query.
@@ -93,7 +95,7 @@ class OpenDPQuerier(DPQuerier[OpenDPRequestModel, OpenDPQueryModel, OpenDPQueryR
         """
         opendp_pipe = reconstruct_measurement_pipeline(query_json.opendp_json)
 
-        input_data = self.data_connector.get_pandas_df().to_csv(header=False, index=False)
+        input_data = self.data_connector.get_csv_payload()
 
         try:
             release_data = opendp_pipe(input_data)
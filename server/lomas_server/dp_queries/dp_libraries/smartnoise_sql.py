@@ -1,8 +1,10 @@
-from typing import Optional
+from typing import Any, List, Optional
 
 import pandas as pd
 from snsql import Mechanism, Privacy, Stat, from_connection
+from snsql._ast.ast import AllColumns, Column, Select
 from snsql.reader.base import Reader
+from snsql.sql.parse import QueryParser
 
 from lomas_core.constants import DPLibraries
 from lomas_core.error_handler import (
@@ -17,8 +19,10 @@ from lomas_core.models.requests import (
 )
 from lomas_core.models.responses import SmartnoiseSQLQueryResult
 from lomas_server.admin_database.admin_database import AdminDatabase
-from lomas_server.constants import SSQL_MAX_ITERATION, SSQL_STATS
+from lomas_server.constants import SSQL_MAX_ITERATION, SSQL_STATS, SSQL_TABLE_NAME
 from lomas_server.data_connector.data_connector import DataConnector
+from lomas_server.data_connector.sql_connector import SQLConnector
+from lomas_server.dp_queries.dp_libraries.utils import decode_categoricals
 from lomas_server.dp_queries.dp_querier import DPQuerier
 
 
@@ -27,6 +31,8 @@ class SmartnoiseSQLQuerier(
 ):
     """Concrete implementation of the DPQuerier ABC for the SmartNoiseSQL library."""
 
+    dp_library = DPLibraries.SMARTNOISE_SQL
+
     def __init__(
         self,
         data_connector: DataConnector,
@@ -34,6 +40,73 @@ class SmartnoiseSQLQuerier(
     ) -> None:
         super().__init__(data_connector, admin_database)
         self.reader: Optional[Reader] = None
+        # Privacy of the last estimated query, to open its reader again after `close`.
+        self.privacy: Optional[Privacy] = None
+        # Connection of the reader to a SQL database, open from `cost` to `close`.
+        self.connection: Optional[Any] = None
+
+    def close(self) -> None:
+        """Closes the connection of the reader to the SQL database and releases the reader.
+
+        The reader is opened again by `query` if needed, so that batches of
+        queries do not hold one connection or projected dataset per query.
+        """
+        super().close()
+        self.reader = None
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def open_reader(self, query_str: str) -> Reader:
+        """Opens a reader on the dataset with the privacy of the last estimated query.
+
+        Args:
+            query_str (str): The SQL query, to load only the columns it uses.
+
+        Returns:
+            Reader: The smartnoise-sql private reader.
+        """
+        metadata = self.data_connector.get_metadata()
+        smartnoise_metadata = convert_to_smartnoise_metadata(metadata)
+
+        if isinstance(self.data_connector, SQLConnector):
+            # The query runs in the database engine, the table is not loaded.
+            self.connection = self.data_connector.get_connection()
+            return from_connection(
+                self.connection,
+                engine=self.data_connector.engine,
+                privacy=self.privacy,
+                metadata=smartnoise_metadata,
+            )
+
+        columns = get_query_columns(query_str, metadata)
+        return from_connection(
+            decode_categoricals(self.data_connector.get_pandas_df(columns)),
+            privacy=self.privacy,
+            metadata=smartnoise_metadata,
+        )
+
+    def runs_in_process_pool(self) -> bool:
+        """Whether `cost` and `query` run in the process pool of the library.
+
+        Queries on a SQL database run in the database engine, in the server.
+
+        Returns:
+            bool: True if the library has a process pool and the dataset
+                is not a SQL database, False otherwise.
+        """
+        return not isinstance(self.data_connector, SQLConnector) and super().runs_in_process_pool()
+
+    def get_dataset_columns(self, query_json: SmartnoiseSQLRequestModel) -> Optional[List[str]]:
+        """Gets the columns of the dataset read by a request, shared with the process pool.
+
+        Args:
+            query_json (SmartnoiseSQLRequestModel): The input object of the request.
+
+        Returns:
+            Optional[List[str]]: The columns referenced in the query, None for all the columns.
+        """
+        return get_query_columns(query_json.query_str, self.data_connector.get_metadata())
 
     def cost(self, query_json: SmartnoiseSQLRequestModel) -> tuple[float, float]:
         """Estimate cost of query.
@@ -50,16 +123,9 @@ class SmartnoiseSQLQuerier(
                 is the epsilon cost, the second value is the delta value.
         """
         privacy = Privacy(epsilon=query_json.epsilon, delta=query_json.delta)
-        privacy = set_mechanisms(privacy, query_json.mechanisms)
-
-        metadata = self.data_connector.get_metadata()
-        smartnoise_metadata = convert_to_smartnoise_metadata(metadata)
-
-        self.reader = from_connection(
-            self.data_connector.get_pandas_df(),
-            privacy=privacy,
-            metadata=smartnoise_metadata,
-        )
+        self.close()
+        self.privacy = set_mechanisms(privacy, query_json.mechanisms)
+        self.reader = self.open_reader(query_json.query_str)
 
         try:
             epsilon, delta = self.reader.get_privacy_cost(query_json.query_str)
@@ -104,8 +170,10 @@ class SmartnoiseSQLQuerier(
         """
         epsilon, delta = query_json.epsilon, query_json.delta
 
-        if self.reader is None:
+        if self.privacy is None:
             raise InternalServerException("Smartnoise SQL `query` method called before `cost` method")
+        if self.reader is None:
+            self.reader = self.open_reader(query_json.query_str)
 
         try:
             result = self.reader.execute(query_json.query_str, postprocess=query_json.postprocess)
@@ -163,6 +231,44 @@ def set_mechanisms(privacy: Privacy, mechanisms: dict[str, str]) -> Privacy:
     return privacy
 
 
+def get_query_columns(query_str: str, metadata: Metadata) -> Optional[List[str]]:
+    """Get the dataset columns referenced in a SQL query.
+
+    Private id columns are always included as smartnoise-sql may use them
+    to bound the contribution of each individual.
+
+    Args:
+        query_str (str): The SQL query.
+        metadata (Metadata): Dataset metadata from admin database
+
+    Returns:
+        Optional[List[str]]: The referenced columns, in metadata order.
+            None if all the columns are needed or the query cannot be parsed
+            (the error is then raised by smartnoise-sql itself).
+    """
+    try:
+        query = QueryParser().query(query_str)
+    except Exception:  # pylint: disable=W0718
+        return None
+
+    # SELECT * needs all the columns, COUNT(*) none in particular
+    for select in query.find_nodes(Select):
+        if any(isinstance(expr.expression, AllColumns) for expr in select.namedExpressions):
+            return None
+
+    # Identifiers are case insensitive and may be prefixed by the table name
+    names = {column.name.split(".")[-1].strip('"').lower() for column in query.find_nodes(Column)}
+    columns = [
+        col_name
+        for col_name, col_metadata in metadata.columns.items()
+        if col_name.lower() in names or col_metadata.private_id
+    ]
+    if not columns:
+        # Keep one column, a dataframe without columns has no rows.
+        columns = list(metadata.columns)[:1]
+    return columns
+
+
 def convert_to_smartnoise_metadata(metadata: Metadata) -> dict:
     """Convert Lomas metadata to smartnoise metadata format (for SQL).
 
@@ -174,4 +280,4 @@ def convert_to_smartnoise_metadata(metadata: Metadata) -> dict:
     metadata_dict = metadata.model_dump()
     metadata_dict.update(metadata_dict["columns"])
     del metadata_dict["columns"]
-    return {"": {"": {"df": metadata_dict}}}
+    return {"": {"": {SSQL_TABLE_NAME: metadata_dict}}}
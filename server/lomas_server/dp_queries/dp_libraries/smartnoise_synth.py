@@ -51,6 +51,7 @@ from lomas_server.constants import (
     SSynthTableTransStyle,
 )
 from lomas_server.data_connector.data_connector import DataConnector
+from lomas_server.dp_queries.dp_libraries.utils import decode_categoricals
 from lomas_server.dp_queries.dp_querier import DPQuerier
 
 
@@ -91,6 +92,10 @@ class SmartnoiseSynthQuerier(
 ):
     """Concrete implementation of the DPQuerier ABC for the SmartNoiseSynth library."""
 
+    dp_library = DPLibraries.SMARTNOISE_SYNTH
+    # The cost is only known once the model is fitted.
+    memoize_cost = True
+
     def __init__(
         self,
         data_connector: DataConnector,
@@ -329,14 +334,15 @@ class SmartnoiseSynthQuerier(
             ) from e
         return model
 
-    def _model_pipeline(self, query_json: SmartnoiseSynthRequestModel) -> Synthesizer:
-        """Return a trained Synthesizer model based on query_json.
+    def check_query(self, query_json: SmartnoiseSynthRequestModel) -> None:
+        """Check that the synthesizer of query_json is supported.
 
         Args:
             query_json (SmartnoiseSynthRequestModel): JSON request object for the query.
 
-        Returns:
-            model: Smartnoise Synthesizer
+        Raises:
+            InvalidQueryException: If the synthesizer cannot be fitted
+                or returned.
         """
         if (
             isinstance(query_json, SmartnoiseSynthQueryModel)
@@ -353,6 +359,17 @@ class SmartnoiseSynthQuerier(
                 + "Please select another Synthesizer."
             )
 
+    def _model_pipeline(self, query_json: SmartnoiseSynthRequestModel) -> Synthesizer:
+        """Return a trained Synthesizer model based on query_json.
+
+        Args:
+            query_json (SmartnoiseSynthRequestModel): JSON request object for the query.
+
+        Returns:
+            model: Smartnoise Synthesizer
+        """
+        self.check_query(query_json)
+
         # Table Transformation depenps on the type of Synthesizer
         if query_json.synth_name in [s.value for s in SSynthMarginalSynthesizer]:
             table_transformer_style = SSynthTableTransStyle.CUBE
@@ -380,12 +397,14 @@ class SmartnoiseSynthQuerier(
             constraints.update(custom_constraints)
 
         # Prepare private data
-        private_data = self.data_connector.get_pandas_df()
-        if query_json.select_cols:
-            try:
-                private_data = private_data[query_json.select_cols]
-            except KeyError as e:
-                raise InvalidQueryException("Error while selecting provided select_cols: " + str(e)) from e
+        try:
+            private_data = self.data_connector.get_pandas_df(self.get_dataset_columns(query_json))
+        except InvalidQueryException as e:
+            raise InvalidQueryException(
+                "Error while selecting provided select_cols: " + e.error_message
+            ) from e
+
+        private_data = decode_categoricals(private_data)
 
         # Get transformer
         transformer = TableTransformer.create(
@@ -398,6 +417,17 @@ class SmartnoiseSynthQuerier(
         model = self._get_fit_model(private_data, transformer, query_json)
         return model
 
+    def get_dataset_columns(self, query_json: SmartnoiseSynthRequestModel) -> Optional[List[str]]:
+        """Gets the columns of the dataset read by a request, shared with the process pool.
+
+        Args:
+            query_json (SmartnoiseSynthRequestModel): The input object of the request.
+
+        Returns:
+            Optional[List[str]]: The selected columns, None for all the columns.
+        """
+        return query_json.select_cols or None
+
     def cost(self, query_json: SmartnoiseSynthRequestModel) -> tuple[float, float]:
         """Return cost of query_json.
 
@@ -419,6 +449,22 @@ class SmartnoiseSynthQuerier(
 
         return epsilon, delta
 
+    def get_fitted_model(self) -> Optional[Synthesizer]:
+        """Gets the synthesizer fitted by the last call to `cost`.
+
+        Returns:
+            Optional[Synthesizer]: The fitted synthesizer, None if not fitted.
+        """
+        return self.model
+
+    def set_fitted_model(self, fitted_model: Synthesizer) -> None:
+        """Sets a synthesizer fitted by `cost` on another querier.
+
+        Args:
+            fitted_model (Synthesizer): The fitted synthesizer.
+        """
+        self.model = fitted_model
+
     def query(
         self,
         query_json: SmartnoiseSynthQueryModel,
@@ -1,16 +1,48 @@
 import numpy as np
 import pandas as pd
+from pandas.api.types import is_integer_dtype
 from sklearn.impute import SimpleImputer
 
 from lomas_core.error_handler import InvalidQueryException
 from lomas_server.constants import NUMERICAL_DTYPES
 
 
+def decode_categoricals(df: pd.DataFrame) -> pd.DataFrame:
+    """Convert the categorical columns back to the type of their categories.
+
+    Compact dtypes (see get_column_dtypes) load the columns with categories
+    as pandas categoricals, which the DP libraries do not handle as their
+    metadata type: integer categories would for instance not be numerical.
+
+    Args:
+        df (pd.DataFrame): dataframe with the data, may be shared read-only.
+
+    Returns:
+        df (pd.DataFrame): dataframe with the decoded columns, the other
+            columns are not copied.
+    """
+    dtypes = {}
+    for col, dtype in df.dtypes.items():
+        if not isinstance(dtype, pd.CategoricalDtype):
+            continue
+        if is_integer_dtype(dtype.categories.dtype):
+            # Values out of the categories are missing, plain ints can not hold them.
+            name = dtype.categories.dtype.name
+            dtypes[col] = name.capitalize() if df[col].hasnans else name
+        else:
+            dtypes[col] = "string"
+
+    if not dtypes:
+        return df
+    return df.astype(dtypes, copy=False)
+
+
 def handle_missing_data(df: pd.DataFrame, imputer_strategy: str) -> pd.DataFrame:
     """Impute missing data based on given imputation strategy for NaNs.
 
     Args:
-        df (pd.DataFrame): dataframe with the data
+        df (pd.DataFrame): private dataframe with the data, may be
+            modified in place (see DataConnector.get_private_pandas_df)
         imputer_strategy (str): string to indicate imputatation for NaNs
             "drop": will drop all rows with missing values
             "mean": will replace values by the mean of the column values
@@ -49,6 +81,10 @@ def handle_missing_data(df: pd.DataFrame, imputer_strategy: str) -> pd.DataFrame
             ],
             axis=1,
         )
+
+        # Nullable integer columns can not be cast back from imputed decimals
+        int_cols = [col for col in numerical_cols if is_integer_dtype(dtypes[col])]
+        df[int_cols] = df[int_cols].round()
     elif imputer_strategy == "most_frequent":
         # Impute all features with most frequent value
         imp_most_frequent = SimpleImputer(strategy=imputer_strategy)
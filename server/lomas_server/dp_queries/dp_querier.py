@@ -1,10 +1,11 @@
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar
+from contextlib import ExitStack
+from typing import Any, Dict, Generic, List, Optional, Tuple, TypeVar
 
+from lomas_core.constants import DPLibraries
 from lomas_core.error_handler import (
     KNOWN_EXCEPTIONS,
     InternalServerException,
-    InvalidQueryException,
     UnauthorizedAccessException,
 )
 from lomas_core.models.requests import (  # pylint: disable=W0611
@@ -12,11 +13,23 @@ from lomas_core.models.requests import (  # pylint: disable=W0611
     QueryModel,
 )
 from lomas_core.models.responses import (  # pylint: disable=W0611
+    BatchQueryResponse,
     QueryResponse,
     QueryResultTypeAlias,
 )
 from lomas_server.admin_database.admin_database import AdminDatabase
 from lomas_server.data_connector.data_connector import DataConnector
+from lomas_server.dp_queries.fitted_model_store import (
+    FITTED_MODEL_STORE,
+    get_fitted_model_key,
+)
+from lomas_server.dp_queries.process_pool import (
+    QUERIER_PROCESS_POOLS,
+    SharedDataset,
+    run_cost,
+    run_query,
+    share_dataset,
+)
 
 RequestModelGeneric = TypeVar("RequestModelGeneric", bound="LomasRequestModel")
 QueryModelGeneric = TypeVar("QueryModelGeneric", bound="QueryModel")
@@ -31,6 +44,11 @@ class DPQuerier(ABC, Generic[RequestModelGeneric, QueryModelGeneric, QueryResult
     a querier instance is specific to a DataConnector instance.
     """
 
+    # Whether the estimated costs are worth caching (see cost_cache).
+    memoize_cost: bool = False
+    # Library of the querier, which selects its process pool (see process_pool).
+    dp_library: Optional[DPLibraries] = None
+
     def __init__(
         self,
         data_connector: DataConnector,
@@ -45,6 +63,9 @@ class DPQuerier(ABC, Generic[RequestModelGeneric, QueryModelGeneric, QueryResult
         """
         self.data_connector = data_connector
         self.admin_database = admin_database
+        # Datasets shared with the process pool by columns, from `run_cost` to `close`.
+        self.shared_datasets: Dict[Optional[Tuple[str, ...]], SharedDataset] = {}
+        self._shared_datasets_stack = ExitStack()
 
     @abstractmethod
     def cost(self, query_json: RequestModelGeneric) -> tuple[float, float]:
@@ -59,6 +80,191 @@ class DPQuerier(ABC, Generic[RequestModelGeneric, QueryModelGeneric, QueryResult
                 the epsilon cost, the second value is the delta value.
         """
 
+    def check_query(self, query_json: LomasRequestModel) -> None:
+        """Checks the parameters of a request which the DP library cannot handle.
+
+        Called before reusing a stored fitted model, so that a query is
+        validated even when its cost is not estimated again.
+
+        Args:
+            query_json (LomasRequestModel): The input object of the request.
+
+        Raises:
+            InvalidQueryException: If the request is not valid.
+        """
+
+    def get_fitted_model(self) -> Optional[Any]:
+        """Gets the model fitted by the last call to `cost`, for queriers whose cost requires fitting.
+
+        Returns:
+            Optional[Any]: The fitted model, with everything `query` needs,
+                None if the querier did not fit a model.
+        """
+        return None
+
+    def set_fitted_model(self, fitted_model: Any) -> None:
+        """Sets a model fitted by `cost` on another querier, so that `query` uses it.
+
+        Args:
+            fitted_model (Any): The model returned by :py:meth:`get_fitted_model`.
+
+        Raises:
+            NotImplementedError: If the querier does not fit models.
+        """
+        raise NotImplementedError(f"{type(self).__name__} does not fit models.")
+
+    def get_dataset_columns(self, query_json: LomasRequestModel) -> Optional[List[str]]:
+        """Gets the columns of the dataset read by a request, shared with the process pool.
+
+        Args:
+            query_json (LomasRequestModel): The input object of the request.
+
+        Returns:
+            Optional[List[str]]: The columns, None for all the columns.
+        """
+        return None
+
+    def get_shared_dataset(self, query_json: LomasRequestModel) -> SharedDataset:
+        """Shares the columns read by a request with the process pool, until `close`.
+
+        Args:
+            query_json (LomasRequestModel): The input object of the request.
+
+        Returns:
+            SharedDataset: The shared dataset.
+        """
+        columns = self.get_dataset_columns(query_json)
+        key = None if columns is None else tuple(columns)
+        if key not in self.shared_datasets:
+            self.shared_datasets[key] = self._shared_datasets_stack.enter_context(
+                share_dataset(self.data_connector, columns)
+            )
+        return self.shared_datasets[key]
+
+    def close(self) -> None:
+        """Releases the resources held between `cost` and `query`, such as database connections.
+
+        A closed querier can still run the query of its last cost estimation.
+        """
+        self.shared_datasets.clear()
+        self._shared_datasets_stack.close()
+
+    def runs_in_process_pool(self) -> bool:
+        """Whether `cost` and `query` run in the process pool of the library.
+
+        Returns:
+            bool: True if the library has a process pool, False otherwise.
+        """
+        return QUERIER_PROCESS_POOLS.has_pool(self.dp_library)
+
+    def run_cost(self, query_json: LomasRequestModel) -> tuple[float, float]:
+        """Estimates the cost of a request, in the process pool of the library if any.
+
+        The model fitted in the pool is set on this querier for `run_query`,
+        which reuses the shared dataset until the querier is closed.
+
+        Args:
+            query_json (LomasRequestModel): The input object of the request.
+
+        Returns:
+            tuple[float, float]: The tuple of costs, the first value is
+                the epsilon cost, the second value is the delta value.
+        """
+        if not self.runs_in_process_pool():
+            return self.cost(query_json)  # type: ignore [arg-type]
+
+        cost, fitted_model = QUERIER_PROCESS_POOLS.run(
+            self.dp_library,  # type: ignore [arg-type]
+            run_cost,
+            type(self),
+            self.data_connector.get_metadata(),
+            self.get_shared_dataset(query_json),
+            query_json,
+        )
+        if fitted_model is not None:
+            self.set_fitted_model(fitted_model)
+        return cost
+
+    def run_query(self, query_json: QueryModel) -> QueryResultGeneric:
+        """Performs a query, in the process pool of the library if any.
+
+        Args:
+            query_json (QueryModel): The input object of the query.
+
+        Returns:
+            QueryResultGeneric: The query result.
+        """
+        if not self.runs_in_process_pool():
+            return self.query(query_json)  # type: ignore [arg-type]
+
+        return QUERIER_PROCESS_POOLS.run(
+            self.dp_library,  # type: ignore [arg-type]
+            run_query,
+            type(self),
+            self.data_connector.get_metadata(),
+            self.get_shared_dataset(query_json),
+            query_json,
+            self.get_fitted_model(),
+        )
+
+    def get_query_cost(self, query_json: QueryModel, user_name: str) -> tuple[float, float]:
+        """Gets the cost of a query, reusing the model fitted by the matching cost estimation if stored.
+
+        Args:
+            query_json (QueryModel): The input object of the query.
+            user_name (str): User name.
+
+        Raises:
+            InvalidQueryException: If the query is not valid.
+
+        Returns:
+            tuple[float, float]: The tuple of costs, the first value is
+                the epsilon cost, the second value is the delta value.
+        """
+        if self.memoize_cost and FITTED_MODEL_STORE.enabled:
+            self.check_query(query_json)
+            version = self.data_connector.get_version()  # pylint: disable=E1128
+            if version is not None:
+                fitted = FITTED_MODEL_STORE.pop(get_fitted_model_key(user_name, self, query_json, version))
+                if fitted is not None:
+                    fitted_model, cost = fitted
+                    self.set_fitted_model(fitted_model)
+                    return cost
+        return self.run_cost(query_json)
+
+    def check_user_access(self, user_name: str, dataset_name: str) -> None:
+        """Checks the user has access to the dataset, before estimating costs.
+
+        Args:
+            user_name (str): User name.
+            dataset_name (str): Name of the dataset.
+
+        Raises:
+            UnauthorizedAccessException: If the user does not exist or
+                does not have access to the dataset.
+        """
+        if not self.admin_database.has_user_access_to_dataset(user_name, dataset_name):
+            raise UnauthorizedAccessException(f"{user_name} does not have access to {dataset_name}.")
+
+    def run_checked_query(self, query_json: QueryModel) -> QueryResultGeneric:
+        """Performs a query with :py:meth:`run_query`, wrapping unforeseen errors.
+
+        Args:
+            query_json (QueryModel): The input object of the query.
+
+        Raises:
+            InternalServerException: For any unforeseen exception.
+
+        Returns:
+            QueryResultGeneric: The query result.
+        """
+        try:
+            return self.run_query(query_json)
+        except KNOWN_EXCEPTIONS as e:
+            raise e
+        except Exception as e:
+            raise InternalServerException(str(e)) from e
+
     @abstractmethod
     def query(self, query_json: QueryModelGeneric) -> QueryResultGeneric:
         """
@@ -87,10 +293,11 @@ class DPQuerier(ABC, Generic[RequestModelGeneric, QueryModelGeneric, QueryResult
             user_name (str, optional): User name.
 
         Raises:
-            UnauthorizedAccessException: A query is already
-                ongoing for this user,
+            UnauthorizedAccessException: The user runs too many
+                concurrent queries,
             the user does not exist or does not have access to the dataset.
-            InvalidQueryException: If the query is not valid.
+            InvalidQueryException: If the query is not valid or there is not
+                enough budget.
             InternalServerException: For any other unforseen exceptions.
 
         Returns:
@@ -105,58 +312,121 @@ class DPQuerier(ABC, Generic[RequestModelGeneric, QueryModelGeneric, QueryResult
                 - spent_delta (float): The amount of delta budget spent
                   for the query.
         """
-        # Block access to other queries to user
-        if not self.admin_database.get_and_set_may_user_query(user_name, False):
-            raise UnauthorizedAccessException(
-                f"User {user_name} is trying to query before end of previous query."
-            )
+        dataset_name = query_json.dataset_name
+        self.check_user_access(user_name, dataset_name)
 
         try:
             # Get cost of the query
-            eps_cost, delta_cost = self.cost(query_json)  # type: ignore [arg-type]
+            eps_cost, delta_cost = self.get_query_cost(query_json, user_name)
 
-            # Check that enough budget to do the query
-            try:
-                (
-                    eps_remain,
-                    delta_remain,
-                ) = self.admin_database.get_remaining_budget(user_name, query_json.dataset_name)
-            except UnauthorizedAccessException as e:
-                raise e
-
-            if (eps_remain < eps_cost) or (delta_remain < delta_cost):
-                raise InvalidQueryException(
-                    "Not enough budget for this query epsilon remaining "
-                    f"{eps_remain}, delta remaining {delta_remain}."
-                )
+            # Check and reserve the budget while the query runs
+            reservation = self.admin_database.reserve_budget(user_name, dataset_name, eps_cost, delta_cost)
 
             # Query
             try:
-                query_result = self.query(query_json)  # type: ignore [arg-type]
-            except KNOWN_EXCEPTIONS as e:
-                raise e
+                query_result = self.run_checked_query(query_json)
             except Exception as e:
-                raise InternalServerException(str(e)) from e
-
-            # Deduce budget from user
-            self.admin_database.update_budget(user_name, query_json.dataset_name, eps_cost, delta_cost)
-
-            response = QueryResponse(
-                requested_by=user_name,
-                result=query_result,
-                epsilon=eps_cost,
-                delta=delta_cost,
-            )
+                self.admin_database.release_budget(user_name, reservation)
+                raise e
+        finally:
+            self.close()
 
-            # Add query to db (for archive)
-            self.admin_database.save_query(user_name, query_json, response)  # TODO 359 here
+        # Deduce budget from user
+        self.admin_database.commit_budget(user_name, reservation)
 
-        except Exception as e:
-            self.admin_database.set_may_user_query(user_name, True)
-            raise e
+        response = QueryResponse(
+            requested_by=user_name,
+            result=query_result,
+            epsilon=eps_cost,
+            delta=delta_cost,
+        )
 
-        # Re-enable user to query
-        self.admin_database.set_may_user_query(user_name, True)
+        # Add query to db (for archive)
+        self.admin_database.save_query(user_name, query_json, response)  # TODO 359 here
 
         # Return response
         return response
+
+    def handle_batch_query(
+        self,
+        queries: List[QueryModel],
+        user_name: str,
+    ) -> BatchQueryResponse:
+        """
+        Handle a batch of DP queries on the dataset of the querier.
+
+        The dataset is loaded once for all queries. The total cost is
+        reserved before any query is executed, the budget is deducted once
+        and the queries are archived in a single write. If any query fails,
+        the reservation is released and no budget is spent.
+
+        Args:
+            queries (List[QueryModel]): The input objects of the queries,
+              on the dataset of the querier.
+            user_name (str): User name.
+
+        Raises:
+            UnauthorizedAccessException: The user runs too many
+                concurrent queries,
+            the user does not exist or does not have access to the dataset.
+            InvalidQueryException: If a query is not valid or there is not
+                enough budget for the batch.
+            InternalServerException: For any other unforseen exceptions.
+
+        Returns:
+            BatchQueryResponse: The responses to the queries and the total cost.
+        """
+        dataset_name = queries[0].dataset_name
+        self.check_user_access(user_name, dataset_name)
+
+        # One querier per query, as queriers keep the state of their
+        # last cost estimation, all sharing the loaded dataset. Each querier
+        # is closed after its cost and its query, so that the batch holds
+        # at most one database connection or projected dataset at a time.
+        # Queriers running in a process pool only hold their shared dataset,
+        # which they keep until their query for the next queries to reuse.
+        queriers = [type(self)(self.data_connector, self.admin_database) for _ in queries]
+        try:
+            costs = []
+            for querier, query_json in zip(queriers, queries):
+                costs.append(querier.get_query_cost(query_json, user_name))
+                if not querier.runs_in_process_pool():
+                    querier.close()
+            eps_cost = sum(eps for eps, _ in costs)
+            delta_cost = sum(delta for _, delta in costs)
+
+            # Check and reserve the budget of all the queries while they run
+            reservation = self.admin_database.reserve_budget(user_name, dataset_name, eps_cost, delta_cost)
+
+            # Query
+            try:
+                responses = []
+                for querier, query_json, (query_eps, query_delta) in zip(queriers, queries, costs):
+                    responses.append(
+                        QueryResponse(
+                            requested_by=user_name,
+                            result=querier.run_checked_query(query_json),
+                            epsilon=query_eps,
+                            delta=query_delta,
+                        )
+                    )
+                    querier.close()
+            except Exception as e:
+                self.admin_database.release_budget(user_name, reservation)
+                raise e
+        finally:
+            for querier in queriers:
+                querier.close()
+
+        # Deduce budget of the whole batch from user
+        self.admin_database.commit_budget(user_name, reservation)
+
+        # Add queries to db (for archive)
+        self.admin_database.save_queries(user_name, queries, responses)
+
+        return BatchQueryResponse(
+            requested_by=user_name,
+            responses=responses,
+            epsilon=eps_cost,
+            delta=delta_cost,
+        )
@@ -0,0 +1,166 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Optional, Tuple
+
+from lomas_core.models.config import FittedModelStoreConfig
+from lomas_core.models.constants import FITTED_MODEL_STORE_MAX_ENTRIES, FITTED_MODEL_STORE_TTL
+from lomas_core.models.requests import LomasRequestModel
+from lomas_server.dp_queries.cost_cache import Cost, get_request_hash
+
+if TYPE_CHECKING:
+    from lomas_server.dp_queries.dp_querier import DPQuerier
+
+# (user name, querier type, request hash, dataset version)
+FittedModelKey = Tuple[str, str, str, str]
+
+
+class FittedModelStore:
+    """Process-wide, thread-safe store of the models fitted by cost estimations.
+
+    Estimating the cost of some queries (smartnoise-synth, diffprivlib)
+    fits the whole model, which the following query with the same
+    parameters would fit again. The fitted model of a cost estimation is
+    kept for its user, request and dataset version, and handed over to
+    the first matching query of the same user, which charges the budget
+    without fitting again. Models expire after a time to live and the
+    oldest ones are dropped above the maximum number of entries.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        max_entries: int = FITTED_MODEL_STORE_MAX_ENTRIES,
+        ttl_seconds: float = FITTED_MODEL_STORE_TTL,
+    ) -> None:
+        """Initializer.
+
+        Args:
+            enabled (bool, optional): Whether fitted models are stored.
+                Defaults to False.
+            max_entries (int, optional): The maximum number of fitted models.
+                Defaults to FITTED_MODEL_STORE_MAX_ENTRIES.
+            ttl_seconds (float, optional): The time to live of a fitted model.
+                Defaults to FITTED_MODEL_STORE_TTL.
+        """
+        self.max_entries: int = max_entries
+        self.ttl_seconds: float = ttl_seconds
+        self._enabled: bool = enabled
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[FittedModelKey, Tuple[Any, Cost, float]] = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether fitted models are stored.
+
+        Returns:
+            bool: True if fitted models are stored, False otherwise.
+        """
+        return self._enabled and self.max_entries > 0 and self.ttl_seconds > 0
+
+    def set_config(self, config: FittedModelStoreConfig) -> None:
+        """Enables the store, sets its size and time to live.
+
+        Args:
+            config (FittedModelStoreConfig): The fitted model store config.
+        """
+        with self._lock:
+            self._enabled = config.enabled
+            self.max_entries = config.max_entries
+            self.ttl_seconds = config.ttl_seconds
+            if not self.enabled:
+                self._entries.clear()
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def put(self, key: FittedModelKey, fitted_model: Any, cost: Cost) -> None:
+        """Stores (or replaces) a fitted model and its cost.
+
+        Args:
+            key (FittedModelKey): The fitted model key.
+            fitted_model (Any): The fitted model, see :py:meth:`DPQuerier.get_fitted_model`.
+            cost (Cost): The (epsilon, delta) cost of the fitting.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (fitted_model, cost, time.monotonic() + self.ttl_seconds)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: FittedModelKey) -> Optional[Tuple[Any, Cost]]:
+        """Removes a fitted model from the store and returns it.
+
+        Each fitted model is handed to one query only.
+
+        Args:
+            key (FittedModelKey): The fitted model key.
+
+        Returns:
+            Optional[Tuple[Any, Cost]]: The fitted model and its cost, None
+                if not stored or expired.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return None
+        fitted_model, cost, expires_at = entry
+        if expires_at <= time.monotonic():
+            return None
+        return fitted_model, cost
+
+    def clear(self) -> None:
+        """Removes all fitted models from the store."""
+        with self._lock:
+            self._entries.clear()
+
+
+def get_fitted_model_key(
+    user_name: str, querier: "DPQuerier", request_model: LomasRequestModel, version: str
+) -> FittedModelKey:
+    """Builds the key of the model fitted by a querier for a request.
+
+    Args:
+        user_name (str): The user name.
+        querier (DPQuerier): The querier, specific to a DP library.
+        request_model (LomasRequestModel): The request or query model.
+        version (str): The version of the dataset the model is fitted on.
+
+    Returns:
+        FittedModelKey: The fitted model key.
+    """
+    return (user_name, type(querier).__name__, get_request_hash(request_model), version)
+
+
+def store_fitted_model(
+    user_name: str,
+    querier: "DPQuerier",
+    request_model: LomasRequestModel,
+    version: Optional[str],
+    cost: Cost,
+) -> None:
+    """Stores the model fitted by the last cost estimation of a querier, if any.
+
+    Nothing is stored if the querier did not fit a model (for instance
+    if the cost came from the cost cache) or the dataset has no version.
+
+    Args:
+        user_name (str): The user name.
+        querier (DPQuerier): The querier which estimated the cost.
+        request_model (LomasRequestModel): The request model.
+        version (Optional[str]): The version of the dataset, taken before
+            the estimation.
+        cost (Cost): The estimated (epsilon, delta) cost.
+    """
+    if not FITTED_MODEL_STORE.enabled or version is None:
+        return
+    fitted_model = querier.get_fitted_model()
+    if fitted_model is not None:
+        FITTED_MODEL_STORE.put(
+            get_fitted_model_key(user_name, querier, request_model, version), fitted_model, cost
+        )
+
+
+FITTED_MODEL_STORE = FittedModelStore()
@@ -0,0 +1,187 @@
+import logging
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple
+
+from lomas_core.constants import DPLibraries
+from lomas_core.error_handler import (
+    ExternalLibraryException,
+    InternalServerException,
+    InvalidQueryException,
+    UnauthorizedAccessException,
+)
+from lomas_core.models.collections import Job
+from lomas_core.models.config import JobsConfig
+from lomas_core.models.constants import JobStatus
+from lomas_core.models.exceptions import (
+    ExternalLibraryExceptionModel,
+    InternalServerExceptionModel,
+    InvalidQueryExceptionModel,
+    LomasServerExceptionModel,
+    UnauthorizedAccessExceptionModel,
+)
+from lomas_core.models.requests import QueryModel
+from lomas_core.models.responses import QueryResponse
+from lomas_server.admin_database.admin_database import AdminDatabase
+from lomas_server.admin_database.request_context import admin_database_request_context
+from lomas_server.constants import JOB_WORKER_POLL_INTERVAL
+
+# Runs a query for a user with a library
+JobRunner = Callable[[QueryModel, str, DPLibraries], QueryResponse]
+
+
+def get_exception_model(e: Exception) -> LomasServerExceptionModel:
+    """Converts an exception raised by a query to the model returned to the client.
+
+    As for the query endpoints, the details of unforeseen exceptions
+    are not disclosed.
+
+    Args:
+        e (Exception): The exception.
+
+    Returns:
+        LomasServerExceptionModel: The exception model.
+    """
+    match e:
+        case InvalidQueryException():
+            return InvalidQueryExceptionModel(message=e.error_message)
+        case ExternalLibraryException():
+            return ExternalLibraryExceptionModel(message=e.error_message, library=e.library)
+        case UnauthorizedAccessException():
+            return UnauthorizedAccessExceptionModel(message=e.error_message)
+        case _:
+            return InternalServerExceptionModel()
+
+
+def get_exception(error: LomasServerExceptionModel) -> Exception:
+    """Converts the error model of a failed job back to the exception of the query.
+
+    Args:
+        error (LomasServerExceptionModel): The exception model.
+
+    Returns:
+        Exception: The exception, handled as for the query endpoints.
+    """
+    match error:
+        case InvalidQueryExceptionModel():
+            return InvalidQueryException(error.message)
+        case ExternalLibraryExceptionModel():
+            return ExternalLibraryException(error.library, error.message)
+        case UnauthorizedAccessExceptionModel():
+            return UnauthorizedAccessException(error.message)
+        case _:
+            return InternalServerException("The job failed with an internal error.")
+
+
+class JobQueue:
+    """Bounded queue of asynchronous query jobs, run by a pool of worker threads.
+
+    The status of each job is saved in the admin database when it is
+    submitted, started and finished, so that the client can poll it and
+    fetch the result from any server worker.
+    """
+
+    def __init__(self, admin_database: AdminDatabase, runner: JobRunner, config: JobsConfig) -> None:
+        """Initializer, starts the workers.
+
+        Args:
+            admin_database (AdminDatabase): The admin database, where jobs are saved.
+            runner (JobRunner): Function running a query on a private dataset.
+            config (JobsConfig): The jobs config.
+        """
+        self.admin_database = admin_database
+        self.runner = runner
+
+        self._queue: queue.Queue[Tuple[Job, QueryModel]] = queue.Queue(maxsize=config.max_queue_size)
+        self._stop_event = threading.Event()
+        self._workers: List[threading.Thread] = [
+            threading.Thread(target=self._work, name=f"lomas-job-worker-{i}", daemon=True)
+            for i in range(config.nb_workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, query_json: QueryModel, user_name: str, dp_library: DPLibraries) -> Job:
+        """Saves a new pending job and queues it.
+
+        Args:
+            query_json (QueryModel): The query, specific to the library.
+            user_name (str): The user submitting the query.
+            dp_library (DPLibraries): The DP library of the query.
+
+        Raises:
+            InvalidQueryException: If the job queue is full.
+
+        Returns:
+            Job: The pending job.
+        """
+        job = Job(user_name=user_name, dataset_name=query_json.dataset_name, dp_library=dp_library)
+        self.admin_database.save_job(job)
+        try:
+            self._queue.put_nowait((job.model_copy(), query_json))
+        except queue.Full as e:
+            message = "Too many queued jobs, please submit the query later."
+            self._finish(job, error=InvalidQueryExceptionModel(message=message))
+            raise InvalidQueryException(message) from e
+        return job
+
+    def stop(self) -> None:
+        """Stops the workers and fails the jobs which did not start.
+
+        Running jobs are not interrupted.
+        """
+        self._stop_event.set()
+        while True:
+            try:
+                job, _ = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._finish(job, error=InternalServerExceptionModel())
+
+    def _work(self) -> None:
+        """Runs queued jobs until the queue is stopped."""
+        while not self._stop_event.is_set():
+            try:
+                job, query_json = self._queue.get(timeout=JOB_WORKER_POLL_INTERVAL)
+            except queue.Empty:
+                continue
+            try:
+                with admin_database_request_context():
+                    self._run(job, query_json)
+            except Exception:  # pylint: disable=W0718
+                logging.exception(f"Failed to save job {job.job_id}")
+            finally:
+                self._queue.task_done()
+
+    def _run(self, job: Job, query_json: QueryModel) -> None:
+        """Runs a job and saves its result or error.
+
+        Args:
+            job (Job): The pending job.
+            query_json (QueryModel): The query of the job.
+        """
+        job.status = JobStatus.RUNNING
+        job.started_at = datetime.now(timezone.utc)
+        self.admin_database.save_job(job)
+        try:
+            response = self.runner(query_json, job.user_name, job.dp_library)
+        except Exception as e:  # pylint: disable=W0718
+            logging.info(f"Job {job.job_id} failed: {getattr(e, 'error_message', e)}")
+            self._finish(job, error=get_exception_model(e))
+            return
+        job.result = response.model_dump(mode="json")
+        self._finish(job)
+
+    def _finish(self, job: Job, error: Optional[LomasServerExceptionModel] = None) -> None:
+        """Saves a job as complete, or failed with an error.
+
+        Args:
+            job (Job): The job.
+            error (Optional[LomasServerExceptionModel], optional): The error of
+                a failed job. Defaults to None.
+        """
+        job.status = JobStatus.COMPLETE if error is None else JobStatus.FAILED
+        job.error = error  # type: ignore [assignment]
+        job.finished_at = datetime.now(timezone.utc)
+        self.admin_database.save_job(job)
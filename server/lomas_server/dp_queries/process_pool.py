@@ -0,0 +1,352 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple, Type
+
+import pandas as pd
+from pyarrow import feather
+
+from lomas_core.constants import DPLibraries
+from lomas_core.error_handler import InternalServerException
+from lomas_core.models.collections import Metadata
+from lomas_core.models.config import ProcessPoolsConfig
+from lomas_core.models.requests import LomasRequestModel, QueryModel
+from lomas_server.constants import SHARED_DATASET_DIR
+from lomas_server.data_connector.data_connector import DataConnector
+from lomas_server.data_connector.dataset_cache import DATASET_CACHE
+from lomas_server.data_connector.dataset_store import DATASET_STORE
+from lomas_server.data_connector.in_memory_connector import InMemoryConnector
+from lomas_server.dp_queries.cost_cache import Cost
+
+if TYPE_CHECKING:
+    from lomas_server.dp_queries.dp_querier import DPQuerier
+
+
+# Path of the Arrow file of a dataset shared with the processes of a pool
+# and the columns to read from it, None for all the columns of the file.
+SharedDataset = Tuple[str, Optional[List[str]]]
+
+
+def load_shared_dataset(dataset: SharedDataset) -> pd.DataFrame:
+    """Loads a dataset shared by the server process, by memory-mapping its Arrow file.
+
+    Args:
+        dataset (SharedDataset): The path of the uncompressed Arrow file
+            and the columns to read.
+
+    Raises:
+        InternalServerException: If the dataset is no longer shared.
+
+    Returns:
+        pd.DataFrame: The dataframe of the dataset.
+    """
+    path, columns = dataset
+    try:
+        table = feather.read_table(path, columns=columns, memory_map=True)
+    except FileNotFoundError as e:
+        raise InternalServerException(f"Shared dataset not found: {e}") from e
+    # One block per column so that columns can reference the mapped memory.
+    return table.to_pandas(split_blocks=True)
+
+
+def get_store_path(data_connector: DataConnector) -> Optional[str]:
+    """Gets the path of the memory-mapped file of a dataset in the dataset store.
+
+    Args:
+        data_connector (DataConnector): The dataset.
+
+    Returns:
+        Optional[str]: The path of the Arrow file, None if the dataset
+            is not materialized in the store.
+    """
+    if data_connector.cache_key is None or not DATASET_STORE.enabled:
+        return None
+    cached = DATASET_CACHE.get_with_version(data_connector.cache_key)
+    if cached is None:
+        return None
+    path = DATASET_STORE.get_path(data_connector.cache_key, cached[1])
+    return path if os.path.exists(path) else None
+
+
+class SharedFile:
+    """Temporary Arrow file of a dataset, with the number of its users."""
+
+    def __init__(self) -> None:
+        """Initializer, before the file is written."""
+        self.lock = threading.Lock()
+        self.path: Optional[str] = None
+        self.users = 0
+
+
+class SharedFiles:
+    """Temporary Arrow files of the datasets shared with the process pools.
+
+    A file is written once per dataset, version and columns and removed
+    once no querier uses it anymore, so that the concurrent queriers
+    reading the same columns share it, as do the cost and the query of
+    a querier until it is closed.
+    """
+
+    def __init__(self) -> None:
+        """Initializer, without files."""
+        self._lock = threading.Lock()
+        self._files: Dict[Hashable, SharedFile] = {}
+
+    def acquire(self, key: Hashable, df: pd.DataFrame) -> str:
+        """Gets the file of a dataset, writing it if it is not shared yet.
+
+        Args:
+            key (Hashable): The dataset, version and columns of the file.
+            df (pd.DataFrame): The dataframe to write.
+
+        Returns:
+            str: The path of the Arrow file, to release once done.
+        """
+        with self._lock:
+            shared_file = self._files.setdefault(key, SharedFile())
+            shared_file.users += 1
+        try:
+            with shared_file.lock:
+                if shared_file.path is None:
+                    directory = SHARED_DATASET_DIR if os.path.isdir(SHARED_DATASET_DIR) else None
+                    fd, path = tempfile.mkstemp(prefix="lomas-", suffix=".arrow", dir=directory)
+                    os.close(fd)
+                    try:
+                        feather.write_feather(df, path, compression="uncompressed")
+                    except Exception as e:
+                        os.remove(path)
+                        raise e
+                    shared_file.path = path
+                return shared_file.path
+        except Exception as e:
+            self.release(key)
+            raise e
+
+    def release(self, key: Hashable) -> None:
+        """Releases a file acquired with `acquire`, removing it if it has no other user.
+
+        Args:
+            key (Hashable): The dataset, version and columns of the file.
+        """
+        with self._lock:
+            shared_file = self._files[key]
+            shared_file.users -= 1
+            if shared_file.users > 0:
+                return
+            del self._files[key]
+        if shared_file.path is not None:
+            os.remove(shared_file.path)
+
+
+SHARED_FILES = SharedFiles()
+
+
+@contextmanager
+def share_dataset(
+    data_connector: DataConnector, columns: Optional[List[str]] = None
+) -> Iterator[SharedDataset]:
+    """Shares the columns of a private dataset with the processes of a pool, for the duration of the context.
+
+    The processes memory-map the file of the dataset in the dataset store
+    if it is materialized. Otherwise the columns are written to a
+    temporary uncompressed Arrow file, in shared memory where available,
+    shared by the concurrent users of the same columns (see SharedFiles).
+
+    Args:
+        data_connector (DataConnector): The dataset.
+        columns (Optional[List[str]], optional): The columns read by the
+            processes. Defaults to None (all columns). Columns unknown to
+            the metadata share all the columns, for the querier to report
+            the error.
+
+    Yields:
+        Iterator[SharedDataset]: The path of the Arrow file of the dataset
+            and the columns to read.
+    """
+    if columns is not None and not set(columns) <= set(data_connector.get_metadata().columns):
+        columns = None
+    df = data_connector.get_pandas_df(columns)
+    path = get_store_path(data_connector)
+    if path is not None:
+        yield path, columns
+        return
+
+    key = (
+        data_connector.cache_key or id(data_connector),
+        data_connector.get_version(),
+        None if columns is None else tuple(columns),
+    )
+    path = SHARED_FILES.acquire(key, df)
+    try:
+        yield path, None
+    finally:
+        SHARED_FILES.release(key)
+
+
+def run_cost(
+    querier_type: Type["DPQuerier"],
+    metadata: Metadata,
+    dataset: SharedDataset,
+    query_json: LomasRequestModel,
+) -> Tuple[Cost, Optional[Any]]:
+    """Estimates the cost of a request in a process of a pool.
+
+    Args:
+        querier_type (Type[DPQuerier]): The querier class of the library.
+        metadata (Metadata): The metadata of the dataset.
+        dataset (SharedDataset): The shared dataset.
+        query_json (LomasRequestModel): The request.
+
+    Returns:
+        Tuple[Cost, Optional[Any]]: The (epsilon, delta) cost and the
+            model fitted by the estimation, if any.
+    """
+    data_connector = InMemoryConnector(metadata, load_shared_dataset(dataset))
+    querier = querier_type(data_connector, None)  # type: ignore [arg-type]
+    cost = querier.cost(query_json)
+    return cost, querier.get_fitted_model()
+
+
+def run_query(
+    querier_type: Type["DPQuerier"],
+    metadata: Metadata,
+    dataset: SharedDataset,
+    query_json: QueryModel,
+    fitted_model: Optional[Any],
+) -> Any:
+    """Runs a query in a process of a pool.
+
+    Args:
+        querier_type (Type[DPQuerier]): The querier class of the library.
+        metadata (Metadata): The metadata of the dataset.
+        dataset (SharedDataset): The shared dataset.
+        query_json (QueryModel): The query.
+        fitted_model (Optional[Any]): The model fitted by the cost estimation,
+            None if the querier does not fit models.
+
+    Returns:
+        Any: The query result.
+    """
+    data_connector = InMemoryConnector(metadata, load_shared_dataset(dataset))
+    querier = querier_type(data_connector, None)  # type: ignore [arg-type]
+    if fitted_model is None:
+        # Prepares the querier, as the cost estimation did in another process.
+        # Queriers without fitted model do not fit on the data in `cost`:
+        # smartnoise-sql only opens its reader, which cannot be pickled,
+        # and opendp only evaluates the privacy map of the pipeline.
+        querier.cost(query_json)
+    else:
+        querier.set_fitted_model(fitted_model)
+    return querier.query(query_json)
+
+
+class QuerierProcessPools:
+    """Process pools running the cost estimations and queries of the DP libraries.
+
+    The route handlers run in the threads of the server, where the
+    CPU-bound work of one query (pandas, sklearn, torch) holds the GIL
+    and slows down all the others. The libraries configured with a
+    process pool run in separate processes instead, started with the
+    "spawn" method since the server is multi-threaded.
+    """
+
+    def __init__(self) -> None:
+        """Initializer, without pools."""
+        self._lock = threading.Lock()
+        self._pools: Dict[DPLibraries, ProcessPoolExecutor] = {}
+        self._config: ProcessPoolsConfig = ProcessPoolsConfig()
+        self._initializer: Optional[Callable[..., None]] = None
+        self._initargs: Tuple[Any, ...] = ()
+
+    def set_config(
+        self,
+        config: ProcessPoolsConfig,
+        initializer: Optional[Callable[..., None]] = None,
+        initargs: Tuple[Any, ...] = (),
+    ) -> None:
+        """Stops the current pools and starts the configured ones.
+
+        Args:
+            config (ProcessPoolsConfig): The process pools config.
+            initializer (Optional[Callable[..., None]], optional): Function run
+                by each process at startup. Defaults to None.
+            initargs (Tuple[Any, ...], optional): The arguments of the
+                initializer. Defaults to ().
+        """
+        self.shutdown()
+        with self._lock:
+            self._config = config
+            self._initializer = initializer
+            self._initargs = initargs
+            for library in DPLibraries:
+                if getattr(config, library) > 0:
+                    self._pools[library] = self._new_pool(library)
+
+    def has_pool(self, library: Optional[DPLibraries]) -> bool:
+        """Whether a library runs in a process pool.
+
+        Args:
+            library (Optional[DPLibraries]): The DP library.
+
+        Returns:
+            bool: True if the library has a process pool, False otherwise.
+        """
+        return library in self._pools
+
+    def run(self, library: DPLibraries, func: Callable[..., Any], *args: Any) -> Any:
+        """Runs a function in the process pool of a library and waits for its result.
+
+        A pool whose process died (for instance out of memory) is replaced.
+
+        Args:
+            library (DPLibraries): The DP library.
+            func (Callable[..., Any]): The function, pickled by reference.
+            *args (Any): The arguments of the function, pickled.
+
+        Raises:
+            InternalServerException: If the library has no pool or a process died.
+
+        Returns:
+            Any: The result of the function.
+        """
+        pool = self._pools.get(library)
+        if pool is None:
+            raise InternalServerException(f"No process pool for {library}.")
+        try:
+            return pool.submit(func, *args).result()
+        except BrokenProcessPool as e:
+            with self._lock:
+                if self._pools.get(library) is pool:
+                    self._pools[library] = self._new_pool(library)
+            pool.shutdown(wait=False)
+            raise InternalServerException(f"Process of {library} pool stopped: {e}") from e
+
+    def shutdown(self) -> None:
+        """Stops the pools, cancelling the pending tasks."""
+        with self._lock:
+            for pool in self._pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+            self._pools.clear()
+
+    def _new_pool(self, library: DPLibraries) -> ProcessPoolExecutor:
+        """Starts a process pool for a library.
+
+        Args:
+            library (DPLibraries): The DP library.
+
+        Returns:
+            ProcessPoolExecutor: The process pool.
+        """
+        return ProcessPoolExecutor(
+            max_workers=getattr(self._config, library),
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=self._initializer,
+            initargs=self._initargs,
+        )
+
+
+QUERIER_PROCESS_POOLS = QuerierProcessPools()
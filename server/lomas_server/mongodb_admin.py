@@ -6,7 +6,9 @@ from warnings import warn
 
 import boto3
 import yaml
+from pymongo import ReplaceOne
 from pymongo.database import Database
+from pymongo.errors import BulkWriteError
 from pymongo.results import _WriteResult
 
 from lomas_core.error_handler import InternalServerException
@@ -21,9 +23,16 @@ from lomas_core.models.collections import (
     UserCollection,
 )
 from lomas_core.models.constants import PrivateDatabaseType
-from lomas_server.admin_database.constants import BudgetDBKey
+from lomas_server.admin_database.constants import (
+    METADATA_MIGRATION_BATCH_SIZE,
+    BudgetDBKey,
+)
 from lomas_server.admin_database.mongodb_database import (
     check_result_acknowledged,
+    find_metadata_document,
+    get_metadata_document,
+    get_metadata_filter,
+    get_metadata_of_document,
 )
 
 
@@ -120,7 +129,7 @@ def check_dataset_and_metadata_exist(enforce_true: bool) -> Callable:
             if not enforce_true and dataset_count > 0:
                 raise ValueError(f"Dataset {dataset} already exists in dataset collection")
 
-            metadata_count = db.metadata.count_documents({dataset: {"$exists": True}})
+            metadata_count = db.metadata.count_documents(get_metadata_filter(f"{dataset}"))
 
             if enforce_true and metadata_count == 0:
                 raise ValueError(f"Metadata for dataset {dataset} does" " not exist in metadata collection")
@@ -602,7 +611,7 @@ def add_dataset(  # pylint: disable=too-many-arguments, too-many-locals
     # Step 4: Insert into db
     res = db.datasets.insert_one(validated_dataset)
     check_result_acknowledged(res)
-    res = db.metadata.insert_one({dataset_name: validated_metadata})
+    res = db.metadata.insert_one(get_metadata_document(dataset_name, validated_metadata))
     check_result_acknowledged(res)
 
     # codeQL : py/log-injection
@@ -713,17 +722,18 @@ def add_datasets_via_yaml(  # pylint: disable=R0912, R0914, R0915
                 )
 
         # Overwrite or not depending on config if metadata already exists
-        metadata_filter = {dataset_name: metadata_dict}
-        metadata = db.metadata.find_one(metadata_filter)
+        metadata = find_metadata_document(db, dataset_name)
 
         if metadata and overwrite_metadata:
             logging.info(f"Metadata updated for dataset : {dataset_name}.")
-            res = db.metadata.update_one(metadata_filter, {"$set": {dataset_name: metadata_dict}})
+            res = db.metadata.replace_one(
+                {"_id": metadata["_id"]}, get_metadata_document(dataset_name, metadata_dict)
+            )
             check_result_acknowledged(res)
         elif metadata:
             logging.info("Metadata already exist. Use the command -om to overwrite with new values.")
         else:
-            res = db.metadata.insert_one({dataset_name: metadata_dict})
+            res = db.metadata.insert_one(get_metadata_document(dataset_name, metadata_dict))
             check_result_acknowledged(res)
             logging.info(f"Added metadata of {dataset_name} dataset. ")
 
@@ -741,7 +751,7 @@ def del_dataset(db: Database, dataset: str) -> None:
     """
     res = db.datasets.delete_many({"dataset_name": dataset})
     check_result_acknowledged(res)
-    res = db.metadata.delete_many({dataset: {"$exists": True}})
+    res = db.metadata.delete_many(get_metadata_filter(dataset))
     check_result_acknowledged(res)
     logging.info(f"Deleted dataset and metadata for {dataset}.")
 
@@ -775,11 +785,11 @@ def get_metadata_of_dataset(db: Database, dataset: str) -> dict:
         metadata (dict): informations about the metadata
     """
     # Retrieve the document containing metadata for the specified dataset
-    metadata_document = db.metadata.find_one({dataset: {"$exists": True}})
+    metadata_document = find_metadata_document(db, dataset)
     assert metadata_document is not None, "Metadata must exist"
 
     # Extract metadata for the specified dataset
-    metadata_info = metadata_document[dataset]
+    metadata_info = get_metadata_of_document(metadata_document, dataset)
     logging.info(metadata_info)
     return metadata_info
 
@@ -800,6 +810,92 @@ def get_list_of_datasets(db: Database) -> list:
     return dataset_names
 
 
+def migrate_metadata(db: Database, batch_size: int = METADATA_MIGRATION_BATCH_SIZE) -> int:
+    """Migrate the legacy metadata documents to the current layout.
+
+    The legacy {<dataset_name>: metadata} documents are replaced in place
+    by {dataset_name, version, metadata} documents, one bulk write per
+    batch. The server reads both layouts, so it keeps running during the
+    migration, which can be interrupted and run again. Documents which
+    cannot be replaced are reported and kept in the legacy layout.
+
+    Args:
+        db (Database): mongo database object
+        batch_size (int, optional): Number of documents migrated per bulk write.
+            Defaults to METADATA_MIGRATION_BATCH_SIZE.
+
+    Raises:
+        ValueError: If a legacy document does not contain exactly one dataset.
+
+    Returns:
+        int: The number of migrated documents.
+    """
+    nb_migrated = 0
+    failed: List[str] = []
+    legacy_documents = db.metadata.find({"version": {"$exists": False}}, batch_size=batch_size)
+    batch: List[ReplaceOne] = []
+    batch_names: List[str] = []
+    for document in legacy_documents:
+        dataset_names = [key for key in document if key not in ("_id", "dataset_name")]
+        if len(dataset_names) != 1:
+            raise ValueError(f"Metadata document {document['_id']} must contain exactly one dataset.")
+        dataset_name = dataset_names[0]
+        batch.append(
+            ReplaceOne(
+                {"_id": document["_id"]},
+                get_metadata_document(dataset_name, document[dataset_name]),
+            )
+        )
+        batch_names.append(dataset_name)
+        if len(batch) == batch_size:
+            nb_migrated += write_metadata_batch(db, batch, batch_names, failed)
+            batch, batch_names = [], []
+    if batch:
+        nb_migrated += write_metadata_batch(db, batch, batch_names, failed)
+
+    logging.info(f"Migrated {nb_migrated} metadata documents.")
+    if failed:
+        logging.error(
+            f"Failed to migrate the metadata documents of {', '.join(failed)}, "
+            "which are kept in the legacy layout."
+        )
+    return nb_migrated
+
+
+def write_metadata_batch(
+    db: Database, batch: List[ReplaceOne], dataset_names: List[str], failed: List[str]
+) -> int:
+    """Write a batch of migrated metadata documents.
+
+    The replacements are unordered: if some fail (for instance a dataset
+    which already has a document in the current layout, rejected by the
+    unique index), the others are still written.
+
+    Args:
+        db (Database): mongo database object
+        batch (List[ReplaceOne]): The replacements of the legacy documents.
+        dataset_names (List[str]): The dataset names of the replacements.
+        failed (List[str]): The dataset names whose replacement failed,
+            appended to.
+
+    Returns:
+        int: The number of replaced documents.
+    """
+    try:
+        res = db.metadata.bulk_write(batch, ordered=False)
+    except BulkWriteError as e:
+        for error in e.details["writeErrors"]:
+            dataset_name = dataset_names[error["index"]]
+            logging.error(f"Failed to migrate the metadata document of {dataset_name}: {error['errmsg']}")
+            failed.append(dataset_name)
+        nb_modified = e.details["nModified"]
+    else:
+        check_result_acknowledged(res)
+        nb_modified = res.modified_count
+    logging.info(f"Migrated a batch of {nb_modified} metadata documents.")
+    return nb_modified
+
+
 #######################  COLLECTIONS  ####################### # noqa: E266
 def drop_collection(db: Database, collection: str) -> None:
     """Delete collection.
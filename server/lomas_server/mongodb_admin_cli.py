@@ -5,6 +5,7 @@ from pymongo.database import Database
 
 from lomas_core.models.config import MongoDBConfig
 from lomas_core.models.constants import AdminDBType
+from lomas_server.admin_database.constants import METADATA_MIGRATION_BATCH_SIZE
 from lomas_server.admin_database.utils import get_mongodb_url
 from lomas_server.mongodb_admin import (
     add_dataset,
@@ -25,6 +26,7 @@ from lomas_server.mongodb_admin import (
     get_list_of_users,
     get_metadata_of_dataset,
     get_user,
+    migrate_metadata,
     set_budget_field,
     set_may_query,
 )
@@ -307,6 +309,21 @@ if __name__ == "__main__":
     )
     get_datasets_parser.set_defaults(func=get_list_of_datasets)
 
+    # Function: Migrate Metadata
+    migrate_metadata_parser = subparsers.add_parser(
+        "migrate_metadata",
+        help="migrate the metadata collection to the {dataset_name, version, metadata} layout",
+        parents=[connection_parser],
+    )
+    migrate_metadata_parser.add_argument(
+        "-b",
+        "--batch_size",
+        default=METADATA_MIGRATION_BATCH_SIZE,
+        type=int,
+        help="number of metadata documents migrated per write",
+    )
+    migrate_metadata_parser.set_defaults(func=migrate_metadata)
+
     #######################  COLLECTIONS  ####################### # noqa: E266
     # Create the parser for the "drop_collection" command
     drop_collection_parser = subparsers.add_parser(
@@ -404,6 +421,7 @@ if __name__ == "__main__":
         "get_dataset": lambda args: get_dataset(mongo_db, args.dataset),
         "get_metadata_of_dataset": lambda args: get_metadata_of_dataset(mongo_db, args.dataset),
         "get_list_of_datasets": lambda args: get_list_of_datasets(mongo_db),
+        "migrate_metadata": lambda args: migrate_metadata(mongo_db, args.batch_size),
         "drop_collection": lambda args: drop_collection(mongo_db, args.collection),
         "get_collection": lambda args: get_collection(mongo_db, args.collection),
     }
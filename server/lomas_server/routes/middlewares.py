@@ -11,6 +11,7 @@ from starlette.routing import Match
 from starlette.types import ASGIApp
 
 from lomas_core.error_handler import KNOWN_EXCEPTIONS
+from lomas_server.admin_database.request_context import admin_database_request_context
 from lomas_server.constants import SERVER_SERVICE_NAME
 from lomas_server.utils.metrics import (
     FAST_API_EXCEPTION_COUNTER,
@@ -76,6 +77,29 @@ class LoggingAndTracingMiddleware(BaseHTTPMiddleware):
         return response
 
 
+class AdminDatabaseContextMiddleware(BaseHTTPMiddleware):
+    """
+    Middleware memoizing the admin database lookups of a request.
+
+    The existence and access checks of the user and dataset of a
+    request run once, instead of once per admin database call.
+    """
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        """
+        Handles the request in an admin database request context.
+
+        Args:
+            request (Request): The incoming request object.
+            call_next (RequestResponseEndpoint): The next middleware or request handler.
+
+        Returns:
+            Response: The HTTP response generated by calling `call_next(request)`.
+        """
+        with admin_database_request_context():
+            return await call_next(request)
+
+
 class FastAPIMetricMiddleware(BaseHTTPMiddleware):
     """
     Middleware to collect and expose Prometheus metrics for a FastAPI application.
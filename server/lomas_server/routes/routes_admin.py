@@ -1,4 +1,6 @@
-from fastapi import APIRouter, Body, Depends, Header, Request
+from typing import Optional
+
+from fastapi import APIRouter, Body, Depends, Header, Request, status
 from fastapi.responses import JSONResponse, RedirectResponse
 
 from lomas_core.error_handler import (
@@ -19,6 +21,7 @@ from lomas_core.models.responses import (
     SpentBudgetResponse,
 )
 from lomas_server.data_connector.data_connector import get_column_dtypes
+from lomas_server.data_connector.dataset_refresher import DATASET_REFRESHER
 from lomas_server.dp_queries.dummy_dataset import make_dummy_dataset
 from lomas_server.routes.utils import server_live
 
@@ -60,6 +63,80 @@ async def get_state(
     )
 
 
+# Liveness probe
+@router.get("/live", tags=["ADMIN_USER"])
+async def get_live(request: Request) -> JSONResponse:
+    """Checks that the server started correctly.
+
+    Args:
+        request (Request): Raw request object
+
+    Returns:
+        JSONResponse: The liveness, with status 503 if the server is not live.
+    """
+    live = request.app.state.server_state["LIVE"]
+
+    return JSONResponse(
+        content={"LIVE": live},
+        status_code=status.HTTP_200_OK if live else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+# Readiness probe
+@router.get("/ready", tags=["ADMIN_USER"])
+async def get_ready(request: Request) -> JSONResponse:
+    """Checks that the server is live and done warming up the datasets.
+
+    Args:
+        request (Request): Raw request object
+
+    Returns:
+        JSONResponse: The readiness and the warm-up progress of each dataset,
+            with status 503 if the server is not ready.
+    """
+    server_state = request.app.state.server_state
+    ready = server_state["LIVE"] and server_state["READY"]
+
+    return JSONResponse(
+        content={"READY": ready, "datasets": server_state["datasets"]},
+        status_code=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+# Revalidate cached datasets
+@router.post(
+    "/refresh_datasets",
+    dependencies=[Depends(server_live)],
+    tags=["ADMIN_USER"],
+)
+def refresh_datasets(
+    dataset_name: Optional[str] = None,
+    user_name: str = Header(None),
+) -> JSONResponse:
+    """Revalidates the cached datasets and reloads the modified ones.
+
+    Each server worker has its own dataset cache, this endpoint refreshes
+    the one of the worker handling the request. The periodic refresh
+    (dataset_cache.refresh_interval_seconds) runs in every worker.
+
+    Args:
+        dataset_name (Optional[str], optional): Only refresh this dataset.
+            Defaults to None (all cached datasets).
+        user_name (str, optional): The user name. Defaults to Header(None).
+
+    Returns:
+        JSONResponse: The refresh outcome of each cached dataset.
+    """
+    results = DATASET_REFRESHER.refresh(dataset_name)
+
+    return JSONResponse(
+        content={
+            "requested_by": user_name,
+            "datasets": [result.model_dump(mode="json") for result in results],
+        }
+    )
+
+
 # Metadata query
 @router.post(
     "/get_dataset_metadata",
@@ -151,7 +228,8 @@ def get_dummy_dataset(
 
     try:
         ds_metadata = app.state.admin_database.get_dataset_metadata(query_json.dataset_name)
-        dtypes, datetime_columns = get_column_dtypes(ds_metadata)
+        # The client casts the dummy dataset to the plain metadata types.
+        dtypes, datetime_columns = get_column_dtypes(ds_metadata, compact=False)
 
         dummy_df = make_dummy_dataset(
             ds_metadata,
@@ -8,9 +8,11 @@ from lomas_core.models.requests import (
     DiffPrivLibDummyQueryModel,
     DiffPrivLibQueryModel,
     DiffPrivLibRequestModel,
+    OpenDPBatchQueryModel,
     OpenDPDummyQueryModel,
     OpenDPQueryModel,
     OpenDPRequestModel,
+    SmartnoiseSQLBatchQueryModel,
     SmartnoiseSQLDummyQueryModel,
     SmartnoiseSQLQueryModel,
     SmartnoiseSQLRequestModel,
@@ -18,8 +20,9 @@ from lomas_core.models.requests import (
     SmartnoiseSynthQueryModel,
     SmartnoiseSynthRequestModel,
 )
-from lomas_core.models.responses import CostResponse, QueryResponse
+from lomas_core.models.responses import BatchQueryResponse, CostResponse, QueryResponse
 from lomas_server.routes.utils import (
+    handle_batch_query_on_private_dataset,
     handle_cost_query,
     handle_query_on_dummy_dataset,
     handle_query_on_private_dataset,
@@ -59,7 +62,7 @@ def smartnoise_sql_handler(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -70,6 +73,44 @@ def smartnoise_sql_handler(
     )
 
 
+@router.post(
+    "/smartnoise_sql_batch_query",
+    dependencies=[Depends(server_live)],
+    response_model=BatchQueryResponse,
+    responses=SERVER_QUERY_ERROR_RESPONSES,
+    tags=["USER_QUERY"],
+)
+def smartnoise_sql_batch_handler(
+    user_name: Annotated[str, Header()],
+    request: Request,
+    smartnoise_sql_batch: SmartnoiseSQLBatchQueryModel,
+) -> BatchQueryResponse:
+    """
+    Handles batches of queries on one dataset for the SmartNoiseSQL library.
+
+    \f
+    Args:
+        user_name (str): The user name.
+        request (Request): Raw request object
+        smartnoise_sql_batch (SmartnoiseSQLBatchQueryModel): The batch of smartnoise_sql queries.
+
+    Raises:
+        ExternalLibraryException: For exceptions from libraries
+            external to this package.
+        InternalServerException: For any other unforseen exceptions.
+        InvalidQueryException: If there is not enough budget for the batch
+            or the dataset does not exist.
+        UnauthorizedAccessException: The user runs too many concurrent queries,
+            the user does not exist or does not have access to the dataset.
+
+    Returns:
+        BatchQueryResponse: The query responses, containing SmartnoiseSQLQueryResults.
+    """
+    return handle_batch_query_on_private_dataset(
+        request, smartnoise_sql_batch, user_name, DPLibraries.SMARTNOISE_SQL
+    )
+
+
 @router.post(
     "/dummy_smartnoise_sql_query",
     dependencies=[Depends(server_live)],
@@ -98,7 +139,7 @@ def dummy_smartnoise_sql_handler(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -134,7 +175,7 @@ def estimate_smartnoise_sql_cost(
             external to this package.
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: The dataset does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -175,7 +216,7 @@ def smartnoise_synth_handler(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -215,7 +256,7 @@ def dummy_smartnoise_synth_handler(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -255,7 +296,7 @@ def estimate_smartnoise_synth_cost(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -295,7 +336,7 @@ def opendp_query_handler(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: The pipeline does not contain a "measurement",
             there is not enough budget or the dataset does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -304,6 +345,42 @@ def opendp_query_handler(
     return handle_query_on_private_dataset(request, opendp_query, user_name, DPLibraries.OPENDP)
 
 
+@router.post(
+    "/opendp_batch_query",
+    dependencies=[Depends(server_live)],
+    response_model=BatchQueryResponse,
+    responses=SERVER_QUERY_ERROR_RESPONSES,
+    tags=["USER_QUERY"],
+)
+def opendp_batch_handler(
+    user_name: Annotated[str, Header()],
+    request: Request,
+    opendp_batch: OpenDPBatchQueryModel,
+) -> BatchQueryResponse:
+    """
+    Handles batches of queries on one dataset for the OpenDP library.
+
+    \f
+    Args:
+        user_name (str): The user name.
+        request (Request): Raw request object.
+        opendp_batch (OpenDPBatchQueryModel): The batch of opendp queries.
+
+    Raises:
+        ExternalLibraryException: For exceptions from libraries
+            external to this package.
+        InternalServerException: For any other unforseen exceptions.
+        InvalidQueryException: A pipeline does not contain a "measurement",
+            there is not enough budget for the batch or the dataset does not exist.
+        UnauthorizedAccessException: The user runs too many concurrent queries,
+            the user does not exist or does not have access to the dataset.
+
+    Returns:
+        BatchQueryResponse: The query responses, containing OpenDPQueryResults.
+    """
+    return handle_batch_query_on_private_dataset(request, opendp_batch, user_name, DPLibraries.OPENDP)
+
+
 @router.post(
     "/dummy_opendp_query",
     dependencies=[Depends(server_live)],
@@ -331,7 +408,7 @@ def dummy_opendp_query_handler(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: The pipeline does not contain a "measurement",
             there is not enough budget or the dataset does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -367,7 +444,7 @@ def estimate_opendp_cost(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: The pipeline does not contain a "measurement",
             there is not enough budget or the dataset does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -407,7 +484,7 @@ def diffprivlib_query_handler(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -443,7 +520,7 @@ def dummy_diffprivlib_query_handler(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -488,7 +565,7 @@ def estimate_diffprivlib_cost(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -0,0 +1,229 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, Request, status
+
+from lomas_core.constants import DPLibraries
+from lomas_core.error_handler import SERVER_QUERY_ERROR_RESPONSES
+from lomas_core.models.requests import (
+    DiffPrivLibQueryModel,
+    OpenDPQueryModel,
+    SmartnoiseSQLQueryModel,
+    SmartnoiseSynthQueryModel,
+)
+from lomas_core.models.responses import JobResponse, QueryResponse
+from lomas_server.routes.utils import (
+    get_job_result,
+    get_user_job,
+    server_live,
+    submit_job,
+)
+
+router = APIRouter()
+
+# Job submission
+# -----------------------------------------------------------------------------
+
+
+@router.post(
+    "/jobs/smartnoise_sql_query",
+    dependencies=[Depends(server_live)],
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobResponse,
+    responses=SERVER_QUERY_ERROR_RESPONSES,
+    tags=["USER_JOB"],
+)
+def submit_smartnoise_sql_job_handler(
+    user_name: Annotated[str, Header()],
+    request: Request,
+    smartnoise_sql_query: SmartnoiseSQLQueryModel,
+) -> JobResponse:
+    """
+    Submits a query for the SmartNoiseSQL library as an asynchronous job.
+
+    \f
+    Args:
+        user_name (str): The user name.
+        request (Request): Raw request object
+        smartnoise_sql_query (SmartnoiseSQLQueryModel): The smartnoise_sql query body.
+
+    Raises:
+        InvalidQueryException: If the job queue is full.
+        UnauthorizedAccessException: The user does not exist or
+            does not have access to the dataset.
+
+    Returns:
+        JobResponse: The pending job, to poll with its job_id.
+    """
+    return submit_job(request, smartnoise_sql_query, user_name, DPLibraries.SMARTNOISE_SQL)
+
+
+@router.post(
+    "/jobs/smartnoise_synth_query",
+    dependencies=[Depends(server_live)],
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobResponse,
+    responses=SERVER_QUERY_ERROR_RESPONSES,
+    tags=["USER_JOB"],
+)
+def submit_smartnoise_synth_job_handler(
+    user_name: Annotated[str, Header()],
+    request: Request,
+    smartnoise_synth_query: SmartnoiseSynthQueryModel,
+) -> JobResponse:
+    """
+    Submits a query for the SmartNoiseSynth library as an asynchronous job.
+
+    \f
+    Args:
+        user_name (str): The user name.
+        request (Request): Raw request object
+        smartnoise_synth_query (SmartnoiseSynthQueryModel): The smartnoise_synth query body.
+
+    Raises:
+        InvalidQueryException: If the job queue is full.
+        UnauthorizedAccessException: The user does not exist or
+            does not have access to the dataset.
+
+    Returns:
+        JobResponse: The pending job, to poll with its job_id.
+    """
+    return submit_job(request, smartnoise_synth_query, user_name, DPLibraries.SMARTNOISE_SYNTH)
+
+
+@router.post(
+    "/jobs/opendp_query",
+    dependencies=[Depends(server_live)],
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobResponse,
+    responses=SERVER_QUERY_ERROR_RESPONSES,
+    tags=["USER_JOB"],
+)
+def submit_opendp_job_handler(
+    user_name: Annotated[str, Header()],
+    request: Request,
+    opendp_query: OpenDPQueryModel,
+) -> JobResponse:
+    """
+    Submits a query for the OpenDP library as an asynchronous job.
+
+    \f
+    Args:
+        user_name (str): The user name.
+        request (Request): Raw request object
+        opendp_query (OpenDPQueryModel): The opendp query body.
+
+    Raises:
+        InvalidQueryException: If the job queue is full.
+        UnauthorizedAccessException: The user does not exist or
+            does not have access to the dataset.
+
+    Returns:
+        JobResponse: The pending job, to poll with its job_id.
+    """
+    return submit_job(request, opendp_query, user_name, DPLibraries.OPENDP)
+
+
+@router.post(
+    "/jobs/diffprivlib_query",
+    dependencies=[Depends(server_live)],
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobResponse,
+    responses=SERVER_QUERY_ERROR_RESPONSES,
+    tags=["USER_JOB"],
+)
+def submit_diffprivlib_job_handler(
+    user_name: Annotated[str, Header()],
+    request: Request,
+    diffprivlib_query: DiffPrivLibQueryModel,
+) -> JobResponse:
+    """
+    Submits a query for the DiffPrivLib library as an asynchronous job.
+
+    \f
+    Args:
+        user_name (str): The user name.
+        request (Request): Raw request object
+        diffprivlib_query (DiffPrivLibQueryModel): The diffprivlib query body.
+
+    Raises:
+        InvalidQueryException: If the job queue is full.
+        UnauthorizedAccessException: The user does not exist or
+            does not have access to the dataset.
+
+    Returns:
+        JobResponse: The pending job, to poll with its job_id.
+    """
+    return submit_job(request, diffprivlib_query, user_name, DPLibraries.DIFFPRIVLIB)
+
+
+# Job status and result
+# -----------------------------------------------------------------------------
+
+
+@router.get(
+    "/jobs/{job_id}",
+    dependencies=[Depends(server_live)],
+    response_model=JobResponse,
+    responses=SERVER_QUERY_ERROR_RESPONSES,
+    tags=["USER_JOB"],
+)
+def get_job_handler(
+    user_name: Annotated[str, Header()],
+    request: Request,
+    job_id: str,
+) -> JobResponse:
+    """
+    Returns the status of an asynchronous job.
+
+    \f
+    Args:
+        user_name (str): The user name.
+        request (Request): Raw request object
+        job_id (str): The identifier of the job.
+
+    Raises:
+        UnauthorizedAccessException: If there is no such job for the user.
+
+    Returns:
+        JobResponse: The job status.
+    """
+    job = get_user_job(request, job_id, user_name)
+    return JobResponse.model_validate(job.model_dump())
+
+
+@router.get(
+    "/jobs/{job_id}/result",
+    dependencies=[Depends(server_live)],
+    response_model=QueryResponse,
+    responses=SERVER_QUERY_ERROR_RESPONSES,
+    tags=["USER_JOB"],
+)
+def get_job_result_handler(
+    user_name: Annotated[str, Header()],
+    request: Request,
+    job_id: str,
+) -> QueryResponse:
+    """
+    Returns the result of a complete asynchronous job.
+
+    The error of the query is returned if the job failed.
+
+    \f
+    Args:
+        user_name (str): The user name.
+        request (Request): Raw request object
+        job_id (str): The identifier of the job.
+
+    Raises:
+        ExternalLibraryException: For exceptions from libraries
+            external to this package, if the job failed.
+        InternalServerException: For any other unforseen exceptions,
+            if the job failed.
+        InvalidQueryException: If the job is not finished, or there
+            was not enough budget for the query.
+        UnauthorizedAccessException: If there is no such job for the user.
+
+    Returns:
+        QueryResponse: The query response of the job.
+    """
+    return get_job_result(request, job_id, user_name)
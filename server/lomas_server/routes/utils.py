@@ -3,23 +3,35 @@ import time
 from collections.abc import AsyncGenerator
 from functools import wraps
 
-from fastapi import Request
+from fastapi import FastAPI, Request
 
 from lomas_core.constants import DPLibraries
 from lomas_core.error_handler import (
     KNOWN_EXCEPTIONS,
     InternalServerException,
+    InvalidQueryException,
     UnauthorizedAccessException,
 )
+from lomas_core.models.collections import Job
+from lomas_core.models.constants import JobStatus
 from lomas_core.models.requests import (
+    BatchQueryModel,
     DummyQueryModel,
     LomasRequestModel,
     QueryModel,
 )
-from lomas_core.models.responses import CostResponse, QueryResponse
+from lomas_core.models.responses import (
+    BatchQueryResponse,
+    CostResponse,
+    JobResponse,
+    QueryResponse,
+)
 from lomas_server.data_connector.factory import data_connector_factory
+from lomas_server.dp_queries.cost_cache import estimate_cost
 from lomas_server.dp_queries.dp_libraries.factory import querier_factory
 from lomas_server.dp_queries.dummy_dataset import get_dummy_dataset_for_query
+from lomas_server.dp_queries.fitted_model_store import store_fitted_model
+from lomas_server.dp_queries.job_queue import get_exception
 from lomas_server.utils.config import get_config
 
 
@@ -92,15 +104,47 @@ def handle_query_on_private_dataset(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
         QueryResponse: A QueryResponse model containing the result of the query
             (specific to the library) as well as the cost of the query.
     """
-    app = request.app
+    return run_query_on_private_dataset(request.app, query_json, user_name, dp_library)
+
+
+def run_query_on_private_dataset(
+    app: FastAPI,
+    query_json: QueryModel,
+    user_name: str,
+    dp_library: DPLibraries,
+) -> QueryResponse:
+    """
+    Runs a query on a private dataset, without timing protection.
+
+    Shared by the query endpoints and the workers of asynchronous jobs.
+
+    Args:
+        app (FastAPI): The application, holding the admin database
+            and the private credentials.
+        query_json (QueryModel): An instance of QueryModel, specific to the library.
+        user_name (str): The user name
+        dp_library (DPLibraries): Name of the DP library to use for the request
 
+    Raises:
+        ExternalLibraryException: For exceptions from libraries
+            external to this package.
+        InternalServerException: For any other unforseen exceptions.
+        InvalidQueryException: If there is not enough budget or the dataset
+            does not exist.
+        UnauthorizedAccessException: The user runs too many concurrent queries,
+            the user does not exist or does not have access to the dataset.
+
+    Returns:
+        QueryResponse: A QueryResponse model containing the result of the query
+            (specific to the library) as well as the cost of the query.
+    """
     data_connector = data_connector_factory(
         query_json.dataset_name,
         app.state.admin_database,
@@ -121,6 +165,58 @@ def handle_query_on_private_dataset(
     return response
 
 
+@timing_protection
+def handle_batch_query_on_private_dataset(
+    request: Request,
+    batch_query: BatchQueryModel,
+    user_name: str,
+    dp_library: DPLibraries,
+) -> BatchQueryResponse:
+    """
+    Handles batches of queries on a private dataset for the supported libraries.
+
+    Args:
+        request (Request): Raw request object
+        batch_query (BatchQueryModel): An instance of BatchQueryModel,
+            specific to the library.
+        user_name (str): The user name
+        dp_library (DPLibraries): Name of the DP library to use for the batch
+
+    Raises:
+        ExternalLibraryException: For exceptions from libraries
+            external to this package.
+        InternalServerException: For any other unforseen exceptions.
+        InvalidQueryException: If there is not enough budget for the batch
+            or the dataset does not exist.
+        UnauthorizedAccessException: The user runs too many concurrent queries,
+            the user does not exist or does not have access to the dataset.
+
+    Returns:
+        BatchQueryResponse: A BatchQueryResponse model containing the responses
+            to the queries as well as the total cost of the batch.
+    """
+    app = request.app
+
+    data_connector = data_connector_factory(
+        batch_query.dataset_name,
+        app.state.admin_database,
+        app.state.private_credentials,
+    )
+    dp_querier = querier_factory(
+        dp_library,
+        data_connector=data_connector,
+        admin_database=app.state.admin_database,
+    )
+    try:
+        response = dp_querier.handle_batch_query(batch_query.queries, user_name)
+    except KNOWN_EXCEPTIONS as e:
+        raise e
+    except Exception as e:
+        raise InternalServerException(str(e)) from e
+
+    return response
+
+
 def handle_query_on_dummy_dataset(
     request: Request,
     query_model: DummyQueryModel,
@@ -143,7 +239,7 @@ def handle_query_on_dummy_dataset(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -167,13 +263,15 @@ def handle_query_on_dummy_dataset(
     )
 
     try:
-        eps_cost, delta_cost = dummy_querier.cost(query_model)
-        result = dummy_querier.query(query_model)
+        eps_cost, delta_cost = dummy_querier.run_cost(query_model)
+        result = dummy_querier.run_query(query_model)
         response = QueryResponse(requested_by=user_name, result=result, epsilon=eps_cost, delta=delta_cost)
     except KNOWN_EXCEPTIONS as e:
         raise e
     except Exception as e:
         raise InternalServerException(str(e)) from e
+    finally:
+        dummy_querier.close()
 
     return response
 
@@ -201,7 +299,7 @@ def handle_cost_query(
         InternalServerException: For any other unforseen exceptions.
         InvalidQueryException: If there is not enough budget or the dataset
             does not exist.
-        UnauthorizedAccessException: A query is already ongoing for this user,
+        UnauthorizedAccessException: The user runs too many concurrent queries,
             the user does not exist or does not have access to the dataset.
 
     Returns:
@@ -227,10 +325,103 @@ def handle_cost_query(
         admin_database=app.state.admin_database,
     )
     try:
-        eps_cost, delta_cost = dp_querier.cost(request_model)
+        # Versioned first: a dataset changing during the estimation is seen as modified.
+        version = data_connector.get_version() if dp_querier.memoize_cost else None
+        eps_cost, delta_cost = estimate_cost(dp_library, dp_querier, request_model, version)
+        store_fitted_model(user_name, dp_querier, request_model, version, (eps_cost, delta_cost))
     except KNOWN_EXCEPTIONS as e:
         raise e
     except Exception as e:
         raise InternalServerException(str(e)) from e
+    finally:
+        dp_querier.close()
 
     return CostResponse(epsilon=eps_cost, delta=delta_cost)
+
+
+def submit_job(
+    request: Request,
+    query_json: QueryModel,
+    user_name: str,
+    dp_library: DPLibraries,
+) -> JobResponse:
+    """
+    Submits a query on a private dataset as an asynchronous job.
+
+    Args:
+        request (Request): Raw request object
+        query_json (QueryModel): An instance of QueryModel, specific to the library.
+        user_name (str): The user name
+        dp_library (DPLibraries): Name of the DP library to use for the request
+
+    Raises:
+        InvalidQueryException: If the job queue is full.
+        UnauthorizedAccessException: The user does not exist or
+            does not have access to the dataset.
+
+    Returns:
+        JobResponse: The pending job.
+    """
+    app = request.app
+    dataset_name = query_json.dataset_name
+    if not app.state.admin_database.has_user_access_to_dataset(user_name, dataset_name):
+        raise UnauthorizedAccessException(
+            f"{user_name} does not have access to {dataset_name}.",
+        )
+    job = app.state.job_queue.submit(query_json, user_name, dp_library)
+    return JobResponse.model_validate(job.model_dump())
+
+
+def get_user_job(request: Request, job_id: str, user_name: str) -> Job:
+    """
+    Gets an asynchronous query job of a user.
+
+    Args:
+        request (Request): Raw request object
+        job_id (str): The identifier of the job.
+        user_name (str): The user name
+
+    Raises:
+        UnauthorizedAccessException: If there is no such job for the user.
+
+    Returns:
+        Job: The job.
+    """
+    job = request.app.state.admin_database.get_job(job_id)
+    # The jobs of other users are reported as unknown.
+    if job is None or job.user_name != user_name:
+        raise UnauthorizedAccessException(f"{user_name} has no job {job_id}.")
+    return job
+
+
+def get_job_result(request: Request, job_id: str, user_name: str) -> QueryResponse:
+    """
+    Gets the result of an asynchronous query job of a user.
+
+    Args:
+        request (Request): Raw request object
+        job_id (str): The identifier of the job.
+        user_name (str): The user name
+
+    Raises:
+        ExternalLibraryException: For exceptions from libraries
+            external to this package, if the job failed.
+        InternalServerException: For any other unforseen exceptions,
+            if the job failed.
+        InvalidQueryException: If the job is not finished, or there
+            was not enough budget for the query.
+        UnauthorizedAccessException: If there is no such job for the user.
+
+    Returns:
+        QueryResponse: The response of the query of the job.
+    """
+    job = get_user_job(request, job_id, user_name)
+    match job.status:
+        case JobStatus.COMPLETE:
+            return QueryResponse.model_validate(job.result)
+        case JobStatus.FAILED if job.error is not None:
+            raise get_exception(job.error)
+        case JobStatus.FAILED:
+            raise InternalServerException(f"Job {job_id} failed without error.")
+        case _:
+            raise InvalidQueryException(f"Job {job_id} is not finished, its status is {job.status}.")
@@ -14,3 +14,20 @@ PENGUIN_COLUMNS = [
 ]
 
 PUMS_COLUMNS = ["age", "sex", "educ", "race", "income", "married"]
+
+PENGUIN_PATH = "tests/test_data/test_penguin.csv"
+PENGUIN_METADATA_PATH = "tests/test_data/metadata/penguin_metadata.yaml"
+BIRTHDAYS_PATH = "tests/test_data/birthdays.csv"
+BIRTHDAYS_METADATA_PATH = "tests/test_data/metadata/birthday_metadata.yaml"
+ADMIN_DB_PATH = "tests/test_data/local_db_file.yaml"
+
+SYNTH_REQUEST = {
+    "dataset_name": "PENGUIN",
+    "synth_name": "mwem",
+    "epsilon": 1.0,
+    "delta": None,
+    "select_cols": [],
+    "synth_params": {},
+    "nullable": True,
+    "constraints": "",
+}
@@ -45,6 +45,7 @@ from lomas_core.models.responses import (
 from lomas_server.admin_database.factory import admin_database_factory
 from lomas_server.admin_database.utils import get_mongodb
 from lomas_server.app import app
+from lomas_server.constants import DatasetRefreshStatus
 from lomas_server.mongodb_admin import (
     add_datasets_via_yaml,
     add_users_via_yaml,
@@ -163,6 +164,38 @@ class TestRootAPIEndpoint(unittest.TestCase):  # pylint: disable=R0904
             assert response_dict["requested_by"] == self.user_name
             assert response_dict["state"]["LIVE"]
 
+    def test_live_and_ready(self) -> None:
+        """Test liveness and readiness endpoints."""
+        with TestClient(app, headers=self.headers) as client:
+            response = client.get("/live")
+            assert response.status_code == status.HTTP_200_OK
+            assert json.loads(response.content.decode("utf8")) == {"LIVE": True}
+
+            # No dataset to warm up in the test config
+            response = client.get("/ready")
+            assert response.status_code == status.HTTP_200_OK
+            assert json.loads(response.content.decode("utf8")) == {"READY": True, "datasets": {}}
+
+    def test_refresh_datasets(self) -> None:
+        """Test refresh_datasets endpoint."""
+        with TestClient(app, headers=self.headers) as client:
+            # Load the dataset in the cache
+            response = client.post("/estimate_smartnoise_sql_cost", json=example_smartnoise_sql_cost)
+            assert response.status_code == status.HTTP_200_OK
+
+            response = client.post("/refresh_datasets", params={"dataset_name": PENGUIN_DATASET})
+            assert response.status_code == status.HTTP_200_OK
+
+            response_dict = json.loads(response.content.decode("utf8"))
+            assert response_dict["requested_by"] == self.user_name
+            assert response_dict["datasets"] == [
+                {
+                    "dataset_name": PENGUIN_DATASET,
+                    "status": DatasetRefreshStatus.UNCHANGED,
+                    "message": None,
+                }
+            ]
+
     def test_unknown_endpoint(self) -> None:
         """Test endpoint that does not exist."""
         with TestClient(app, headers=self.headers) as client:
@@ -510,6 +543,25 @@ class TestRootAPIEndpoint(unittest.TestCase):  # pylint: disable=R0904
             assert isinstance(r_model.result, SmartnoiseSQLQueryResult)
             assert r_model.result.df.shape[1] == 2
 
+    def test_smartnoise_sql_query_int_categorical(self) -> None:
+        """Test smartnoise-sql query on integer categorical columns."""
+        with TestClient(app, headers=self.headers) as client:
+            # Expect to work: the categories compare as integers
+            body = dict(example_smartnoise_sql)
+            body["dataset_name"] = "PUMS"
+            body["query_str"] = "SELECT race, COUNT(*) AS nb_row FROM df WHERE educ > 12 GROUP BY race"
+            response = client.post(
+                "/smartnoise_sql_query",
+                json=body,
+                headers=self.headers,
+            )
+            assert response.status_code == status.HTTP_200_OK
+            response_dict = json.loads(response.content.decode("utf8"))
+            r_model = QueryResponse.model_validate(response_dict)
+            assert isinstance(r_model.result, SmartnoiseSQLQueryResult)
+            assert list(r_model.result.df.columns) == ["race", "nb_row"]
+            assert set(r_model.result.df["race"]) <= {1, 2, 3, 4, 5, 6}
+
     def test_smartnoise_sql_query_datetime(self) -> None:
         """Test smartnoise-sql query on datetime."""
         # Will be solved in issue 340
@@ -1,6 +1,7 @@
 import json
 import warnings
 
+import pandas as pd
 from diffprivlib import models
 from diffprivlib.utils import (
     DiffprivlibCompatibilityWarning,
@@ -27,6 +28,10 @@ from lomas_core.models.responses import (
     QueryResponse,
 )
 from lomas_server.app import app
+from lomas_server.dp_queries.dp_libraries.utils import (
+    decode_categoricals,
+    handle_missing_data,
+)
 from lomas_server.tests.test_api import TestRootAPIEndpoint
 
 
@@ -141,6 +146,46 @@ class TestDiffPrivLibEndpoint(TestRootAPIEndpoint):  # pylint: disable=R0904
                     ]
                 )
 
+    def test_int_categorical_columns(self) -> None:
+        """Test diffprivlib query on integer categorical columns."""
+        with TestClient(app, headers=self.headers) as client:
+            pipeline = Pipeline(
+                [
+                    (
+                        "scaler",
+                        models.StandardScaler(epsilon=0.5, bounds=([0.0, 1.0], [120.0, 16.0])),
+                    ),
+                    (
+                        "classifier",
+                        models.LogisticRegression(epsilon=1.0, data_norm=121.06),
+                    ),
+                ]
+            )
+            diffprivlib_body = dict(example_diffprivlib)
+            diffprivlib_body["dataset_name"] = "PUMS"
+            diffprivlib_body["diffprivlib_json"] = serialise_pipeline(pipeline)
+            diffprivlib_body["feature_columns"] = ["age", "educ"]
+            diffprivlib_body["target_columns"] = ["race"]
+
+            # Expect to work: educ is imputed as a numerical column
+            diffprivlib_body["imputer_strategy"] = "mean"
+            response = client.post(
+                "/diffprivlib_query",
+                json=diffprivlib_body,
+                headers=self.headers,
+            )
+            validate_pipeline(response)
+
+            # Missing values out of the categories are imputed numerically too
+            df = pd.DataFrame(
+                {"educ": pd.Categorical([1, 2, None], categories=pd.Index([1, 2], dtype="int32"))}
+            )
+            df = decode_categoricals(df)
+            assert df["educ"].dtype == "Int32"
+            imputed = handle_missing_data(df, "median")
+            assert imputed["educ"].dtype == "Int32"
+            assert imputed["educ"].tolist() == [1, 2, 2]
+
     def test_logistic_regression_models(self) -> None:
         """Test diffprivlib query: Logistic Regression."""
         with TestClient(app, headers=self.headers) as client:
@@ -10,6 +10,7 @@ from snsynth.transform import (
     OneHotEncoder,
 )
 
+from lomas_core.models.config import FittedModelStoreConfig
 from lomas_core.models.exceptions import (
     ExternalLibraryExceptionModel,
     UnauthorizedAccessExceptionModel,
@@ -26,6 +27,7 @@ from lomas_core.models.responses import (
     SmartnoiseSynthSamples,
 )
 from lomas_server.app import app
+from lomas_server.dp_queries.fitted_model_store import FITTED_MODEL_STORE
 from lomas_server.tests.constants import PENGUIN_COLUMNS, PUMS_COLUMNS
 from lomas_server.tests.test_api import TestRootAPIEndpoint
 
@@ -463,6 +465,37 @@ class TestSmartnoiseSynthEndpoint(TestRootAPIEndpoint):  # pylint: disable=R0904
                 + "Please, change model or set `return_model=False`"
             )
 
+    def test_smartnoise_synth_query_mst_fitted_model(self) -> None:
+        """Test MST cannot return the model fitted by a previous cost estimation."""
+        with TestClient(app) as client:
+            FITTED_MODEL_STORE.set_config(FittedModelStoreConfig(enabled=True))
+            try:
+                body = dict(example_smartnoise_synth_cost)
+                body["synth_name"] = "mst"
+                body["select_cols"] = ["bill_length_mm"]  # too slow otherwise
+                body["synth_params"] = {}
+                response = client.post(
+                    "/estimate_smartnoise_synth_cost",
+                    json=body,
+                    headers=self.headers,
+                )
+                assert response.status_code == status.HTTP_200_OK
+
+                # Expect to fail: the stored MST model cannot be returned
+                body = {**body, "return_model": True, "nb_samples": 10, "condition": ""}
+                response = client.post(
+                    "/smartnoise_synth_query",
+                    json=body,
+                    headers=self.headers,
+                )
+                assert response.status_code == status.HTTP_400_BAD_REQUEST
+                assert response.json()["message"].startswith(
+                    "mst synthesizer cannot be returned, only samples. "
+                    + "Please, change model or set `return_model=False`"
+                )
+            finally:
+                FITTED_MODEL_STORE.set_config(FittedModelStoreConfig())
+
     def test_smartnoise_synth_query_pacsynth(self) -> None:
         """Test smartnoise synth query PAC-Synth Synthesizer.
 
@@ -0,0 +1,74 @@
+import unittest
+
+from pydantic import ValidationError
+
+from lomas_core.error_handler import InvalidQueryException
+from lomas_core.models.requests import SmartnoiseSQLBatchQueryModel
+from lomas_core.models.requests_examples import example_smartnoise_sql
+from lomas_core.models.responses import SmartnoiseSQLQueryResult
+from lomas_server.admin_database.yaml_database import AdminYamlDatabase
+from lomas_server.data_connector.path_connector import PathConnector
+from lomas_server.dp_queries.dp_libraries.smartnoise_sql import SmartnoiseSQLQuerier
+from lomas_server.tests.constants import (
+    ADMIN_DB_PATH,
+    PENGUIN_METADATA_PATH,
+    PENGUIN_PATH,
+)
+from lomas_server.tests.utils import load_metadata
+
+USER_NAME = "Dr. Antartica"
+PENGUIN_QUERY = {**example_smartnoise_sql, "epsilon": 1.0}
+
+
+class TestBatchQuery(unittest.TestCase):
+    """Tests for the batches of queries charged and archived together."""
+
+    def setUp(self) -> None:
+        """Loads the admin database (without saving it) and the penguin dataset."""
+        metadata = load_metadata(PENGUIN_METADATA_PATH)
+        self.admin_database = AdminYamlDatabase(ADMIN_DB_PATH)
+        self.querier = SmartnoiseSQLQuerier(PathConnector(metadata, PENGUIN_PATH), self.admin_database)
+
+    def test_batch_query(self) -> None:
+        """Test the queries of a batch are charged once and archived together."""
+        batch = SmartnoiseSQLBatchQueryModel.model_validate(
+            {"dataset_name": "PENGUIN", "queries": [PENGUIN_QUERY] * 3}
+        )
+        response = self.querier.handle_batch_query(batch.queries, USER_NAME)
+
+        self.assertEqual(response.requested_by, USER_NAME)
+        self.assertEqual(len(response.responses), 3)
+        for query_response in response.responses:
+            self.assertIsInstance(query_response.result, SmartnoiseSQLQueryResult)
+        self.assertEqual(response.epsilon, sum(r.epsilon for r in response.responses))
+        self.assertEqual(
+            self.admin_database.get_total_spent_budget(USER_NAME, "PENGUIN"),
+            [response.epsilon, response.delta],
+        )
+        self.assertEqual(len(self.admin_database.get_user_previous_queries(USER_NAME, "PENGUIN")), 3)
+        # No budget is left reserved.
+        remaining = self.admin_database.get_remaining_budget(USER_NAME, "PENGUIN")
+        self.admin_database.reserve_budget(USER_NAME, "PENGUIN", *remaining)
+
+    def test_batch_over_budget(self) -> None:
+        """Test nothing is executed nor spent if the batch costs more than the remaining budget."""
+        batch = SmartnoiseSQLBatchQueryModel.model_validate(
+            {"dataset_name": "PENGUIN", "queries": [PENGUIN_QUERY] * 11}
+        )
+        with self.assertRaises(InvalidQueryException):
+            self.querier.handle_batch_query(batch.queries, USER_NAME)
+
+        self.assertEqual(self.admin_database.get_total_spent_budget(USER_NAME, "PENGUIN"), [0, 0])
+        self.assertEqual(self.admin_database.get_user_previous_queries(USER_NAME, "PENGUIN"), [])
+        # No budget is left reserved.
+        remaining = self.admin_database.get_remaining_budget(USER_NAME, "PENGUIN")
+        self.admin_database.reserve_budget(USER_NAME, "PENGUIN", *remaining)
+
+    def test_batch_validation(self) -> None:
+        """Test batches are not empty and all their queries are on the dataset of the batch."""
+        with self.assertRaises(ValidationError):
+            SmartnoiseSQLBatchQueryModel.model_validate({"dataset_name": "PENGUIN", "queries": []})
+        with self.assertRaises(ValidationError):
+            SmartnoiseSQLBatchQueryModel.model_validate(
+                {"dataset_name": "BIRTHDAYS", "queries": [PENGUIN_QUERY]}
+            )
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import patch
+
+from lomas_core.error_handler import InvalidQueryException, UnauthorizedAccessException
+from lomas_core.models.collections import DatasetOfUser
+from lomas_core.models.config import BudgetReservationsConfig
+from lomas_server.admin_database.yaml_database import AdminYamlDatabase
+from lomas_server.tests.constants import ADMIN_DB_PATH
+
+USER_NAME = "Dr. Antartica"
+
+
+class TestBudgetReservation(unittest.TestCase):
+    """Tests for the ledger of the budget reserved by running queries."""
+
+    def setUp(self) -> None:
+        """Loads the admin database, without saving it."""
+        self.admin_database = AdminYamlDatabase(ADMIN_DB_PATH)
+        self.admin_database.set_reservations_config(
+            BudgetReservationsConfig(max_concurrent_queries=2, ttl_seconds=10)
+        )
+
+    def test_reserve_and_commit(self) -> None:
+        """Test running queries reserve budget, spent on commit and returned on release."""
+        reservation = self.admin_database.reserve_budget(USER_NAME, "PENGUIN", 4.0, 0.001)
+        other = self.admin_database.reserve_budget(USER_NAME, "PENGUIN", 5.0, 0.0)
+        with self.assertRaisesRegex(UnauthorizedAccessException, "more than 2 queries"):
+            self.admin_database.reserve_budget(USER_NAME, "PUMS", 1.0, 0.0)
+
+        self.admin_database.commit_budget(USER_NAME, reservation)
+        self.assertEqual(self.admin_database.get_total_spent_budget(USER_NAME, "PENGUIN"), [4.0, 0.001])
+
+        # The budget of the running query is not available.
+        with self.assertRaisesRegex(InvalidQueryException, "Not enough budget"):
+            self.admin_database.reserve_budget(USER_NAME, "PENGUIN", 1.5, 0.0)
+        self.admin_database.release_budget(USER_NAME, other)
+        self.assertEqual(self.admin_database.get_total_spent_budget(USER_NAME, "PENGUIN"), [4.0, 0.001])
+        self.admin_database.reserve_budget(USER_NAME, "PENGUIN", 6.0, 0.004)
+
+    def test_reservations_expire(self) -> None:
+        """Test the reservations of queries which never complete stop counting after their time to live."""
+        with patch("lomas_server.admin_database.yaml_database.time.time", return_value=0):
+            self.admin_database.reserve_budget(USER_NAME, "PENGUIN", 10.0, 0.0)
+            self.admin_database.reserve_budget(USER_NAME, "PUMS", 1.0, 0.0)
+        with patch("lomas_server.admin_database.yaml_database.time.time", return_value=10):
+            self.admin_database.reserve_budget(USER_NAME, "PENGUIN", 10.0, 0.0)
+        self.assertEqual(self.admin_database.get_total_spent_budget(USER_NAME, "PENGUIN"), [0, 0])
+
+    def test_commit_expired_reservation(self) -> None:
+        """Test an expired reservation is only committed if the budget still covers it."""
+        with patch("lomas_server.admin_database.yaml_database.time.time", return_value=0):
+            reservation = self.admin_database.reserve_budget(USER_NAME, "PENGUIN", 6.0, 0.0)
+            other = self.admin_database.reserve_budget(USER_NAME, "PENGUIN", 3.0, 0.0)
+        with patch("lomas_server.admin_database.yaml_database.time.time", return_value=10):
+            # The budget of the expired reservations is available again.
+            late = self.admin_database.reserve_budget(USER_NAME, "PENGUIN", 6.0, 0.0)
+            with self.assertRaisesRegex(InvalidQueryException, "expired"):
+                self.admin_database.commit_budget(USER_NAME, reservation)
+            self.admin_database.commit_budget(USER_NAME, late)
+            self.admin_database.commit_budget(USER_NAME, other)
+        self.assertEqual(self.admin_database.get_total_spent_budget(USER_NAME, "PENGUIN"), [9.0, 0.0])
+
+    def test_reservation_errors(self) -> None:
+        """Test reservations are refused to unknown, blocked and unauthorized users."""
+        with self.assertRaisesRegex(UnauthorizedAccessException, "does not exist"):
+            self.admin_database.reserve_budget("Unknown", "PENGUIN", 1.0, 0.0)
+        with self.assertRaisesRegex(UnauthorizedAccessException, "does not have access"):
+            self.admin_database.reserve_budget(USER_NAME, "BIRTHDAYS", 1.0, 0.0)
+        self.admin_database.set_may_user_query(USER_NAME, False)
+        with self.assertRaisesRegex(UnauthorizedAccessException, "not allowed to query"):
+            self.admin_database.reserve_budget(USER_NAME, "PENGUIN", 1.0, 0.0)
+
+    def test_budget_snapshot(self) -> None:
+        """Test the initial and spent budgets are read together."""
+        self.admin_database.update_budget(USER_NAME, "PENGUIN", 1.5, 0.001)
+        snapshot = self.admin_database.get_budget_snapshot(USER_NAME, "PENGUIN")
+        self.assertEqual(
+            snapshot,
+            DatasetOfUser(
+                dataset_name="PENGUIN",
+                initial_epsilon=10,
+                initial_delta=0.005,
+                total_spent_epsilon=1.5,
+                total_spent_delta=0.001,
+            ),
+        )
+        self.assertEqual(self.admin_database.get_remaining_budget(USER_NAME, "PENGUIN"), [8.5, 0.004])
+        with self.assertRaisesRegex(UnauthorizedAccessException, "does not have access"):
+            self.admin_database.get_budget_snapshot(USER_NAME, "BIRTHDAYS")
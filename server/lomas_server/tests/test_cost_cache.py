@@ -0,0 +1,93 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from lomas_core.constants import DPLibraries
+from lomas_core.models.config import CostCacheConfig
+from lomas_core.models.requests import (
+    SmartnoiseSynthDummyQueryModel,
+    SmartnoiseSynthQueryModel,
+    SmartnoiseSynthRequestModel,
+)
+from lomas_server.data_connector.path_connector import PathConnector
+from lomas_server.dp_queries.cost_cache import (
+    COST_CACHE,
+    CostCache,
+    estimate_cost,
+    get_request_hash,
+)
+from lomas_server.tests.constants import (
+    PENGUIN_METADATA_PATH,
+    PENGUIN_PATH,
+    SYNTH_REQUEST,
+)
+from lomas_server.tests.utils import CountingQuerier, load_metadata
+
+
+class TestCostCache(unittest.TestCase):
+    """Tests for the cache of the estimated query costs."""
+
+    def test_request_hash(self) -> None:
+        """Test the hash only depends on the parameters determining the cost."""
+        request = SmartnoiseSynthRequestModel.model_validate(SYNTH_REQUEST)
+        query = SmartnoiseSynthQueryModel.model_validate(
+            {**SYNTH_REQUEST, "return_model": False, "condition": "", "nb_samples": 10}
+        )
+        dummy_query = SmartnoiseSynthDummyQueryModel.model_validate(
+            {**query.model_dump(), "dummy_nb_rows": 100, "dummy_seed": 42}
+        )
+        self.assertEqual(get_request_hash(query), get_request_hash(request))
+        self.assertEqual(get_request_hash(dummy_query), get_request_hash(request))
+
+        reordered = SmartnoiseSynthRequestModel.model_validate(dict(reversed(SYNTH_REQUEST.items())))
+        self.assertEqual(get_request_hash(reordered), get_request_hash(request))
+
+        other = SmartnoiseSynthRequestModel.model_validate({**SYNTH_REQUEST, "epsilon": 2.0})
+        self.assertNotEqual(get_request_hash(other), get_request_hash(request))
+
+    def test_ttl_and_lru(self) -> None:
+        """Test costs expire after their time to live and the least recently used are evicted."""
+        cache = CostCache(max_entries=2, ttl_seconds=10)
+        with patch("lomas_server.dp_queries.cost_cache.time.monotonic", return_value=0):
+            cache.put(("lib", "a", "v1"), (1.0, 0.0))
+            cache.put(("lib", "b", "v1"), (2.0, 0.0))
+            self.assertEqual(cache.get(("lib", "a", "v1")), (1.0, 0.0))
+            cache.put(("lib", "c", "v1"), (3.0, 0.0))
+            self.assertIsNone(cache.get(("lib", "b", "v1")))
+            self.assertEqual(cache.get(("lib", "c", "v1")), (3.0, 0.0))
+
+        with patch("lomas_server.dp_queries.cost_cache.time.monotonic", return_value=10):
+            self.assertIsNone(cache.get(("lib", "a", "v1")))
+
+        cache.set_config(CostCacheConfig(max_entries=0))
+        cache.put(("lib", "a", "v1"), (1.0, 0.0))
+        self.assertIsNone(cache.get(("lib", "a", "v1")))
+
+    def test_estimate_cost(self) -> None:
+        """Test repeated estimations are cached until the dataset changes."""
+        metadata = load_metadata(PENGUIN_METADATA_PATH)
+        request = SmartnoiseSynthRequestModel.model_validate(SYNTH_REQUEST)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "penguin.csv")
+            shutil.copy(PENGUIN_PATH, path)
+            querier = CountingQuerier(PathConnector(metadata, path))
+
+            for _ in range(3):
+                version = querier.data_connector.get_version()
+                cost = estimate_cost(DPLibraries.SMARTNOISE_SYNTH, querier, request, version)
+                self.assertEqual(cost, (1.0, 0.0))
+            self.assertEqual(len(querier.nb_estimations), 1)
+
+            estimate_cost(DPLibraries.DIFFPRIVLIB, querier, request, version)
+            self.assertEqual(len(querier.nb_estimations), 2)
+
+            with open(path, "a", encoding="utf-8") as f:
+                f.write("\n")
+            version = querier.data_connector.get_version()
+            estimate_cost(DPLibraries.SMARTNOISE_SYNTH, querier, request, version)
+            self.assertEqual(len(querier.nb_estimations), 3)
+
+        COST_CACHE.clear()
@@ -0,0 +1,588 @@
+import io
+import os
+import sqlite3
+import tempfile
+import unittest
+from typing import List
+from unittest.mock import ANY
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from botocore.exceptions import ClientError
+from pyarrow import feather, parquet
+
+from lomas_core.error_handler import InternalServerException, InvalidQueryException
+from lomas_core.models.collections import DSPathAccess, DSS3Access, DSSQLAccess, Metadata
+from lomas_core.models.config import (
+    CSVReaderConfig,
+    S3CredentialsConfig,
+    S3DownloadConfig,
+    SQLCredentialsConfig,
+)
+from lomas_core.models.constants import (
+    CSVEngine,
+    DatasetFileFormat,
+    PrivateDatabaseType,
+    SQLEngine,
+)
+from lomas_core.models.requests import SmartnoiseSQLQueryModel
+from lomas_server.admin_database.yaml_database import AdminYamlDatabase
+from lomas_server.data_connector.data_connector import (
+    get_file_format,
+    set_csv_reader_config,
+    set_read_only,
+)
+from lomas_server.data_connector.dataset_cache import (
+    DATASET_CACHE,
+    get_csv_payload_cache_key,
+    get_dataset_cache_key,
+    get_projection_cache_key,
+)
+from lomas_server.data_connector.factory import get_dataset_credentials
+from lomas_server.data_connector.in_memory_connector import InMemoryConnector
+from lomas_server.data_connector.path_connector import PathConnector
+from lomas_server.data_connector.s3_connector import S3Connector, get_byte_ranges
+from lomas_server.data_connector.sql_connector import SQLConnector
+from lomas_server.dp_queries.dp_libraries.smartnoise_sql import (
+    SmartnoiseSQLQuerier,
+    get_query_columns,
+)
+from lomas_server.tests.constants import (
+    ADMIN_DB_PATH,
+    BIRTHDAYS_METADATA_PATH,
+    BIRTHDAYS_PATH,
+    ENV_S3_INTEGRATION,
+    PENGUIN_METADATA_PATH,
+    PENGUIN_PATH,
+    TRUE_VALUES,
+)
+from lomas_server.tests.utils import load_metadata
+
+
+class TestDataConnector(unittest.TestCase):
+    """Tests for reading the different dataset file formats."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Writes the penguin dataset in the columnar formats."""
+        cls.metadata = load_metadata(PENGUIN_METADATA_PATH)
+        cls.csv_df = PathConnector(cls.metadata, PENGUIN_PATH).get_pandas_df()
+
+        cls.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        # Written with plain pandas types, the connector casts them back.
+        table = pa.Table.from_pandas(pd.read_csv(PENGUIN_PATH), preserve_index=False)
+        cls.parquet_path = os.path.join(cls.tmp_dir.name, "penguin.parquet")
+        parquet.write_table(table, cls.parquet_path)
+        cls.arrow_path = os.path.join(cls.tmp_dir.name, "penguin.arrow")
+        feather.write_feather(table, cls.arrow_path)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Removes the temporary files."""
+        cls.tmp_dir.cleanup()
+
+    def test_get_file_format(self) -> None:
+        """Test file format inference from the path extension."""
+        self.assertEqual(get_file_format("data/penguin.csv"), DatasetFileFormat.CSV)
+        self.assertEqual(get_file_format("data/penguin.PARQUET"), DatasetFileFormat.PARQUET)
+        self.assertEqual(get_file_format("s3/key/penguin.feather"), DatasetFileFormat.ARROW)
+        self.assertEqual(
+            get_file_format("data/penguin", DatasetFileFormat.PARQUET), DatasetFileFormat.PARQUET
+        )
+        with self.assertRaises(InvalidQueryException):
+            get_file_format("data/penguin.json")
+
+    def test_columnar_formats_match_csv(self) -> None:
+        """Test parquet and arrow files give the same dataframe as csv."""
+        for path in [self.parquet_path, self.arrow_path]:
+            df = PathConnector(self.metadata, path).get_pandas_df()
+            pd.testing.assert_frame_equal(df, self.csv_df)
+
+    def test_explicit_file_format(self) -> None:
+        """Test the format of the dataset access overrides the extension."""
+        path = os.path.join(self.tmp_dir.name, "penguin_parquet")
+        os.link(self.parquet_path, path)
+        df = PathConnector(self.metadata, path, DatasetFileFormat.PARQUET).get_pandas_df()
+        pd.testing.assert_frame_equal(df, self.csv_df)
+
+        with self.assertRaises(InvalidQueryException):
+            PathConnector(self.metadata, path)
+
+    def test_compact_dtypes(self) -> None:
+        """Test columns are loaded with the categories and precision of the metadata."""
+        self.assertEqual(self.csv_df["species"].dtype, pd.CategoricalDtype(["Adelie", "Chinstrap", "Gentoo"]))
+        self.assertEqual(self.csv_df["bill_length_mm"].dtype, "float64")
+        self.assertLess(
+            self.csv_df.memory_usage(deep=True).sum(),
+            pd.read_csv(PENGUIN_PATH).memory_usage(deep=True).sum(),
+        )
+
+        metadata = Metadata.model_validate(
+            {
+                "max_ids": 1,
+                "row_privacy": True,
+                "rows": 2,
+                "columns": {
+                    "code": {"type": "int", "precision": 32, "cardinality": 2, "categories": [1, 2]},
+                    "age": {"type": "int", "precision": 32, "lower": 0, "upper": 100, "nullable": True},
+                    "height": {"type": "float", "precision": 32, "lower": 0.0, "upper": 3.0},
+                },
+            }
+        )
+        path = os.path.join(self.tmp_dir.name, "compact.csv")
+        pd.DataFrame(
+            {"code": [1, 2], "age": pd.array([30, None], dtype="Int32"), "height": [1.8, 1.6]}
+        ).to_csv(path, index=False)
+        parquet_path = os.path.join(self.tmp_dir.name, "compact.parquet")
+        pd.read_csv(path).to_parquet(parquet_path)
+
+        df = PathConnector(metadata, path).get_pandas_df()
+        self.assertEqual(df["code"].dtype, pd.CategoricalDtype(pd.Index([1, 2], dtype="int32")))
+        self.assertEqual(df["age"].dtype, pd.Int32Dtype())
+        self.assertTrue(df["age"].isna().iloc[1])
+        self.assertEqual(df["height"].dtype, "float32")
+        pd.testing.assert_frame_equal(PathConnector(metadata, parquet_path).get_pandas_df(), df)
+
+    def test_out_of_category_values(self) -> None:
+        """Test values outside of the metadata categories are logged when they become missing."""
+        metadata = Metadata.model_validate(
+            {
+                "max_ids": 1,
+                "row_privacy": True,
+                "rows": 3,
+                "columns": {
+                    "species": {"type": "string", "cardinality": 2, "categories": ["Adelie", "Gentoo"]},
+                    "code": {"type": "int", "precision": 32, "cardinality": 2, "categories": [1, 2]},
+                },
+            }
+        )
+        path = os.path.join(self.tmp_dir.name, "out_of_category.csv")
+        pd.DataFrame({"species": ["Adelie", "Emperor", None], "code": [1, 3, 2]}).to_csv(path, index=False)
+        parquet_path = os.path.join(self.tmp_dir.name, "out_of_category.parquet")
+        pd.read_csv(path).to_parquet(parquet_path)
+
+        for source in [path, parquet_path]:
+            with self.assertLogs(level="WARNING") as logs:
+                df = PathConnector(metadata, source).get_pandas_df()
+            self.assertEqual(df["species"].isna().tolist(), [False, True, True])
+            self.assertEqual(df["code"].isna().tolist(), [False, True, False])
+            self.assertEqual(len(logs.output), 2)
+            self.assertIn("1 values of column species", logs.output[0])
+            self.assertNotIn("Emperor", logs.output[0])
+
+    def test_csv_engines(self) -> None:
+        """Test the pandas and pyarrow csv parsers give the same dataframe."""
+        birthdays_metadata = load_metadata(BIRTHDAYS_METADATA_PATH)
+        try:
+            for metadata, path in [(self.metadata, PENGUIN_PATH), (birthdays_metadata, BIRTHDAYS_PATH)]:
+                set_csv_reader_config(CSVReaderConfig(engine=CSVEngine.PANDAS))
+                pandas_df = PathConnector(metadata, path).get_pandas_df()
+                set_csv_reader_config(CSVReaderConfig(engine=CSVEngine.PYARROW, nb_threads=2))
+                pd.testing.assert_frame_equal(PathConnector(metadata, path).get_pandas_df(), pandas_df)
+        finally:
+            set_csv_reader_config(CSVReaderConfig())
+
+    def test_column_projection(self) -> None:
+        """Test only the requested columns are read, in the requested order."""
+        columns = ["island", "bill_length_mm", "species"]
+        for path in [PENGUIN_PATH, self.parquet_path, self.arrow_path]:
+            df = PathConnector(self.metadata, path).get_pandas_df(columns)
+            pd.testing.assert_frame_equal(df, self.csv_df[columns])
+
+        with self.assertRaises(InvalidQueryException):
+            PathConnector(self.metadata, PENGUIN_PATH).get_pandas_df(["species", "idonotexist"])
+
+    def test_column_projection_cache(self) -> None:
+        """Test projections are cached and taken from the whole cached dataset."""
+        access = DSPathAccess(database_type="PATH_DB", path=self.parquet_path)
+        key = get_dataset_cache_key("TEST_PENGUIN_PARQUET", access)
+        columns = ["species", "island"]
+        projection_key = get_projection_cache_key(key, columns)
+
+        df_1 = PathConnector(self.metadata, self.parquet_path, cache_key=key).get_pandas_df(columns)
+        self.assertIs(DATASET_CACHE.get(projection_key), df_1)
+        self.assertIsNone(DATASET_CACHE.get(key))
+
+        df = PathConnector(self.metadata, self.parquet_path, cache_key=key).get_pandas_df()
+        df_2 = PathConnector(self.metadata, self.parquet_path, cache_key=key).get_pandas_df(columns)
+        self.assertIs(DATASET_CACHE.get(key), df)
+        pd.testing.assert_frame_equal(df_2, df_1)
+
+        DATASET_CACHE.invalidate(key)
+        DATASET_CACHE.invalidate(projection_key)
+
+    def test_shared_read_only_df(self) -> None:
+        """Test queriers share one read-only dataframe and get private copies on demand."""
+        df = pd.read_csv(PENGUIN_PATH)
+        connector = InMemoryConnector(self.metadata, df)
+        self.assertIs(connector.get_pandas_df(), df)
+        shared_df = connector.get_pandas_df()
+        with self.assertRaises(ValueError):
+            shared_df.loc[0, "bill_length_mm"] = 0.0
+
+        # Projections share the same read-only buffers.
+        projected_df = connector.get_pandas_df(["bill_length_mm"])
+        self.assertTrue(
+            np.shares_memory(projected_df["bill_length_mm"].to_numpy(), df["bill_length_mm"].to_numpy())
+        )
+        with self.assertRaises(ValueError):
+            projected_df.loc[0, "bill_length_mm"] = 0.0
+
+        private_df = connector.get_private_pandas_df(["bill_length_mm"])
+        private_df.loc[0, "bill_length_mm"] = 0.0
+        self.assertNotEqual(df.loc[0, "bill_length_mm"], 0.0)
+
+        # Datasets read from a source are shared through the cache the same way,
+        # including the columns backed by extension arrays.
+        shared_df = PathConnector(self.metadata, self.parquet_path).get_pandas_df()
+        self.assertIsInstance(shared_df["species"].dtype, pd.CategoricalDtype)
+        for col, value in [("bill_length_mm", 0.0), ("species", "Gentoo")]:
+            with self.assertRaises(ValueError):
+                shared_df.loc[0, col] = value
+
+        string_df = set_read_only(pd.DataFrame({"name": pd.array(["a", "b"], dtype="string")}))
+        with self.assertRaises(ValueError):
+            string_df.loc[0, "name"] = "c"
+        masked_df = set_read_only(pd.DataFrame({"age": pd.array([1, None], dtype="Int32")}))
+        with self.assertRaises(ValueError):
+            masked_df.loc[0, "age"] = 2
+
+    def test_iter_batches(self) -> None:
+        """Test batches are streamed from the files and concatenate to the dataset."""
+        columns = ["island", "bill_length_mm", "species"]
+        try:
+            for engine in CSVEngine:
+                set_csv_reader_config(CSVReaderConfig(engine=engine))
+                for path in [PENGUIN_PATH, self.parquet_path, self.arrow_path]:
+                    connector = PathConnector(self.metadata, path)
+                    batches = list(connector.iter_batches(batch_size=40))
+                    self.assertIsNone(connector.df)
+                    self.assertEqual([len(batch) for batch in batches], [40, 40, 19])
+                    pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), self.csv_df)
+
+                    batches = list(connector.iter_batches(columns, batch_size=1000))
+                    self.assertEqual(len(batches), 1)
+                    pd.testing.assert_frame_equal(batches[0], self.csv_df[columns])
+        finally:
+            set_csv_reader_config(CSVReaderConfig())
+
+        # Loaded datasets are sliced without copy.
+        in_memory_connector = InMemoryConnector(self.metadata, self.csv_df)
+        batches = list(in_memory_connector.iter_batches(batch_size=50))
+        self.assertEqual([len(batch) for batch in batches], [50, 49])
+        with self.assertRaises(ValueError):
+            batches[0].loc[0, "bill_length_mm"] = 0.0
+
+        with self.assertRaises(InvalidQueryException):
+            in_memory_connector.iter_batches(["species", "idonotexist"])
+
+    def test_streamed_csv_payload(self) -> None:
+        """Test the OpenDP payload streamed from the source is the serialized dataframe."""
+        access = DSPathAccess(database_type="PATH_DB", path=self.parquet_path)
+        key = get_dataset_cache_key("TEST_PENGUIN_STREAMED", access)
+        expected = self.csv_df.to_csv(header=False, index=False)
+
+        self.assertEqual(PathConnector(self.metadata, self.parquet_path).get_csv_payload(), expected)
+        payload = PathConnector(self.metadata, self.parquet_path, cache_key=key).get_csv_payload()
+        self.assertEqual(payload, expected)
+        self.assertIsNone(DATASET_CACHE.get(key))
+        self.assertEqual(DATASET_CACHE.get_dataset_versions(key), {get_csv_payload_cache_key(key): ANY})
+        DATASET_CACHE.invalidate(get_csv_payload_cache_key(key))
+
+    def test_smartnoise_sql_query_columns(self) -> None:
+        """Test the columns referenced in a SQL query are extracted."""
+        self.assertEqual(
+            get_query_columns(
+                "SELECT island, AVG(Bill_Length_mm) AS mean_bill FROM df.df WHERE df.species = 'Adelie' "
+                + "GROUP BY island",
+                self.metadata,
+            ),
+            ["species", "island", "bill_length_mm"],
+        )
+        self.assertEqual(get_query_columns("SELECT COUNT(*) AS nb_row FROM df", self.metadata), ["species"])
+        self.assertIsNone(get_query_columns("SELECT * FROM df", self.metadata))
+        self.assertIsNone(get_query_columns("SELECT COUNT(*) FROM (SELECT * FROM df) AS t", self.metadata))
+        self.assertIsNone(get_query_columns("not a query", self.metadata))
+
+
+class InMemoryS3Client:
+    """S3 client serving one object from memory, with byte-range support."""
+
+    def __init__(self, body: bytes) -> None:
+        """Initializer.
+
+        Args:
+            body (bytes): The object content.
+        """
+        self.body = body
+        self.ranges: List[str] = []
+
+    def head_object(self, **_: str) -> dict:
+        """Gets the object size and ETag.
+
+        Returns:
+            dict: The head_object response.
+        """
+        return {"ContentLength": len(self.body), "ETag": '"etag"'}
+
+    def get_object(self, IfMatch: str, Range: str = "", **_: str) -> dict:  # pylint: disable=C0103
+        """Gets the object or a byte range of it.
+
+        Args:
+            IfMatch (str): The expected ETag.
+            Range (str, optional): The byte range. Defaults to "" (whole object).
+
+        Returns:
+            dict: The get_object response.
+        """
+        assert IfMatch == '"etag"'
+        data = self.body
+        if Range:
+            self.ranges.append(Range)
+            start, end = Range.removeprefix("bytes=").split("-")
+            data = self.body[int(start) : int(end) + 1]  # noqa: E203
+        return {"Body": io.BytesIO(data)}
+
+
+class TestS3Connector(unittest.TestCase):
+    """Tests for the parallel download of S3 datasets."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Loads the penguin metadata and csv."""
+        cls.metadata = load_metadata(PENGUIN_METADATA_PATH)
+        with open(PENGUIN_PATH, "rb") as f:
+            cls.body = f.read()
+        cls.csv_df = PathConnector(cls.metadata, PENGUIN_PATH).get_pandas_df()
+
+    def get_connector(self, key: str, body: bytes, download_config: S3DownloadConfig) -> S3Connector:
+        """Builds an S3Connector reading body from memory.
+
+        Args:
+            key (str): The object key.
+            body (bytes): The object content.
+            download_config (S3DownloadConfig): The download parameters.
+
+        Returns:
+            S3Connector: The connector.
+        """
+        access = DSS3Access(
+            database_type="S3_DB",
+            endpoint_url="http://localhost:9000",
+            bucket="example",
+            key=key,
+            credentials_name="local_minio",
+        )
+        connector = S3Connector(self.metadata, access, download_config=download_config)
+        connector.client = InMemoryS3Client(body)
+        return connector
+
+    def test_get_byte_ranges(self) -> None:
+        """Test objects are split in contiguous ranges."""
+        self.assertEqual(get_byte_ranges(10, 4), [(0, 4), (4, 8), (8, 10)])
+        self.assertEqual(get_byte_ranges(8, 4), [(0, 4), (4, 8)])
+        self.assertEqual(get_byte_ranges(0, 4), [])
+
+    def test_ranged_download(self) -> None:
+        """Test ranged downloads in memory and in a spill file give the dataset."""
+        configs = [
+            S3DownloadConfig(part_size_bytes=1000, max_concurrency=4),
+            S3DownloadConfig(part_size_bytes=1000, max_concurrency=4, max_buffer_bytes=0),
+            S3DownloadConfig(max_concurrency=1),
+        ]
+        for config in configs:
+            connector = self.get_connector("data/penguin.csv", self.body, config)
+            pd.testing.assert_frame_equal(connector.get_pandas_df(), self.csv_df)
+
+        nb_parts = len(get_byte_ranges(len(self.body), 1000))
+        self.assertGreater(nb_parts, 1)
+        self.assertEqual(len(connector.client.ranges), 0)
+        connector = self.get_connector("data/penguin.csv", self.body, configs[0])
+        connector.get_pandas_df()
+        self.assertEqual(len(connector.client.ranges), nb_parts)
+
+    def test_missing_object(self) -> None:
+        """Test errors of the head request are raised as InternalServerException."""
+        connector = self.get_connector("penguin.csv", self.body, S3DownloadConfig())
+
+        def head_object(**_: str) -> dict:
+            raise ClientError({"Error": {"Code": "NoSuchKey", "Message": "Not Found"}}, "HeadObject")
+
+        connector.client.head_object = head_object  # type: ignore [method-assign]
+        with self.assertRaises(InternalServerException):
+            connector.read_dataset()
+
+    def test_ranged_download_parquet(self) -> None:
+        """Test ranged downloads of columnar files."""
+        sink = io.BytesIO()
+        parquet.write_table(pa.Table.from_pandas(pd.read_csv(PENGUIN_PATH), preserve_index=False), sink)
+        connector = self.get_connector(
+            "data/penguin.parquet", sink.getvalue(), S3DownloadConfig(part_size_bytes=1000)
+        )
+        pd.testing.assert_frame_equal(connector.get_pandas_df(), self.csv_df)
+
+    def test_minio_ranged_download(self) -> None:
+        """Test ranged and single stream downloads from MinIO are identical."""
+        if os.getenv(ENV_S3_INTEGRATION, "0").lower() in TRUE_VALUES:
+            access = DSS3Access(
+                database_type="S3_DB",
+                endpoint_url="http://localhost:9000",
+                bucket="example",
+                key="data/test_penguin.csv",
+                credentials_name="local_minio",
+                access_key_id="admin",
+                secret_access_key="admin123",
+            )
+            df_stream = S3Connector(
+                self.metadata, access, download_config=S3DownloadConfig(max_concurrency=1)
+            ).get_pandas_df()
+            df_ranges = S3Connector(
+                self.metadata, access, download_config=S3DownloadConfig(part_size_bytes=1000)
+            ).get_pandas_df()
+            pd.testing.assert_frame_equal(df_ranges, df_stream)
+
+
+class TestSQLConnector(unittest.TestCase):
+    """Tests for datasets in a SQL database, with SQLite."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        """Writes the penguin dataset in a SQLite database."""
+        cls.metadata = load_metadata(PENGUIN_METADATA_PATH)
+        cls.csv_df = PathConnector(cls.metadata, PENGUIN_PATH).get_pandas_df()
+
+        cls.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        cls.database = os.path.join(cls.tmp_dir.name, "penguin.db")
+        with sqlite3.connect(cls.database) as connection:
+            pd.read_csv(PENGUIN_PATH).to_sql("penguin", connection, index=False)
+        connection.close()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        """Removes the database."""
+        cls.tmp_dir.cleanup()
+
+    def get_connector(self) -> SQLConnector:
+        """Builds a connector to the penguin table.
+
+        Returns:
+            SQLConnector: The connector.
+        """
+        access = DSSQLAccess(
+            database_type=PrivateDatabaseType.SQL,
+            engine=SQLEngine.SQLITE,
+            database=self.database,
+            table="penguin",
+        )
+        return SQLConnector(self.metadata, access)
+
+    def test_read_table(self) -> None:
+        """Test the table gives the same dataframe as csv."""
+        pd.testing.assert_frame_equal(self.get_connector().get_pandas_df(), self.csv_df)
+
+        columns = ["island", "bill_length_mm"]
+        pd.testing.assert_frame_equal(self.get_connector().get_pandas_df(columns), self.csv_df[columns])
+
+    def test_iter_batches(self) -> None:
+        """Test rows are fetched from the cursor batch by batch."""
+        batches = list(self.get_connector().iter_batches(batch_size=50))
+        self.assertEqual([len(batch) for batch in batches], [50, 49])
+        pd.testing.assert_frame_equal(pd.concat(batches, ignore_index=True), self.csv_df)
+
+    def test_smartnoise_sql_in_database(self) -> None:
+        """Test smartnoise-sql queries run in the database, without loading the table."""
+        connector = self.get_connector()
+        connector.read_dataset = None  # type: ignore [assignment, method-assign]
+
+        querier = SmartnoiseSQLQuerier(connector, None)  # type: ignore [arg-type]
+        query = SmartnoiseSQLQueryModel(
+            dataset_name="PENGUIN",
+            query_str="SELECT island, COUNT(*) AS nb_penguin FROM df GROUP BY island",
+            epsilon=1.0,
+            delta=1e-4,
+            mechanisms={},
+            postprocess=True,
+        )
+        querier.cost(query)
+        result = querier.query(query)
+        self.assertEqual(list(result.df.columns), ["island", "nb_penguin"])
+        self.assertEqual(set(result.df["island"]), set(self.csv_df["island"]))
+
+    def test_smartnoise_sql_connection_closed(self) -> None:
+        """Test the connection of smartnoise-sql queries is closed once the query is done."""
+        connector = self.get_connector()
+        connections = []
+
+        def get_connection() -> sqlite3.Connection:
+            connections.append(SQLConnector.get_connection(connector))
+            return connections[-1]
+
+        connector.get_connection = get_connection  # type: ignore [method-assign]
+        querier = SmartnoiseSQLQuerier(connector, AdminYamlDatabase(ADMIN_DB_PATH))
+        query = SmartnoiseSQLQueryModel(
+            dataset_name="PENGUIN",
+            query_str="SELECT COUNT(*) AS nb_penguin FROM df",
+            epsilon=1.0,
+            delta=1e-4,
+            mechanisms={},
+            postprocess=True,
+        )
+        querier.handle_query(query, "Dr. Antartica")
+
+        self.assertEqual(len(connections), 1)
+        self.assertIsNone(querier.connection)
+        with self.assertRaises(sqlite3.ProgrammingError):
+            connections[0].cursor()
+
+    def test_smartnoise_sql_batch_connections(self) -> None:
+        """Test a batch of smartnoise-sql queries holds at most one connection at a time."""
+        connector = self.get_connector()
+        connections: List[sqlite3.Connection] = []
+        open_connections = []
+
+        def is_open(connection: sqlite3.Connection) -> bool:
+            try:
+                connection.cursor()
+            except sqlite3.ProgrammingError:
+                return False
+            return True
+
+        def get_connection() -> sqlite3.Connection:
+            open_connections.append(sum(is_open(connection) for connection in connections))
+            connections.append(SQLConnector.get_connection(connector))
+            return connections[-1]
+
+        connector.get_connection = get_connection  # type: ignore [method-assign]
+        querier = SmartnoiseSQLQuerier(connector, AdminYamlDatabase(ADMIN_DB_PATH))
+        query = SmartnoiseSQLQueryModel(
+            dataset_name="PENGUIN",
+            query_str="SELECT COUNT(*) AS nb_penguin FROM df",
+            epsilon=1.0,
+            delta=1e-4,
+            mechanisms={},
+            postprocess=True,
+        )
+        querier.handle_batch_query([query] * 3, "Dr. Antartica")
+
+        # One connection for each cost and each query, each closed before the next one opens.
+        self.assertEqual(len(connections), 6)
+        self.assertEqual(open_connections, [0] * 6)
+        self.assertFalse(any(is_open(connection) for connection in connections))
+
+    def test_get_dataset_credentials(self) -> None:
+        """Test SQL credentials are found by name."""
+        credentials = [
+            S3CredentialsConfig(
+                db_type=PrivateDatabaseType.S3,
+                credentials_name="local",
+                access_key_id="admin",
+                secret_access_key="admin123",
+            ),
+            SQLCredentialsConfig(
+                db_type=PrivateDatabaseType.SQL, credentials_name="local", user="user", password="pwd"
+            ),
+        ]
+        self.assertIs(get_dataset_credentials(credentials, PrivateDatabaseType.SQL, "local"), credentials[1])
+        with self.assertRaises(InternalServerException):
+            get_dataset_credentials(credentials, PrivateDatabaseType.SQL, "unknown")
@@ -0,0 +1,134 @@
+import threading
+import time
+import unittest
+
+import pandas as pd
+
+from lomas_core.models.collections import DSPathAccess, DSS3Access
+from lomas_server.data_connector.dataset_cache import (
+    DATASET_CACHE,
+    DatasetCache,
+    get_dataset_cache_key,
+    get_memory_size,
+)
+from lomas_server.data_connector.path_connector import PathConnector
+from lomas_server.tests.constants import PENGUIN_METADATA_PATH, PENGUIN_PATH
+from lomas_server.tests.utils import load_metadata
+
+
+class TestDatasetCache(unittest.TestCase):
+    """Tests for the process-wide dataset cache."""
+
+    def setUp(self) -> None:
+        """Build small dataframes of known size."""
+        self.df_a = pd.DataFrame({"x": range(100)})
+        self.df_b = pd.DataFrame({"x": range(100, 200)})
+        self.df_c = pd.DataFrame({"x": range(200, 300)})
+        self.nbytes = get_memory_size(self.df_a)
+
+    def test_hits_and_misses(self) -> None:
+        """Test repeated loads are served from the cache."""
+        cache = DatasetCache(max_memory_bytes=10 * self.nbytes)
+        nb_loads = []
+
+        def loader() -> tuple[pd.DataFrame, str]:
+            nb_loads.append(1)
+            return self.df_a, "v1"
+
+        for _ in range(3):
+            df = cache.get_or_load(("A", "{}"), loader)
+            self.assertIs(df, self.df_a)
+
+        stats = cache.get_stats()
+        self.assertEqual(len(nb_loads), 1)
+        self.assertEqual(stats.misses, 1)
+        self.assertEqual(stats.hits, 2)
+        self.assertEqual(stats.nb_datasets, 1)
+        self.assertEqual(stats.memory_bytes, self.nbytes)
+
+    def test_lru_eviction(self) -> None:
+        """Test least recently used datasets are evicted first."""
+        cache = DatasetCache(max_memory_bytes=2 * self.nbytes)
+        cache.put(("A", "{}"), self.df_a)
+        cache.put(("B", "{}"), self.df_b)
+
+        # Use A so that B becomes the least recently used
+        self.assertIsNotNone(cache.get(("A", "{}")))
+        cache.put(("C", "{}"), self.df_c)
+
+        self.assertIsNotNone(cache.get(("A", "{}")))
+        self.assertIsNone(cache.get(("B", "{}")))
+        self.assertIsNotNone(cache.get(("C", "{}")))
+        self.assertEqual(cache.get_stats().evictions, 1)
+
+        # Shrinking the budget evicts what no longer fits
+        cache.set_max_memory(self.nbytes)
+        self.assertEqual(cache.get_stats().nb_datasets, 1)
+        self.assertLessEqual(cache.get_stats().memory_bytes, self.nbytes)
+
+    def test_too_large_and_disabled(self) -> None:
+        """Test datasets larger than the budget are returned but not cached."""
+        cache = DatasetCache(max_memory_bytes=0)
+        df = cache.get_or_load(("A", "{}"), lambda: (self.df_a, None))
+        self.assertIs(df, self.df_a)
+        self.assertIsNone(cache.get(("A", "{}")))
+        self.assertEqual(cache.get_stats().memory_bytes, 0)
+
+    def test_concurrent_loads(self) -> None:
+        """Test concurrent requests for the same dataset load it only once."""
+        cache = DatasetCache(max_memory_bytes=10 * self.nbytes)
+        nb_loads = []
+
+        def loader() -> tuple[pd.DataFrame, str]:
+            nb_loads.append(1)
+            time.sleep(0.1)
+            return self.df_a, "v1"
+
+        threads = [threading.Thread(target=cache.get_or_load, args=(("A", "{}"), loader)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(nb_loads), 1)
+        self.assertEqual(cache.get_stats().misses, 1)
+        self.assertEqual(cache.get_stats().hits, 7)
+
+    def test_cache_key(self) -> None:
+        """Test cache keys depend on name and access but not on secrets."""
+        access = DSS3Access(
+            database_type="S3_DB",
+            endpoint_url="http://localhost:9000",
+            bucket="example",
+            key="data/penguin.csv",
+            credentials_name="local_minio",
+        )
+        key = get_dataset_cache_key("PENGUIN", access)
+
+        access_with_secrets = access.model_copy(
+            update={"access_key_id": "admin", "secret_access_key": "admin123"}
+        )
+        self.assertEqual(get_dataset_cache_key("PENGUIN", access_with_secrets), key)
+        self.assertNotIn("admin123", key[1])
+
+        self.assertNotEqual(get_dataset_cache_key("IRIS", access), key)
+        other_access = DSPathAccess(database_type="PATH_DB", path="data/penguin.csv")
+        self.assertNotEqual(get_dataset_cache_key("PENGUIN", other_access), key)
+
+    def test_path_connector_uses_cache(self) -> None:
+        """Test PathConnector instances share the dataset through the cache."""
+        metadata = load_metadata(PENGUIN_METADATA_PATH)
+        access = DSPathAccess(database_type="PATH_DB", path=PENGUIN_PATH)
+        key = get_dataset_cache_key("TEST_PENGUIN", access)
+        DATASET_CACHE.invalidate(key)
+
+        df_1 = PathConnector(metadata, PENGUIN_PATH, cache_key=key).get_pandas_df()
+        df_2 = PathConnector(metadata, PENGUIN_PATH, cache_key=key).get_pandas_df()
+        self.assertIs(df_1, df_2)
+        self.assertIs(DATASET_CACHE.get(key), df_1)
+
+        # Without cache key, the dataset is read again
+        df_3 = PathConnector(metadata, PENGUIN_PATH).get_pandas_df()
+        self.assertIsNot(df_3, df_1)
+        pd.testing.assert_frame_equal(df_3, df_1)
+        DATASET_CACHE.invalidate(key)
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import pandas as pd
+
+from lomas_core.models.collections import DSPathAccess
+from lomas_server.constants import DatasetRefreshStatus
+from lomas_server.data_connector.dataset_cache import (
+    DATASET_CACHE,
+    get_csv_payload_cache_key,
+    get_dataset_cache_key,
+    get_projection_cache_key,
+)
+from lomas_server.data_connector.dataset_refresher import DATASET_REFRESHER
+from lomas_server.data_connector.path_connector import PathConnector
+from lomas_server.tests.constants import PENGUIN_METADATA_PATH, PENGUIN_PATH
+from lomas_server.tests.utils import load_metadata
+
+DATASET_NAME = "TEST_PENGUIN_REFRESH"
+
+
+class TestDatasetRefresher(unittest.TestCase):
+    """Tests for the revalidation and refresh of cached datasets."""
+
+    def setUp(self) -> None:
+        """Copies the penguin dataset to a file that the tests can modify."""
+        self.metadata = load_metadata(PENGUIN_METADATA_PATH)
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.path = os.path.join(self.tmp_dir.name, "penguin.csv")
+        shutil.copy(PENGUIN_PATH, self.path)
+
+        access = DSPathAccess(database_type="PATH_DB", path=self.path)
+        self.key = get_dataset_cache_key(DATASET_NAME, access)
+
+    def tearDown(self) -> None:
+        """Removes the dataset from the cache and the temporary file."""
+        for key in DATASET_CACHE.get_dataset_versions(self.key):
+            DATASET_CACHE.invalidate(key)
+        DATASET_REFRESHER.refresh(DATASET_NAME)
+        self.tmp_dir.cleanup()
+
+    def get_connector(self) -> PathConnector:
+        """Builds a connector to the temporary dataset.
+
+        Returns:
+            PathConnector: The connector.
+        """
+        return PathConnector(self.metadata, self.path, cache_key=self.key)
+
+    def truncate_dataset(self, nb_rows: int) -> None:
+        """Rewrites the temporary dataset with its first rows only.
+
+        Args:
+            nb_rows (int): The number of rows to keep.
+        """
+        pd.read_csv(PENGUIN_PATH).head(nb_rows).to_csv(self.path, index=False)
+
+    def test_path_version(self) -> None:
+        """Test the version of a local file changes with its content."""
+        version = self.get_connector().get_version()
+        self.assertFalse(self.get_connector().is_modified(version))
+        self.assertFalse(self.get_connector().is_modified(None))
+
+        self.truncate_dataset(10)
+        self.assertTrue(self.get_connector().is_modified(version))
+
+    def test_refresh(self) -> None:
+        """Test modified datasets are swapped in the cache."""
+        df_old = self.get_connector().get_pandas_df()
+        results = DATASET_REFRESHER.refresh(DATASET_NAME)
+        self.assertEqual([r.status for r in results], [DatasetRefreshStatus.UNCHANGED])
+
+        self.truncate_dataset(10)
+        results = DATASET_REFRESHER.refresh(DATASET_NAME)
+        self.assertEqual([r.status for r in results], [DatasetRefreshStatus.RELOADED])
+
+        # New queries get the new version, the old one is left untouched.
+        df_new = self.get_connector().get_pandas_df()
+        self.assertEqual(len(df_new), 10)
+        self.assertGreater(len(df_old), 10)
+        self.assertIs(DATASET_CACHE.get(self.key), df_new)
+
+    def test_refresh_projections(self) -> None:
+        """Test cached projections of a modified dataset are invalidated."""
+        columns = ["species"]
+        df_old = self.get_connector().get_pandas_df(columns)
+        self.assertIs(DATASET_CACHE.get(get_projection_cache_key(self.key, columns)), df_old)
+
+        self.truncate_dataset(10)
+        results = DATASET_REFRESHER.refresh(DATASET_NAME)
+        self.assertEqual([r.status for r in results], [DatasetRefreshStatus.INVALIDATED])
+        self.assertIsNone(DATASET_CACHE.get(get_projection_cache_key(self.key, columns)))
+        self.assertEqual(len(self.get_connector().get_pandas_df(columns)), 10)
+
+    def test_csv_payload(self) -> None:
+        """Test the OpenDP csv payload is cached per version of the dataset."""
+        payload = self.get_connector().get_csv_payload()
+        self.assertEqual(payload, pd.read_csv(self.path).to_csv(header=False, index=False))
+        self.assertIs(self.get_connector().get_csv_payload(), payload)
+
+        self.truncate_dataset(10)
+        DATASET_REFRESHER.refresh(DATASET_NAME)
+        self.assertIsNone(
+            DATASET_CACHE.get_dataset_versions(self.key).get(get_csv_payload_cache_key(self.key))
+        )
+        self.assertEqual(len(self.get_connector().get_csv_payload().splitlines()), 10)
+
+    def test_refresh_failure(self) -> None:
+        """Test unreachable sources are reported and keep their cached copy."""
+        df = self.get_connector().get_pandas_df()
+        os.remove(self.path)
+
+        results = DATASET_REFRESHER.refresh(DATASET_NAME)
+        self.assertEqual([r.status for r in results], [DatasetRefreshStatus.FAILED])
+        self.assertIs(DATASET_CACHE.get(self.key), df)
@@ -0,0 +1,131 @@
+import multiprocessing
+import os
+import tempfile
+import time
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from lomas_core.models.collections import DSPathAccess
+from lomas_server.data_connector.dataset_cache import (
+    DATASET_CACHE,
+    get_dataset_cache_key,
+    get_projection_cache_key,
+)
+from lomas_server.data_connector.dataset_store import DATASET_STORE, DatasetStore
+from lomas_server.data_connector.path_connector import PathConnector
+from lomas_server.tests.constants import PENGUIN_METADATA_PATH, PENGUIN_PATH
+from lomas_server.tests.utils import load_metadata
+
+KEY = ("TEST", "{}")
+
+
+def materialize_in_process(directory: str, loads_path: str) -> None:
+    """Materializes the test dataset, recording each load in a file.
+
+    Args:
+        directory (str): The store directory.
+        loads_path (str): File with one line per load.
+    """
+
+    def loader() -> pd.DataFrame:
+        with open(loads_path, "a", encoding="utf-8") as f:
+            f.write("load\n")
+        time.sleep(0.2)
+        return pd.DataFrame({"x": range(10)})
+
+    DatasetStore(directory).get_or_materialize(KEY, loader)
+
+
+class TestDatasetStore(unittest.TestCase):
+    """Tests for the memory-mapped dataset store."""
+
+    def setUp(self) -> None:
+        """Creates an empty store directory."""
+        self.tmp_dir = tempfile.TemporaryDirectory()  # pylint: disable=R1732
+        self.store = DatasetStore(self.tmp_dir.name)
+
+    def tearDown(self) -> None:
+        """Removes the store directory."""
+        self.tmp_dir.cleanup()
+
+    def test_materialize(self) -> None:
+        """Test datasets are materialized once and read back unchanged."""
+        metadata = load_metadata(PENGUIN_METADATA_PATH)
+        df = PathConnector(metadata, PENGUIN_PATH).get_pandas_df()
+        nb_loads = []
+
+        def loader() -> pd.DataFrame:
+            nb_loads.append(1)
+            return df
+
+        self.assertIsNone(self.store.read(KEY))
+        pd.testing.assert_frame_equal(self.store.get_or_materialize(KEY, loader), df)
+        pd.testing.assert_frame_equal(self.store.get_or_materialize(KEY, loader), df)
+        self.assertEqual(len(nb_loads), 1)
+
+        columns = ["island", "body_mass_g"]
+        pd.testing.assert_frame_equal(self.store.read(KEY, columns), df[columns])
+
+        self.store.invalidate(KEY)
+        self.assertIsNone(self.store.read(KEY))
+
+    def test_zero_copy(self) -> None:
+        """Test numeric columns are read-only views of the mapped file."""
+        df = pd.DataFrame({"x": np.arange(1000, dtype="int64"), "y": np.ones(1000)})
+        df_mapped = self.store.get_or_materialize(KEY, lambda: df)
+        for col in ["x", "y"]:
+            self.assertFalse(df_mapped[col].to_numpy().flags.writeable)
+
+    def test_clear_only_store_files(self) -> None:
+        """Test clearing the store keeps the other files of its directory, and files are private."""
+        other_path = os.path.join(self.tmp_dir.name, "notes.txt")
+        with open(other_path, "w", encoding="utf-8") as f:
+            f.write("not a dataset")
+        self.store.get_or_materialize(KEY, lambda: pd.DataFrame({"x": range(10)}))
+        self.assertEqual(os.stat(self.store.get_path(KEY)).st_mode & 0o777, 0o600)
+
+        self.store.clear()
+        self.assertEqual(os.listdir(self.tmp_dir.name), ["notes.txt"])
+
+    def test_processes_materialize_once(self) -> None:
+        """Test concurrent worker processes read the source only once."""
+        loads_path = os.path.join(self.tmp_dir.name, "loads.txt")
+        context = multiprocessing.get_context("fork")
+        processes = [
+            context.Process(target=materialize_in_process, args=(self.tmp_dir.name, loads_path))
+            for _ in range(4)
+        ]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+
+        with open(loads_path, encoding="utf-8") as f:
+            self.assertEqual(len(f.readlines()), 1)
+        pd.testing.assert_frame_equal(self.store.read(KEY), pd.DataFrame({"x": range(10)}))
+
+    def test_data_connector_uses_store(self) -> None:
+        """Test data connectors materialize datasets and read projections from the store."""
+        metadata = load_metadata(PENGUIN_METADATA_PATH)
+        key = get_dataset_cache_key(
+            "TEST_PENGUIN_STORE", DSPathAccess(database_type="PATH_DB", path=PENGUIN_PATH)
+        )
+
+        DATASET_STORE.set_directory(self.tmp_dir.name)
+        try:
+            connector = PathConnector(metadata, PENGUIN_PATH, cache_key=key)
+            df = connector.get_pandas_df()
+            self.assertTrue(os.path.exists(DATASET_STORE.get_path(key, connector.get_version())))
+            DATASET_CACHE.invalidate(key)
+
+            # Projections are read from the store, not from the source.
+            connector = PathConnector(metadata, PENGUIN_PATH, cache_key=key)
+            connector.read_dataset = None  # type: ignore [assignment, method-assign]
+            df_store = connector.get_pandas_df(["species"])
+            pd.testing.assert_frame_equal(df_store, df[["species"]])
+        finally:
+            DATASET_STORE.set_directory(None)
+            DATASET_CACHE.invalidate(key)
+            DATASET_CACHE.invalidate(get_projection_cache_key(key, ["species"]))
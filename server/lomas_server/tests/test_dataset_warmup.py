@@ -0,0 +1,40 @@
+import unittest
+
+from lomas_server.admin_database.yaml_database import AdminYamlDatabase
+from lomas_server.constants import DatasetWarmupStatus
+from lomas_server.data_connector.dataset_cache import DATASET_CACHE
+from lomas_server.data_connector.dataset_warmup import warm_up_datasets
+from lomas_server.tests.constants import ADMIN_DB_PATH
+
+
+class TestDatasetWarmup(unittest.TestCase):
+    """Tests for the preloading of datasets at startup."""
+
+    def setUp(self) -> None:
+        """Loads the admin database and empties the dataset cache."""
+        self.admin_database = AdminYamlDatabase(ADMIN_DB_PATH)
+        DATASET_CACHE.clear()
+
+    def tearDown(self) -> None:
+        """Empties the dataset cache."""
+        DATASET_CACHE.clear()
+
+    def test_get_list_of_datasets(self) -> None:
+        """Test the list of datasets of the admin database."""
+        dataset_names = self.admin_database.get_list_of_datasets()
+        self.assertIn("BIRTHDAYS", dataset_names)
+        self.assertIn("PENGUIN", dataset_names)
+
+    def test_warm_up_datasets(self) -> None:
+        """Test datasets are loaded in the cache and failures are reported."""
+        progress: dict = {}
+        warm_up_datasets(["BIRTHDAYS", "UNKNOWN_DATASET"], self.admin_database, [], progress, max_workers=2)
+
+        self.assertEqual(
+            progress,
+            {
+                "BIRTHDAYS": DatasetWarmupStatus.LOADED,
+                "UNKNOWN_DATASET": DatasetWarmupStatus.FAILED,
+            },
+        )
+        self.assertEqual(DATASET_CACHE.get_stats().nb_datasets, 1)
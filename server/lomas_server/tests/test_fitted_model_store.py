@@ -0,0 +1,78 @@
+import unittest
+from unittest.mock import patch
+
+from lomas_core.models.config import FittedModelStoreConfig
+from lomas_core.models.requests import (
+    SmartnoiseSynthQueryModel,
+    SmartnoiseSynthRequestModel,
+)
+from lomas_server.data_connector.path_connector import PathConnector
+from lomas_server.dp_queries.fitted_model_store import (
+    FITTED_MODEL_STORE,
+    FittedModelStore,
+    store_fitted_model,
+)
+from lomas_server.tests.constants import (
+    PENGUIN_METADATA_PATH,
+    PENGUIN_PATH,
+    SYNTH_REQUEST,
+)
+from lomas_server.tests.utils import CountingQuerier, load_metadata
+
+
+class TestFittedModelStore(unittest.TestCase):
+    """Tests for the reuse of the models fitted by cost estimations."""
+
+    def setUp(self) -> None:
+        """Enables the store."""
+        self.metadata = load_metadata(PENGUIN_METADATA_PATH)
+        FITTED_MODEL_STORE.set_config(FittedModelStoreConfig(enabled=True))
+
+    def tearDown(self) -> None:
+        """Disables the store."""
+        FITTED_MODEL_STORE.set_config(FittedModelStoreConfig())
+
+    def test_pop_once_and_expire(self) -> None:
+        """Test fitted models are handed over once, before they expire."""
+        store = FittedModelStore(enabled=True, max_entries=1, ttl_seconds=10)
+        key = ("user", "CountingQuerier", "hash", "v1")
+        with patch("lomas_server.dp_queries.fitted_model_store.time.monotonic", return_value=0):
+            store.put(key, "model", (1.0, 0.0))
+            self.assertEqual(store.pop(key), ("model", (1.0, 0.0)))
+            self.assertIsNone(store.pop(key))
+
+            store.put(key, "model", (1.0, 0.0))
+            store.put(("user", "CountingQuerier", "other", "v1"), "model", (1.0, 0.0))
+            self.assertIsNone(store.pop(key))
+
+            store.put(key, "model", (1.0, 0.0))
+        with patch("lomas_server.dp_queries.fitted_model_store.time.monotonic", return_value=10):
+            self.assertIsNone(store.pop(key))
+
+    def test_query_reuses_fitted_model(self) -> None:
+        """Test a query reuses the model fitted by the cost estimation of the same user."""
+        request = SmartnoiseSynthRequestModel.model_validate(SYNTH_REQUEST)
+        query = SmartnoiseSynthQueryModel.model_validate(
+            {**SYNTH_REQUEST, "return_model": True, "condition": "", "nb_samples": 10}
+        )
+        connector = PathConnector(self.metadata, PENGUIN_PATH)
+        version = connector.get_version()
+
+        cost_querier = CountingQuerier(connector)
+        cost = cost_querier.cost(request)
+        store_fitted_model("Alice", cost_querier, request, version, cost)
+
+        # Another user fits their own model.
+        other_querier = CountingQuerier(connector)
+        self.assertEqual(other_querier.get_query_cost(query, "Bob"), cost)
+        self.assertEqual(len(other_querier.nb_estimations), 1)
+
+        query_querier = CountingQuerier(connector)
+        self.assertEqual(query_querier.get_query_cost(query, "Alice"), cost)
+        self.assertEqual(query_querier.model, "model 1")
+        self.assertEqual(len(query_querier.nb_estimations), 0)
+
+        # The model is consumed by the first query.
+        query_querier = CountingQuerier(connector)
+        query_querier.get_query_cost(query, "Alice")
+        self.assertEqual(len(query_querier.nb_estimations), 1)
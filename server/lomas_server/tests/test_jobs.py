@@ -0,0 +1,140 @@
+import glob
+import os
+import threading
+import time
+import unittest
+from typing import List
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from lomas_core.constants import DPLibraries
+from lomas_core.error_handler import ExternalLibraryException, InvalidQueryException
+from lomas_core.models.config import JobsConfig
+from lomas_core.models.constants import JobStatus
+from lomas_core.models.exceptions import (
+    ExternalLibraryExceptionModel,
+    UnauthorizedAccessExceptionModel,
+)
+from lomas_core.models.requests import SmartnoiseSynthQueryModel
+from lomas_core.models.requests_examples import example_smartnoise_synth_query
+from lomas_core.models.responses import (
+    JobResponse,
+    QueryResponse,
+    SmartnoiseSynthSamples,
+)
+from lomas_server.admin_database.yaml_database import AdminYamlDatabase
+from lomas_server.app import app
+from lomas_server.dp_queries.job_queue import JobQueue
+from lomas_server.tests.constants import ADMIN_DB_PATH
+from lomas_server.utils.config import CONFIG_LOADER
+
+BIRTHDAYS_QUERY = {
+    **example_smartnoise_synth_query,
+    "dataset_name": "BIRTHDAYS",
+    "synth_name": "mwem",
+    "delta": None,
+    "synth_params": {},
+    "return_model": False,
+    "nb_samples": 10,
+}
+
+
+class TestJobs(unittest.TestCase):
+    """Tests for the asynchronous query jobs."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        CONFIG_LOADER.load_config(
+            config_path="tests/test_configs/test_config.yaml",
+            secrets_path="tests/test_configs/test_secrets.yaml",
+        )
+
+    def setUp(self) -> None:
+        """Set up the headers of the user with access to BIRTHDAYS."""
+        self.headers = {
+            "Content-type": "application/json",
+            "Accept": "*/*",
+            "user-name": "BirthdayGirl",
+        }
+
+    def tearDown(self) -> None:
+        for file in glob.glob("tests/test_data/local_db_file_*.yaml"):
+            os.remove(file)
+
+    def test_job_endpoints(self) -> None:
+        """Test a job is submitted, polled and its result fetched by its user only."""
+        with TestClient(app, headers=self.headers) as client:
+            response = client.post("/jobs/smartnoise_synth_query", json=BIRTHDAYS_QUERY)
+            assert response.status_code == status.HTTP_202_ACCEPTED
+            job = JobResponse.model_validate_json(response.content)
+            assert job.dp_library == DPLibraries.SMARTNOISE_SYNTH
+
+            for _ in range(60):
+                response = client.get(f"/jobs/{job.job_id}")
+                assert response.status_code == status.HTTP_200_OK
+                job = JobResponse.model_validate_json(response.content)
+                if job.status not in (JobStatus.PENDING, JobStatus.RUNNING):
+                    break
+                time.sleep(0.5)
+            assert job.status == JobStatus.COMPLETE, job.error
+
+            response = client.get(f"/jobs/{job.job_id}/result")
+            assert response.status_code == status.HTTP_200_OK
+            r_model = QueryResponse.model_validate_json(response.content)
+            assert r_model.requested_by == "BirthdayGirl"
+            assert isinstance(r_model.result, SmartnoiseSynthSamples)
+            assert r_model.result.df_samples.shape[0] == 10
+
+            other_headers = {**self.headers, "user-name": "Dr. Antartica"}
+            response = client.get(f"/jobs/{job.job_id}", headers=other_headers)
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+            assert (
+                response.json()
+                == UnauthorizedAccessExceptionModel(
+                    message=f"Dr. Antartica has no job {job.job_id}."
+                ).model_dump()
+            )
+
+            response = client.post(
+                "/jobs/smartnoise_synth_query", json=BIRTHDAYS_QUERY, headers=other_headers
+            )
+            assert response.status_code == status.HTTP_403_FORBIDDEN
+
+    def test_failed_and_rejected_jobs(self) -> None:
+        """Test failed jobs keep their error and submissions above the queue size are rejected."""
+        admin_database = AdminYamlDatabase(ADMIN_DB_PATH)
+        query = SmartnoiseSynthQueryModel.model_validate(BIRTHDAYS_QUERY)
+        release = threading.Event()
+        started: List[str] = []
+
+        def runner(*_) -> QueryResponse:
+            started.append("job")
+            release.wait(10)
+            raise ExternalLibraryException(DPLibraries.SMARTNOISE_SYNTH, "Fitting failed.")
+
+        job_queue = JobQueue(admin_database, runner, JobsConfig(max_queue_size=1, nb_workers=1))
+        try:
+            running = job_queue.submit(query, "BirthdayGirl", DPLibraries.SMARTNOISE_SYNTH)
+            while not started:
+                time.sleep(0.01)
+            pending = job_queue.submit(query, "BirthdayGirl", DPLibraries.SMARTNOISE_SYNTH)
+            with self.assertRaises(InvalidQueryException):
+                job_queue.submit(query, "BirthdayGirl", DPLibraries.SMARTNOISE_SYNTH)
+            self.assertEqual(admin_database.get_job(running.job_id).status, JobStatus.RUNNING)
+            self.assertEqual(admin_database.get_job(pending.job_id).status, JobStatus.PENDING)
+        finally:
+            release.set()
+            job_queue.stop()
+
+        for _ in range(100):
+            job = admin_database.get_job(running.job_id)
+            if job.status == JobStatus.FAILED:
+                break
+            time.sleep(0.05)
+        self.assertEqual(
+            job.error,
+            ExternalLibraryExceptionModel(library=DPLibraries.SMARTNOISE_SYNTH, message="Fitting failed."),
+        )
+        self.assertEqual(admin_database.get_job(pending.job_id).status, JobStatus.FAILED)
+        self.assertIsNone(admin_database.get_job("unknown"))
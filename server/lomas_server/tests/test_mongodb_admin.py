@@ -9,6 +9,12 @@ from pymongo import MongoClient
 from lomas_core.models.collections import DSInfo, Metadata
 from lomas_core.models.config import MongoDBConfig
 from lomas_core.models.constants import PrivateDatabaseType
+from lomas_server.admin_database.mongodb_database import (
+    ensure_indexes,
+    find_metadata_document,
+    get_metadata_filter,
+    get_missing_indexes,
+)
 from lomas_server.admin_database.utils import (
     add_demo_data_to_mongodb_admin,
     get_mongodb_url,
@@ -32,6 +38,7 @@ from lomas_server.mongodb_admin import (
     get_list_of_users,
     get_metadata_of_dataset,
     get_user,
+    migrate_metadata,
     set_budget_field,
     set_may_query,
 )
@@ -538,7 +545,7 @@ class TestMongoDBAdmin(unittest.TestCase):  # pylint: disable=R0904
         del dataset_found["_id"]
         self.assertEqual(dataset_found, expected_dataset)
 
-        metadata_found = self.db.metadata.find_one({dataset: {"$exists": True}})[dataset]
+        metadata_found = self.db.metadata.find_one({"dataset_name": dataset})["metadata"]
         self.assertEqual(metadata_found, expected_metadata)
 
         # Add already present dataset
@@ -660,7 +667,7 @@ class TestMongoDBAdmin(unittest.TestCase):  # pylint: disable=R0904
         expected_metadata = yaml.safe_load(response["Body"])
         expected_metadata = Metadata.model_validate(expected_metadata).model_dump()
 
-        metadata_found = self.db.metadata.find_one({dataset: {"$exists": True}})[dataset]
+        metadata_found = self.db.metadata.find_one({"dataset_name": dataset})["metadata"]
         self.assertEqual(metadata_found, expected_metadata)
 
     def test_add_datasets_via_yaml(self) -> None:
@@ -686,14 +693,14 @@ class TestMongoDBAdmin(unittest.TestCase):  # pylint: disable=R0904
             del penguin_found["_id"]
             self.assertEqual(penguin_found, penguin)
 
-            metadata_found = self.db.metadata.find_one({"PENGUIN": {"$exists": True}})["PENGUIN"]
+            metadata_found = self.db.metadata.find_one({"dataset_name": "PENGUIN"})["metadata"]
             self.assertEqual(metadata_found, penguin_metadata)
 
             iris_found = self.db.datasets.find_one({"dataset_name": "IRIS"})
             del iris_found["_id"]
             self.assertEqual(iris_found, iris)
 
-            metadata_found = self.db.metadata.find_one({"IRIS": {"$exists": True}})["IRIS"]
+            metadata_found = self.db.metadata.find_one({"dataset_name": "IRIS"})["metadata"]
             self.assertEqual(metadata_found, penguin_metadata)
 
         path = "./tests/test_data/test_datasets.yaml"
@@ -776,7 +783,7 @@ class TestMongoDBAdmin(unittest.TestCase):  # pylint: disable=R0904
         print(tintin)
         self.assertEqual(tintin_found, tintin)
 
-        metadata_found = self.db.metadata.find_one({"TINTIN_S3_TEST": {"$exists": True}})["TINTIN_S3_TEST"]
+        metadata_found = self.db.metadata.find_one({"dataset_name": "TINTIN_S3_TEST"})["metadata"]
         self.assertEqual(metadata_found, tintin_metadata)
 
     def test_del_dataset(self) -> None:
@@ -819,7 +826,7 @@ class TestMongoDBAdmin(unittest.TestCase):  # pylint: disable=R0904
             dataset_path=dataset_path,
             metadata_path=metadata_path,
         )
-        self.db.metadata.delete_many({dataset: {"$exists": True}})
+        self.db.metadata.delete_many({"dataset_name": dataset})
         with self.assertRaises(ValueError):
             del_dataset(self.db, dataset)
 
@@ -879,6 +886,49 @@ class TestMongoDBAdmin(unittest.TestCase):  # pylint: disable=R0904
             expected_metadata = Metadata.model_validate(expected_metadata).model_dump()
         self.assertEqual(metadata_found, expected_metadata)
 
+    def test_migrate_metadata(self) -> None:
+        """Test migrating legacy metadata documents, readable before and after."""
+        with open("./tests/test_data/metadata/penguin_metadata.yaml", encoding="utf-8") as f:
+            metadata = yaml.safe_load(f)
+        for dataset in ["PENGUIN", "IRIS", "PUMS"]:
+            self.db.datasets.insert_one({"dataset_name": dataset})
+            self.db.metadata.insert_one({dataset: metadata})
+        self.assertEqual(get_metadata_of_dataset(self.db, "IRIS"), metadata)
+
+        self.assertEqual(migrate_metadata(self.db, batch_size=2), 3)
+        self.assertEqual(
+            self.db.metadata.find_one({"dataset_name": "IRIS"}, {"_id": 0}),
+            {"dataset_name": "IRIS", "version": 2, "metadata": metadata},
+        )
+        self.assertEqual(get_metadata_of_dataset(self.db, "IRIS"), metadata)
+
+        # Migrating again is a no-op
+        self.assertEqual(migrate_metadata(self.db), 0)
+
+    def test_migrate_metadata_duplicates(self) -> None:
+        """Test legacy documents of datasets already migrated are reported and kept."""
+        with open("./tests/test_data/metadata/penguin_metadata.yaml", encoding="utf-8") as f:
+            metadata = yaml.safe_load(f)
+        ensure_indexes(self.db)
+        self.db.metadata.insert_one({"dataset_name": "IRIS", "version": 2, "metadata": metadata})
+        for dataset in ["PENGUIN", "IRIS", "PUMS"]:
+            self.db.metadata.insert_one({dataset: metadata})
+
+        with self.assertLogs(level="ERROR") as logs:
+            self.assertEqual(migrate_metadata(self.db), 2)
+        self.assertIn("IRIS", logs.output[-1])
+        self.assertEqual(self.db.metadata.count_documents({"IRIS": {"$exists": True}}), 1)
+        self.assertEqual(self.db.metadata.count_documents({"version": 2}), 3)
+
+    def test_metadata_filter_field_names(self) -> None:
+        """Test datasets named like the fields of the metadata documents only match their own."""
+        with open("./tests/test_data/metadata/penguin_metadata.yaml", encoding="utf-8") as f:
+            metadata = yaml.safe_load(f)
+        self.db.metadata.insert_one({"dataset_name": "PENGUIN", "version": 2, "metadata": metadata})
+        for dataset in ["metadata", "version", "dataset_name"]:
+            self.assertEqual(self.db.metadata.count_documents(get_metadata_filter(dataset)), 0)
+            self.assertIsNone(find_metadata_document(self.db, dataset))
+
     def test_get_list_of_datasets(self) -> None:
         """Test get list of datasets."""
         list_datasets = get_list_of_datasets(self.db)
@@ -958,3 +1008,18 @@ class TestMongoDBAdmin(unittest.TestCase):  # pylint: disable=R0904
             )
         else:
             self.assertEqual(list_datasets, ["PENGUIN", "IRIS", "BIRTHDAYS", "PUMS"])
+
+    def test_admin_database_indexes(self) -> None:
+        """Test the indexes of the admin database are created and the missing ones reported."""
+        ensure_indexes(self.db)
+        self.assertEqual(get_missing_indexes(self.db), [])
+
+        # Creating again is a no-op
+        ensure_indexes(self.db)
+        self.assertEqual(get_missing_indexes(self.db), [])
+
+        drop_collection(self.db, "queries_archives")
+        self.assertEqual(
+            get_missing_indexes(self.db),
+            ["queries_archives(user_name, dataset_name, timestamp)"],
+        )
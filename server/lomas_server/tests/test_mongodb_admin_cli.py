@@ -481,7 +481,7 @@ class TestMongoDBAdmin(unittest.TestCase):  # pylint: disable=R0904
         del dataset_found["_id"]
         self.assertEqual(dataset_found, expected_dataset)
 
-        metadata_found = self.db.metadata.find_one({dataset: {"$exists": True}})[dataset]
+        metadata_found = self.db.metadata.find_one({"dataset_name": dataset})["metadata"]
         self.assertEqual(metadata_found, expected_metadata)
 
     def test_add_datasets_via_yaml_cli(self) -> None:
@@ -507,14 +507,14 @@ class TestMongoDBAdmin(unittest.TestCase):  # pylint: disable=R0904
             del penguin_found["_id"]
             self.assertEqual(penguin_found, penguin)
 
-            metadata_found = self.db.metadata.find_one({"PENGUIN": {"$exists": True}})["PENGUIN"]
+            metadata_found = self.db.metadata.find_one({"dataset_name": "PENGUIN"})["metadata"]
             self.assertEqual(metadata_found, penguin_metadata)
 
             iris_found = self.db.datasets.find_one({"dataset_name": "IRIS"})
             del iris_found["_id"]
             self.assertEqual(iris_found, iris)
 
-            metadata_found = self.db.metadata.find_one({"IRIS": {"$exists": True}})["IRIS"]
+            metadata_found = self.db.metadata.find_one({"dataset_name": "IRIS"})["metadata"]
             self.assertEqual(metadata_found, penguin_metadata)
 
         path = "./tests/test_data/test_datasets.yaml"
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import pandas as pd
+from pyarrow import feather
+
+from lomas_core.models.collections import DSPathAccess
+from lomas_core.models.config import OpenDPConfig, ProcessPoolsConfig
+from lomas_core.models.requests import (
+    SmartnoiseSQLQueryModel,
+    SmartnoiseSynthQueryModel,
+)
+from lomas_core.models.requests_examples import example_smartnoise_sql
+from lomas_core.models.responses import SmartnoiseSQLQueryResult, SmartnoiseSynthSamples
+from lomas_server.admin_database.yaml_database import AdminYamlDatabase
+from lomas_server.constants import SHARED_DATASET_DIR
+from lomas_server.data_connector.dataset_cache import DATASET_CACHE, get_dataset_cache_key
+from lomas_server.data_connector.dataset_store import DATASET_STORE
+from lomas_server.data_connector.path_connector import PathConnector
+from lomas_server.dp_queries.dp_libraries.opendp import set_opendp_features_config
+from lomas_server.dp_queries.dp_libraries.smartnoise_sql import (
+    SmartnoiseSQLQuerier,
+    get_query_columns,
+)
+from lomas_server.dp_queries.dp_libraries.smartnoise_synth import SmartnoiseSynthQuerier
+from lomas_server.dp_queries.process_pool import (
+    QUERIER_PROCESS_POOLS,
+    load_shared_dataset,
+    share_dataset,
+)
+from lomas_server.tests.constants import (
+    ADMIN_DB_PATH,
+    PENGUIN_METADATA_PATH,
+    PENGUIN_PATH,
+    SYNTH_REQUEST,
+)
+from lomas_server.tests.utils import load_metadata
+
+
+class TestProcessPool(unittest.TestCase):
+    """Tests for the execution of the DP libraries in process pools."""
+
+    def setUp(self) -> None:
+        """Loads the penguin metadata."""
+        self.metadata = load_metadata(PENGUIN_METADATA_PATH)
+
+    def test_share_dataset(self) -> None:
+        """Test datasets are shared through a temporary file, or the file of the dataset store."""
+        connector = PathConnector(self.metadata, PENGUIN_PATH)
+        with share_dataset(connector) as dataset:
+            path, columns = dataset
+            self.assertTrue(path.startswith(SHARED_DATASET_DIR))
+            self.assertIsNone(columns)
+            pd.testing.assert_frame_equal(load_shared_dataset(dataset), connector.get_pandas_df())
+        self.assertFalse(os.path.exists(path))
+
+        # Only the projected columns are written, once for concurrent users.
+        with share_dataset(connector, ["species", "island"]) as dataset:
+            with share_dataset(connector, ["species", "island"]) as other_dataset:
+                self.assertEqual(other_dataset, dataset)
+                pd.testing.assert_frame_equal(
+                    load_shared_dataset(dataset), connector.get_pandas_df(["species", "island"])
+                )
+            self.assertTrue(os.path.exists(dataset[0]))
+        self.assertFalse(os.path.exists(dataset[0]))
+
+        key = get_dataset_cache_key(
+            "TEST_PENGUIN_POOL", DSPathAccess(database_type="PATH_DB", path=PENGUIN_PATH)
+        )
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            DATASET_STORE.set_directory(tmp_dir)
+            try:
+                connector = PathConnector(self.metadata, PENGUIN_PATH, cache_key=key)
+                with share_dataset(connector, ["species"]) as dataset:
+                    path, columns = dataset
+                    self.assertEqual(path, DATASET_STORE.get_path(key, connector.get_version()))
+                    self.assertEqual(columns, ["species"])
+                    pd.testing.assert_frame_equal(
+                        load_shared_dataset(dataset), connector.get_pandas_df(["species"])
+                    )
+                self.assertTrue(os.path.exists(path))
+            finally:
+                DATASET_STORE.set_directory(None)
+                DATASET_CACHE.invalidate(key)
+
+    def test_share_writes(self) -> None:
+        """Test a query writes its projected columns once, reused by its cost and the queries of a batch."""
+        QUERIER_PROCESS_POOLS.set_config(ProcessPoolsConfig(smartnoise_sql=1))
+        try:
+            querier = SmartnoiseSQLQuerier(
+                PathConnector(self.metadata, PENGUIN_PATH), AdminYamlDatabase(ADMIN_DB_PATH)
+            )
+            query = SmartnoiseSQLQueryModel.model_validate(
+                {**example_smartnoise_sql, "dataset_name": "PENGUIN", "epsilon": 1.0}
+            )
+            with patch.object(feather, "write_feather", wraps=feather.write_feather) as write_feather:
+                querier.handle_query(query, "Dr. Antartica")
+                self.assertEqual(write_feather.call_count, 1)
+                # Only the columns of the query are written.
+                self.assertEqual(
+                    list(write_feather.call_args.args[0].columns),
+                    get_query_columns(query.query_str, self.metadata),
+                )
+
+                querier.handle_batch_query([query] * 3, "Dr. Antartica")
+                self.assertEqual(write_feather.call_count, 2)
+        finally:
+            QUERIER_PROCESS_POOLS.shutdown()
+
+    def test_queriers_run_in_pool(self) -> None:
+        """Test costs and queries run in the process pools, with the model fitted by the cost."""
+        QUERIER_PROCESS_POOLS.set_config(
+            ProcessPoolsConfig(smartnoise_sql=1, smartnoise_synth=1),
+            set_opendp_features_config,
+            (OpenDPConfig(contrib=True, floating_point=True, honest_but_curious=False),),
+        )
+        try:
+            connector = PathConnector(self.metadata, PENGUIN_PATH)
+
+            synth_querier = SmartnoiseSynthQuerier(connector, None)  # type: ignore [arg-type]
+            self.assertTrue(synth_querier.runs_in_process_pool())
+            query = SmartnoiseSynthQueryModel.model_validate(
+                {
+                    **SYNTH_REQUEST,
+                    "select_cols": ["species", "island"],
+                    "return_model": False,
+                    "condition": "",
+                    "nb_samples": 10,
+                }
+            )
+            self.assertEqual(synth_querier.run_cost(query), (1.0, 0))
+            self.assertIsNotNone(synth_querier.get_fitted_model())
+            result = synth_querier.run_query(query)
+            assert isinstance(result, SmartnoiseSynthSamples)
+            self.assertEqual(list(result.df_samples.columns), ["species", "island"])
+
+            sql_querier = SmartnoiseSQLQuerier(connector, None)  # type: ignore [arg-type]
+            sql_query = SmartnoiseSQLQueryModel.model_validate(
+                {**example_smartnoise_sql, "dataset_name": "PENGUIN"}
+            )
+            sql_querier.run_cost(sql_query)
+            self.assertIsInstance(sql_querier.run_query(sql_query), SmartnoiseSQLQueryResult)
+        finally:
+            QUERIER_PROCESS_POOLS.shutdown()
+        self.assertFalse(synth_querier.runs_in_process_pool())
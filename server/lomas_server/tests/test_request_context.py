@@ -0,0 +1,65 @@
+import threading
+import unittest
+from typing import List
+
+from lomas_core.error_handler import UnauthorizedAccessException
+from lomas_server.admin_database.request_context import (
+    admin_database_request_context,
+    memoize_in_request,
+)
+
+
+class CountingLookups:
+    """Admin database lookups counting their calls."""
+
+    def __init__(self) -> None:
+        """Initializer, without calls."""
+        self.calls: List[str] = []
+
+    @memoize_in_request
+    def does_user_exist(self, user_name: str) -> bool:
+        """Records the call, only Dr. Antartica exists."""
+        self.calls.append(user_name)
+        if user_name == "Error":
+            raise UnauthorizedAccessException("Lookup failed.")
+        return user_name == "Dr. Antartica"
+
+
+class TestRequestContext(unittest.TestCase):
+    """Tests for the admin database lookups memoized during a request."""
+
+    def test_memoized_in_context(self) -> None:
+        """Test the lookups run once per request and arguments."""
+        lookups = CountingLookups()
+        with admin_database_request_context():
+            self.assertTrue(lookups.does_user_exist("Dr. Antartica"))
+            self.assertTrue(lookups.does_user_exist("Dr. Antartica"))
+            self.assertFalse(lookups.does_user_exist("Unknown"))
+            self.assertFalse(lookups.does_user_exist("Unknown"))
+        self.assertEqual(lookups.calls, ["Dr. Antartica", "Unknown"])
+
+        # A new request looks up again, and nothing is memoized outside requests.
+        with admin_database_request_context():
+            lookups.does_user_exist("Dr. Antartica")
+        lookups.does_user_exist("Dr. Antartica")
+        lookups.does_user_exist("Dr. Antartica")
+        self.assertEqual(len(lookups.calls), 5)
+
+    def test_exceptions_not_memoized(self) -> None:
+        """Test failed lookups run again."""
+        lookups = CountingLookups()
+        with admin_database_request_context():
+            for _ in range(2):
+                with self.assertRaises(UnauthorizedAccessException):
+                    lookups.does_user_exist("Error")
+        self.assertEqual(lookups.calls, ["Error", "Error"])
+
+    def test_contexts_are_isolated(self) -> None:
+        """Test concurrent requests in other threads do not share their lookups."""
+        lookups = CountingLookups()
+        with admin_database_request_context():
+            lookups.does_user_exist("Dr. Antartica")
+            thread = threading.Thread(target=lookups.does_user_exist, args=("Dr. Antartica",))
+            thread.start()
+            thread.join()
+        self.assertEqual(lookups.calls, ["Dr. Antartica", "Dr. Antartica"])
@@ -0,0 +1,63 @@
+import glob
+import os
+import shutil
+import tempfile
+import unittest
+
+from lomas_core.constants import DPLibraries
+from lomas_core.models.collections import Job
+from lomas_core.models.constants import JobStatus
+from lomas_server.admin_database.yaml_database import AdminYamlDatabase
+from lomas_server.tests.constants import ADMIN_DB_PATH
+
+USER_NAME = "Dr. Antartica"
+
+
+class TestYamlDatabase(unittest.TestCase):
+    """Tests for the indexes of the YAML admin database."""
+
+    def setUp(self) -> None:
+        """Loads the admin database, without saving it."""
+        self.admin_database = AdminYamlDatabase(ADMIN_DB_PATH)
+
+    def test_indexed_lookups(self) -> None:
+        """Test the users, datasets and accesses are looked up in the indexes."""
+        self.assertTrue(self.admin_database.does_user_exist(USER_NAME))
+        self.assertFalse(self.admin_database.does_user_exist("Unknown"))
+        self.assertTrue(self.admin_database.does_dataset_exist("BIRTHDAYS"))
+        self.assertFalse(self.admin_database.does_dataset_exist("Unknown"))
+        self.assertTrue(self.admin_database.has_user_access_to_dataset(USER_NAME, "PENGUIN"))
+        self.assertFalse(self.admin_database.has_user_access_to_dataset(USER_NAME, "BIRTHDAYS"))
+        self.assertEqual(self.admin_database.get_dataset("PENGUIN").dataset_name, "PENGUIN")
+
+    def test_updates_are_saved(self) -> None:
+        """Test the updates through the indexes are in the database to save."""
+        self.admin_database.update_budget(USER_NAME, "PENGUIN", 1.0, 0.001)
+        self.admin_database.set_may_user_query(USER_NAME, False)
+        users = {user["user_name"]: user for user in self.admin_database.database["users"]}
+        self.assertIn("BirthdayGirl", users)
+        self.assertFalse(users[USER_NAME]["may_query"])
+        penguin = next(ds for ds in users[USER_NAME]["datasets_list"] if ds["dataset_name"] == "PENGUIN")
+        self.assertEqual(penguin["total_spent_epsilon"], 1.0)
+
+        job = Job(user_name=USER_NAME, dataset_name="PENGUIN", dp_library=DPLibraries.SMARTNOISE_SQL)
+        self.admin_database.save_job(job)
+        job.status = JobStatus.COMPLETE
+        self.admin_database.save_job(job)
+        self.assertEqual(self.admin_database.get_job(job.job_id), job)
+        self.assertEqual(len(self.admin_database.database["jobs"]), 1)
+        self.assertIsNone(self.admin_database.get_job("unknown"))
+
+    def test_save_and_reload(self) -> None:
+        """Test a saved database with jobs is loaded back by the next server."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "local_db_file.yaml")
+            shutil.copy(ADMIN_DB_PATH, path)
+            admin_database = AdminYamlDatabase(path)
+            job = Job(user_name=USER_NAME, dataset_name="PENGUIN", dp_library=DPLibraries.SMARTNOISE_SQL)
+            job.status = JobStatus.COMPLETE
+            admin_database.save_job(job)
+            admin_database.save_current_database()
+
+            saved_path = next(p for p in glob.glob(os.path.join(tmp_dir, "*.yaml")) if p != path)
+            self.assertEqual(AdminYamlDatabase(saved_path).get_job(job.job_id), job)
@@ -0,0 +1,69 @@
+from typing import Any, List, Optional
+
+import yaml
+
+from lomas_core.models.collections import Metadata
+from lomas_core.models.requests import LomasRequestModel
+from lomas_server.data_connector.data_connector import DataConnector
+from lomas_server.dp_queries.dp_querier import DPQuerier
+
+
+def load_metadata(path: str) -> Metadata:
+    """Loads the metadata of a test dataset.
+
+    Args:
+        path (str): The path of the metadata YAML file.
+
+    Returns:
+        Metadata: The metadata.
+    """
+    with open(path, encoding="utf-8") as f:
+        return Metadata.model_validate(yaml.safe_load(f))
+
+
+class CountingQuerier(DPQuerier):
+    """Querier counting its cost estimations, each fitting a new model."""
+
+    memoize_cost = True
+
+    def __init__(self, data_connector: DataConnector) -> None:
+        """Initializer.
+
+        Args:
+            data_connector (DataConnector): The dataset.
+        """
+        super().__init__(data_connector, None)  # type: ignore [arg-type]
+        self.model: Optional[str] = None
+        self.nb_estimations: List[int] = []
+
+    def cost(self, query_json: LomasRequestModel) -> tuple[float, float]:
+        """Counts the estimation, fits a new model and returns a fixed cost.
+
+        Args:
+            query_json (LomasRequestModel): The request.
+
+        Returns:
+            tuple[float, float]: The epsilon and delta cost.
+        """
+        self.nb_estimations.append(1)
+        self.model = f"model {len(self.nb_estimations)}"
+        return 1.0, 0.0
+
+    def get_fitted_model(self) -> Optional[str]:
+        """Gets the fitted model.
+
+        Returns:
+            Optional[str]: The fitted model.
+        """
+        return self.model
+
+    def set_fitted_model(self, fitted_model: Any) -> None:
+        """Sets the fitted model.
+
+        Args:
+            fitted_model (Any): The fitted model.
+        """
+        self.model = fitted_model
+
+    def query(self, query_json: LomasRequestModel) -> None:  # type: ignore [override]
+        """Not used."""
@@ -52,3 +52,35 @@ MONGO_ERROR_COUNTER = meter.create_counter(
     description="Number of MongoDB errors encountered",
     unit="errors",
 )
+
+# Dataset cache metrics
+DATASET_CACHE_HIT_COUNTER = meter.create_counter(
+    name="dataset_cache_hit_count",
+    description="Number of private dataset loads served from the dataset cache",
+    unit="hits",
+)
+
+DATASET_CACHE_MISS_COUNTER = meter.create_counter(
+    name="dataset_cache_miss_count",
+    description="Number of private dataset loads that required reading the source",
+    unit="misses",
+)
+
+DATASET_CACHE_EVICTION_COUNTER = meter.create_counter(
+    name="dataset_cache_eviction_count",
+    description="Number of datasets evicted from the dataset cache",
+    unit="evictions",
+)
+
+# Cost cache metrics
+COST_CACHE_HIT_COUNTER = meter.create_counter(
+    name="cost_cache_hit_count",
+    description="Number of cost estimations served from the cost cache",
+    unit="hits",
+)
+
+COST_CACHE_MISS_COUNTER = meter.create_counter(
+    name="cost_cache_miss_count",
+    description="Number of cost estimations that required running the DP library",
+    unit="misses",
+)
@@ -2,24 +2,51 @@ import logging
 
 import uvicorn
 
+from lomas_core.models.config import Config
+from lomas_core.models.constants import AdminDBType
+from lomas_server.data_connector.dataset_store import DATASET_STORE
 from lomas_server.utils.config import get_config
 
-if __name__ == "__main__":
 
-    config = get_config()
+def get_nb_workers(config: Config) -> int:
+    """Gets the number of server workers supported by the config.
+
+    Args:
+        config (Config): The server config.
 
-    if config.server.workers != 1:
+    Returns:
+        int: The number of server workers.
+    """
+    if config.server.workers != 1 and config.admin_database.db_type == AdminDBType.YAML:
+        # The yaml admin database lives in the memory of each process.
         logging.warning(  # pylint: disable=W1201
-            "Only supports one server worker."
+            "Only supports one server worker with a yaml admin database."
             + "Overwriting server.workers config"
             + f" from {config.server.workers} to 1.",
         )
+        return 1
+
+    if config.server.workers != 1 and config.dataset_store.directory is None:
+        logging.warning(
+            "Each server worker holds its own copy of the datasets, "
+            + "set dataset_store.directory to share them."
+        )
+    return config.server.workers
+
+
+if __name__ == "__main__":
+
+    server_config = get_config()
+
+    # Datasets may have changed since the last run, materialize them again.
+    DATASET_STORE.set_directory(server_config.dataset_store.directory)
+    DATASET_STORE.clear()
 
     uvicorn.run(
         "lomas_server.app:app",
-        host=config.server.host_ip,
-        port=config.server.host_port,
-        log_level=config.server.log_level,
-        workers=1,
-        reload=config.server.reload,
+        host=server_config.server.host_ip,
+        port=server_config.server.host_port,
+        log_level=server_config.server.log_level,
+        workers=get_nb_workers(server_config),
+        reload=server_config.server.reload,
     )
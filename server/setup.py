@@ -41,7 +41,9 @@ setup(
         "opentelemetry-instrumentation-fastapi>=0.50b0",
         "opentelemetry-instrumentation-pymongo>=0.50b0",
         "packaging==24.1",
+        "psycopg2-binary==2.9.9",
         "pyaml==23.9.5",
+        "pyarrow==17.0.0",
         "pydantic==2.8.2",
         "smartnoise-sql==1.0.4",
         "uvicorn==0.29.0"